@@ -1,20 +1,34 @@
 # custom_components/parcel_tracking_info/__init__.py
 
 import logging
+from datetime import timedelta
 from homeassistant import config_entries
 from homeassistant.const import CONF_EMAIL, CONF_PASSWORD, CONF_HOST, CONF_PORT
 from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers.event import async_track_time_interval
 from .const import DOMAIN
 import imaplib
 from . import config_flow  # Ensure config_flow is imported to register the flow
 from .coordinator import ParcelTrackingCoordinator  # Import the coordinator
+from .orchestrator import RefreshOrchestrator
+from .history import ParcelHistoryStore, DEFAULT_RETENTION_DAYS
+from .dedup import TrackingNumberIndex
+from .circuit_breaker import CircuitBreakerRegistry
+from .index import ParcelIndex
+from .services import async_setup_services
 
 _LOGGER = logging.getLogger(__name__)
 
+PLATFORMS = ["sensor", "calendar"]
+
+# How often expired history is purged and the database compacted
+HISTORY_COMPACTION_INTERVAL = timedelta(days=1)
+
 
 async def async_setup(hass, config):
     """Set up the Parcel Tracking Info integration from YAML configuration."""
     _LOGGER.debug("Parcel Tracking Info setup using YAML is not supported.")
+    await async_setup_services(hass)
     return True
 
 
@@ -23,16 +37,35 @@ async def async_setup_entry(hass, entry):
     _LOGGER.info(f"Setting up Parcel Tracking Info with configuration entry: {entry.title}")
 
     try:
+        # Share the refresh orchestrator and the history store between all config entries
+        await async_setup_domain_data(hass)
+
+        coordinator = ParcelTrackingCoordinator(hass, entry)
+
+        # Warm start: show the last known parcels right away and refresh in the background
+        if await coordinator.async_restore_snapshot():
+            hass.data[DOMAIN][entry.entry_id] = coordinator
+            await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+            await coordinator.backfill.async_resume()
+            entry.async_create_background_task(
+                hass, coordinator.async_refresh(), f"{DOMAIN} initial refresh {entry.title}"
+            )
+            return True
+
         # Perform a connectivity check to the email server
         imap_server = entry.data.get(CONF_HOST)
         imap_port = entry.data.get(CONF_PORT)
         email_account = entry.data.get(CONF_EMAIL)
         email_password = entry.data.get(CONF_PASSWORD)
 
-        # Attempt to connect to the email server
-        connected, error_code = await hass.async_add_executor_job(
-            test_email_connection, imap_server, imap_port, email_account, email_password
-        )
+        if entry.options.get('jmap_session_url', entry.data.get('jmap_session_url')):
+            # Read over JMAP: the first refresh checks the session
+            connected, error_code = True, None
+        else:
+            # Attempt to connect to the email server
+            connected, error_code = await hass.async_add_executor_job(
+                test_email_connection, imap_server, imap_port, email_account, email_password
+            )
 
         if not connected:
             error_message = {
@@ -45,14 +78,16 @@ async def async_setup_entry(hass, entry):
             raise ConfigEntryNotReady(error_message)
 
         # Initialize the coordinator
-        coordinator = ParcelTrackingCoordinator(hass, entry)
         await coordinator.async_config_entry_first_refresh()
 
         # Store the coordinator
         hass.data.setdefault(DOMAIN, {})[entry.entry_id] = coordinator
 
-        # Forward the config entry setup to the sensor platform
-        await hass.config_entries.async_forward_entry_setups(entry, ["sensor"])
+        # Forward the config entry setup to the sensor and calendar platforms
+        await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+
+        # Continue a backfill that was interrupted by a restart or reload
+        await coordinator.backfill.async_resume()
 
         return True
 
@@ -65,15 +100,97 @@ async def async_unload_entry(hass, entry):
     """Unload a config entry."""
     _LOGGER.info(f"Unloading Parcel Tracking Info config entry: {entry.title}")
 
-    # Remove the coordinator from hass.data
-    hass.data.get(DOMAIN, {}).pop(entry.entry_id, None)
+    # Remove the coordinator from hass.data and release its tracking numbers
+    domain_data = hass.data.get(DOMAIN, {})
+    coordinator = domain_data.pop(entry.entry_id, None)
+    if coordinator is not None and "orchestrator" in domain_data:
+        # Drop its queued refresh, or stop it if it is running
+        domain_data["orchestrator"].cancel(coordinator)
+    if "tracking_index" in domain_data:
+        domain_data["tracking_index"].release(entry.entry_id)
+    if "parcel_index" in domain_data:
+        domain_data["parcel_index"].remove_entry(entry.entry_id)
 
-    # Unload the sensor platform
-    unload_ok = await hass.config_entries.async_unload_platforms(entry, ["sensor"])
+    # Drop the shared objects once no coordinator is left
+    if not any(isinstance(value, ParcelTrackingCoordinator) for value in domain_data.values()):
+        await async_unload_domain_data(hass)
+
+    # Unload the sensor and calendar platforms
+    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
 
     return unload_ok
 
 
+async def async_remove_entry(hass, entry):
+    """Delete the snapshot, backfill checkpoint and parcel history of a removed config entry."""
+    coordinator = ParcelTrackingCoordinator(hass, entry)
+    await coordinator.async_remove_snapshot()
+    await coordinator.backfill.async_remove()
+
+    history = hass.data.get(DOMAIN, {}).get("history")
+    owns_history = history is None
+    if owns_history:
+        history = ParcelHistoryStore(hass.config.path(f"{DOMAIN}.db"))
+    try:
+        await hass.async_add_executor_job(history.open)
+        await hass.async_add_executor_job(history.remove_entry, entry.entry_id)
+    except Exception as e:
+        _LOGGER.error("Error removing parcel history of %s: %s", entry.title, e)
+    finally:
+        if owns_history:
+            await hass.async_add_executor_job(history.close)
+
+
+async def async_setup_domain_data(hass):
+    """Create the objects shared by all config entries, if not done yet."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if "orchestrator" not in domain_data:
+        domain_data["orchestrator"] = RefreshOrchestrator(hass)
+    if "tracking_index" not in domain_data:
+        domain_data["tracking_index"] = TrackingNumberIndex()
+    if "circuit_breakers" not in domain_data:
+        domain_data["circuit_breakers"] = CircuitBreakerRegistry()
+    if "parcel_index" not in domain_data:
+        domain_data["parcel_index"] = ParcelIndex()
+
+    if "history" not in domain_data:
+        history = ParcelHistoryStore(hass.config.path(f"{DOMAIN}.db"))
+        await hass.async_add_executor_job(history.open)
+        domain_data["history"] = history
+
+        async def async_compact_history(now=None):
+            """Purge expired history of every entry and compact the database."""
+            for value in list(hass.data.get(DOMAIN, {}).values()):
+                if isinstance(value, ParcelTrackingCoordinator):
+                    retention = int(value.entry.options.get(
+                        'history_retention', value.entry.data.get('history_retention', DEFAULT_RETENTION_DAYS)
+                    ))
+                    await hass.async_add_executor_job(history.purge, value.entry.entry_id, retention)
+            await hass.async_add_executor_job(history.compact)
+
+        domain_data["history_unsub"] = async_track_time_interval(
+            hass, async_compact_history, HISTORY_COMPACTION_INTERVAL
+        )
+
+
+async def async_unload_domain_data(hass):
+    """Release the objects shared by all config entries."""
+    domain_data = hass.data.get(DOMAIN, {})
+    orchestrator = domain_data.pop("orchestrator", None)
+    if orchestrator is not None:
+        await orchestrator.async_shutdown()
+    domain_data.pop("tracking_index", None)
+    domain_data.pop("circuit_breakers", None)
+    domain_data.pop("parcel_index", None)
+
+    unsub = domain_data.pop("history_unsub", None)
+    if unsub:
+        unsub()
+    history = domain_data.pop("history", None)
+    if history is not None:
+        await hass.async_add_executor_job(history.close)
+
+
 async def async_reload_entry(hass, entry):
     """Reload config entry when options are updated."""
     await async_unload_entry(hass, entry)
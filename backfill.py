@@ -0,0 +1,336 @@
+# custom_components/parcel_tracking_info/backfill.py
+
+import asyncio
+import contextlib
+import functools
+import logging
+import time
+from datetime import datetime
+
+from homeassistant.helpers.storage import Store
+
+from .carriers import get_search_template
+from .checksums import get_validators
+from .const import DOMAIN
+from .deadline import Deadline, IMAP_TIMEOUT
+from .history import DEFAULT_RETENTION_DAYS
+from .mailboxes import account_key, get_accounts, quote_folder, set_imap_timeout
+from .parcel_tracking import (
+    DEFAULT_MAX_IN_FLIGHT_BYTES,
+    build_tracking_info,
+    get_imap_connection,
+    get_uidvalidity,
+    iter_messages,
+    logout_quietly,
+    search_new_uids,
+)
+from .rules import get_evaluation_plan
+from .search import compile_search_criteria, get_capabilities
+
+_LOGGER = logging.getLogger(__name__)
+
+BACKFILL_STORAGE_VERSION = 1
+# Default number of days of mail read by a backfill
+DEFAULT_BACKFILL_DAYS = 365
+# Default number of messages read per chunk (one IMAP session each)
+DEFAULT_CHUNK_SIZE = 50
+# Default pause (in seconds) between two chunks
+DEFAULT_CHUNK_PAUSE = 5
+# Consecutive timeouts of a single-message chunk before that message is skipped
+MAX_SINGLE_MESSAGE_TIMEOUTS = 3
+
+STATE_RUNNING = "running"
+STATE_COMPLETED = "completed"
+STATE_CANCELLED = "cancelled"
+STATE_FAILED = "failed"
+
+
+def get_uidnext(mail):
+    """Return the UIDNEXT reported when the folder was selected, if any."""
+    _, data = mail.response("UIDNEXT")
+    try:
+        return int(data[0])
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+def get_highest_uid(mail):
+    """Return the highest UID of the selected folder (0 if it is empty), for servers not reporting UIDNEXT."""
+    status, data = mail.uid("SEARCH", None, "UID *")
+    uids = (data[0] or b"").split() if status == "OK" and data else []
+    return max((int(uid) for uid in uids), default=0)
+
+
+class BackfillJob:
+    """Reads the mail history of a config entry into the parcel history, a chunk at a time.
+
+    Meant for rebuilding a long history (e.g. a year) without making a
+    refresh download all of it at once. The folders of every IMAP account
+    are walked from the newest message to the oldest within ``days``, in
+    chunks of ``chunk_size`` messages with a pause in between. Each chunk
+    opens its own IMAP session, without the coordinator's lock, and is bounded
+    by the refresh deadline, so regular refreshes keep running meanwhile. The
+    parcels found are written to the history store (without replacing what
+    newer mail said) and merged into the coordinator's parcels if they fall
+    within ``email_age``.
+
+    The position in each folder is checkpointed to a Store after every
+    chunk. A job interrupted by a restart or an unload resumes from there
+    when the entry is set up again.
+    """
+
+    def __init__(self, hass, coordinator):
+        """Initialize the job."""
+        self.hass = hass
+        self.coordinator = coordinator
+        self._store = Store(hass, BACKFILL_STORAGE_VERSION, f"{DOMAIN}.backfill.{coordinator.entry.entry_id}")
+        self._checkpoint = None
+        self._task = None
+
+    @property
+    def running(self):
+        """Return True while the job is reading mail."""
+        return self._task is not None and not self._task.done()
+
+    @property
+    def stats(self):
+        """Return the progress of the last (or current) backfill."""
+        checkpoint = self._checkpoint or {}
+        return {
+            "state": checkpoint.get("state"),
+            "running": self.running,
+            "days": checkpoint.get("days"),
+            "chunk_size": checkpoint.get("chunk_size"),
+            "folders_done": sum(1 for folder in checkpoint.get("folders", {}).values() if folder.get("done")),
+            "folders": len(checkpoint.get("folders", {})),
+            "chunks": checkpoint.get("chunks", 0),
+            "parcels_found": len(checkpoint.get("found", [])),
+            "messages_skipped": checkpoint.get("skipped", 0),
+            "started_at": checkpoint.get("started_at"),
+            "last_error": checkpoint.get("last_error"),
+        }
+
+    def start(self, days=DEFAULT_BACKFILL_DAYS, chunk_size=DEFAULT_CHUNK_SIZE, pause=DEFAULT_CHUNK_PAUSE):
+        """Start a backfill; a cancelled or failed one over the same ``days`` continues from its checkpoint."""
+        if self.running:
+            raise RuntimeError("A backfill is already running.")
+        checkpoint = self._checkpoint
+        if checkpoint and checkpoint.get("state") in (STATE_CANCELLED, STATE_FAILED) and checkpoint.get("days") == days:
+            # Continue where the stopped backfill left off
+            _LOGGER.info("Continuing the %s backfill of %s.", checkpoint['state'], self.coordinator.entry.title)
+            checkpoint.update({"state": STATE_RUNNING, "chunk_size": chunk_size, "pause": pause, "last_error": None})
+            self._start_task()
+            return
+        retention = int(self.coordinator.entry.options.get(
+            'history_retention', self.coordinator.entry.data.get('history_retention', DEFAULT_RETENTION_DAYS)
+        ))
+        if days > retention:
+            _LOGGER.warning(
+                "Backfilling %s days of %s, but the history only keeps %s days; "
+                "raise History Retention to keep the older parcels.",
+                days, self.coordinator.entry.title, retention,
+            )
+        self._checkpoint = {
+            "state": STATE_RUNNING,
+            "days": days,
+            "cutoff": time.time() - days * 86400,
+            "chunk_size": chunk_size,
+            "pause": pause,
+            "folders": {},
+            "found": set(),
+            "chunks": 0,
+            "started_at": time.time(),
+            "last_error": None,
+        }
+        self._start_task()
+
+    async def async_resume(self):
+        """Continue a backfill that was interrupted, if there is one."""
+        try:
+            checkpoint = await self._store.async_load()
+        except Exception as e:
+            _LOGGER.warning("Could not load backfill checkpoint: %s", e)
+            return
+        if checkpoint:
+            # Stored as a list
+            checkpoint["found"] = set(checkpoint.get("found", ()))
+        self._checkpoint = checkpoint
+        if checkpoint and checkpoint.get("state") == STATE_RUNNING and not self.running:
+            _LOGGER.info("Resuming the backfill of %s.", self.coordinator.entry.title)
+            self._start_task()
+
+    async def async_cancel(self):
+        """Stop a running backfill, keeping its checkpoint."""
+        if self.running:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+        if self._checkpoint and self._checkpoint.get("state") == STATE_RUNNING:
+            self._checkpoint["state"] = STATE_CANCELLED
+            await self._async_save()
+
+    async def async_remove(self):
+        """Delete the checkpoint of this entry."""
+        await self._store.async_remove()
+
+    async def _async_save(self):
+        """Save the checkpoint; the set of numbers found is stored as a list."""
+        await self._store.async_save({**self._checkpoint, "found": sorted(self._checkpoint["found"])})
+
+    def _start_task(self):
+        # Cancelled with the config entry on unload; the checkpoint stays "running" and is resumed on setup
+        self._task = self.coordinator.entry.async_create_background_task(
+            self.hass, self._async_run(), f"{DOMAIN} backfill {self.coordinator.entry.title}"
+        )
+
+    async def _async_run(self):
+        checkpoint = self._checkpoint
+        try:
+            for account in get_accounts(self.coordinator.entry):
+                for folder in account["folders"]:
+                    key = f"{account_key(account)}/{folder}"
+                    folder_state = checkpoint["folders"].setdefault(key, {"uidvalidity": None, "cursor": None})
+                    while not folder_state.get("done"):
+                        await self._async_read_chunk(account, folder, folder_state)
+                        checkpoint["chunks"] += 1
+                        await self._async_save()
+                        if not folder_state.get("done"):
+                            await asyncio.sleep(checkpoint["pause"])
+            checkpoint["state"] = STATE_COMPLETED
+            _LOGGER.info(
+                "Backfill of %s completed, %s parcels found in %s chunks.",
+                self.coordinator.entry.title, len(checkpoint['found']), checkpoint['chunks'],
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            _LOGGER.error("Backfill of %s failed: %s", self.coordinator.entry.title, e)
+            checkpoint["state"] = STATE_FAILED
+            checkpoint["last_error"] = str(e)
+        await self._async_save()
+        # Show the merged parcels (and fire their events) with a regular refresh
+        await self.coordinator.async_request_refresh()
+
+    async def _async_read_chunk(self, account, folder, folder_state):
+        """Read the next ``chunk_size`` messages of a folder, older than its cursor, and advance the cursor.
+
+        The SEARCH only covers a window of ``span`` UIDs below the cursor. The
+        window grows while it holds fewer matching messages than a chunk, so
+        sparse folders are walked in a few searches, and shrinks again while it
+        holds far more.
+        """
+        checkpoint = self._checkpoint
+        chunk_size = checkpoint["chunk_size"]
+        coordinator = self.coordinator
+        entry = coordinator.entry
+        carrier = coordinator.carrier
+        search_criteria = entry.options.get(
+            "search_criteria", entry.data.get("search_criteria", f'(FROM "{carrier}")')
+        )
+        tracking_pattern = entry.options.get("tracking_pattern", entry.data.get("tracking_pattern", r""))
+        email_parsing = coordinator.email_parsing
+        validators = get_validators(carrier)
+        # Numbers found in newer mail are not taken from older mail again
+        processed_tracking_numbers = set(checkpoint["found"])
+        deadline = Deadline(coordinator.refresh_timeout)
+        tracking_numbers = []
+        mail = None
+
+        # Its own IMAP session: regular refreshes of the entry are not held up by the backfill
+        try:
+            mail = await self.hass.async_add_executor_job(
+                get_imap_connection, account["host"], account["port"], account["email"], account["password"],
+                deadline.timeout(IMAP_TIMEOUT),
+            )
+            examine_folder = functools.partial(mail.select, quote_folder(folder), readonly=True)
+            status, _ = await self.hass.async_add_executor_job(examine_folder)
+            if status != "OK":
+                _LOGGER.warning("Backfill could not select folder '%s', skipping it.", folder)
+                folder_state["done"] = True
+                return
+            uidvalidity = get_uidvalidity(mail)
+            if folder_state["uidvalidity"] != uidvalidity:
+                # The UIDs were renumbered: walk the folder again from the newest message
+                folder_state.update({"uidvalidity": uidvalidity, "cursor": None, "span": chunk_size})
+
+            cursor = folder_state["cursor"]
+            if cursor is None:
+                cursor = get_uidnext(mail) or await self.hass.async_add_executor_job(get_highest_uid, mail) + 1
+            if cursor <= 1:
+                folder_state["done"] = True
+                return
+            span = folder_state.get("span") or chunk_size
+            low = max(1, cursor - span)
+            date_cutoff = datetime.fromtimestamp(checkpoint["cutoff"]).strftime("%d-%b-%Y")
+            criteria = compile_search_criteria(
+                search_criteria, date_cutoff, get_capabilities(mail), get_search_template(carrier, search_criteria),
+                uid_set=f"{low}:{cursor - 1}",
+            )
+            set_imap_timeout(mail, deadline.timeout(IMAP_TIMEOUT))
+            email_uids = await search_new_uids(self.hass, mail, folder, criteria)
+            chunk = email_uids[:chunk_size]
+
+            if chunk:
+                pipeline = iter_messages(
+                    self.hass, mail, chunk, tracking_pattern, processed_tracking_numbers, validators,
+                    max_in_flight_bytes=DEFAULT_MAX_IN_FLIGHT_BYTES,
+                    plan=get_evaluation_plan(tracking_pattern, email_parsing), deadline=deadline,
+                )
+                async with contextlib.aclosing(pipeline):
+                    async for parsed in pipeline:
+                        if not parsed["found"]:
+                            continue
+                        found = await build_tracking_info(
+                            self.hass, parsed, carrier, validators, email_parsing,
+                        )
+                        tracking_numbers.append((parsed["timestamp"], found))
+                        parsed = None
+        finally:
+            if mail is not None:
+                set_imap_timeout(mail, IMAP_TIMEOUT)
+                await self.hass.async_add_executor_job(logout_quietly, mail)
+
+        await self._async_store_parcels(tracking_numbers)
+        if "message_fetch" in deadline.truncated and chunk_size > 1:
+            # Not every message of the chunk was read: read it again in smaller chunks
+            checkpoint["chunk_size"] = max(1, chunk_size // 2)
+            _LOGGER.debug("Backfill chunk ran out of time, reducing the chunk size to %d.", checkpoint["chunk_size"])
+            return
+        if "message_fetch" in deadline.truncated:
+            # A single message that keeps running out of time would be retried forever
+            folder_state["timeouts"] = folder_state.get("timeouts", 0) + 1
+            if folder_state["timeouts"] < MAX_SINGLE_MESSAGE_TIMEOUTS:
+                return
+            _LOGGER.warning(
+                "Backfill skips message UID %s of folder '%s', it could not be read within the refresh time limit.",
+                int(chunk[0]), folder,
+            )
+            checkpoint["skipped"] = checkpoint.get("skipped", 0) + 1
+        folder_state["timeouts"] = 0
+        if len(email_uids) > chunk_size:
+            # The rest of the window is read by the next chunk
+            folder_state["cursor"] = min(int(uid) for uid in chunk)
+            if len(email_uids) > 2 * chunk_size:
+                folder_state["span"] = max(chunk_size, span // 2)
+        else:
+            folder_state["cursor"] = low
+            if len(email_uids) < chunk_size:
+                folder_state["span"] = span * 2
+        if folder_state["cursor"] <= 1:
+            folder_state["done"] = True
+
+    async def _async_store_parcels(self, tracking_numbers):
+        """Write the parcels of a chunk to the history and merge the recent ones into the coordinator."""
+        coordinator = self.coordinator
+        history = self.hass.data.get(DOMAIN, {}).get("history")
+        for timestamp, parcels in tracking_numbers:
+            if history is not None:
+                await self.hass.async_add_executor_job(
+                    functools.partial(
+                        history.record, coordinator.entry.entry_id, coordinator.carrier, parcels, "email",
+                        observed_at=timestamp, keep_newer=True,
+                    )
+                )
+            # A chunk interrupted before its checkpoint was saved is read again
+            self._checkpoint["found"].update(tracking["tracking_number"] for tracking in parcels)
+            coordinator.merge_parcels(parcels)
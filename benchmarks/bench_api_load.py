@@ -0,0 +1,161 @@
+# custom_components/parcel_tracking_info/benchmarks/bench_api_load.py
+
+"""Load-test the coordinator's API path against the mock carrier API.
+
+Client calls are timed per HTTP request of the carrier API classes, so a
+batched carrier (GLS) shows fewer, larger calls than a per-number one.
+
+Example:
+    python benchmarks/bench_api_load.py --parcels 300 --refreshes 3 --latency-ms 120 --error-rate 0.05
+    python benchmarks/bench_api_load.py --carrier gls --parcels 300
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import statistics
+import time
+from types import SimpleNamespace
+
+import aiohttp
+
+from common import BenchHass, environment, load_component_module, write_results
+from corpus import dhl_number, dpd_number, gls_number, hermes_number
+from mock_carrier_api import MockCarrierApi, MockCarrierApiServer
+
+coordinator_module = load_component_module("coordinator")
+carrier_apis = load_component_module("carrier_apis")
+circuit_breaker = load_component_module("circuit_breaker")
+const = load_component_module("const")
+instrumentation = load_component_module("instrumentation")
+
+# Tracking number generator and mock endpoint per carrier
+CARRIER_ENDPOINTS = {
+    "dhl": (dhl_number, "/track/shipments"),
+    "gls": (gls_number, "/gls/rstt001"),
+    "hermes": (hermes_number, "/hermes/parceldetails"),
+    "dpd": (dpd_number, "/dpd/plc/de_DE"),
+}
+
+
+def percentile(samples, fraction):
+    """Return the given percentile (0..1) of a list of samples, in milliseconds."""
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return round(ordered[index] * 1000, 3)
+
+
+def make_hass():
+    """Return a hass stub holding the circuit breakers shared by all refreshes, as set up by the integration."""
+    hass = BenchHass()
+    hass.data[const.DOMAIN] = {"circuit_breakers": circuit_breaker.CircuitBreakerRegistry()}
+    return hass
+
+
+def make_coordinator(hass, tracking_numbers):
+    """Return a coordinator carrying only the state used by fetch_tracking_info."""
+    coordinator = object.__new__(coordinator_module.ParcelTrackingCoordinator)
+    coordinator.hass = hass
+    # Default breaker options
+    coordinator.entry = SimpleNamespace(options={}, data={})
+    coordinator.metrics = instrumentation.RefreshMetrics()
+    coordinator.tracking_data = [
+        {"tracking_number": number, "status_code": "unknown", "eta": "N/A", "service_url": "N/A"}
+        for number in tracking_numbers
+    ]
+    return coordinator
+
+
+async def run(args):
+    rng = random.Random(args.seed)
+    generate_number, endpoint = CARRIER_ENDPOINTS[args.carrier]
+    tracking_numbers = [generate_number(rng) for _ in range(args.parcels)]
+    api = MockCarrierApi(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        api_key="bench-key",
+        seed=args.seed,
+    )
+
+    # Time every HTTP request made by the carrier API classes
+    call_latencies = []
+    original_get_json = carrier_apis.BaseCarrierAPI._get_json
+    original_get_session = coordinator_module.async_get_clientsession
+
+    async def timed_get_json(self, *get_args, **get_kwargs):
+        start = time.perf_counter()
+        try:
+            return await original_get_json(self, *get_args, **get_kwargs)
+        finally:
+            call_latencies.append(time.perf_counter() - start)
+
+    carrier_apis.BaseCarrierAPI._get_json = timed_get_json
+    refreshes = []
+    hass = make_hass()
+    try:
+        async with MockCarrierApiServer(api) as server, aiohttp.ClientSession() as session:
+            # The coordinator shares Home Assistant's session; use one session per run instead
+            coordinator_module.async_get_clientsession = lambda hass: session
+            api_url = f"{server.url}{endpoint}"
+            for _ in range(args.refreshes):
+                api.reset_stats()
+                call_latencies.clear()
+                coordinator = make_coordinator(hass, tracking_numbers)
+                start = time.perf_counter()
+                await coordinator.fetch_tracking_info("bench-key", api_url, args.carrier, args.carrier)
+                duration = time.perf_counter() - start
+                refreshes.append({
+                    "duration_ms": round(duration * 1000, 3),
+                    "api_calls": sum(api.stats["requests"].values()),
+                    "client_calls": len(call_latencies),
+                    "counted_api_calls": coordinator.metrics.counters.get("api_calls", 0),
+                    "call_p50_ms": percentile(call_latencies, 0.5) if call_latencies else None,
+                    "call_p95_ms": percentile(call_latencies, 0.95) if call_latencies else None,
+                    "responses": api.stats["responses"],
+                    "max_in_flight": api.stats["max_in_flight"],
+                    "parcels_with_status": sum(
+                        1 for tracking in coordinator.tracking_data if tracking.get("status_code") != "unknown"
+                    ),
+                })
+    finally:
+        carrier_apis.BaseCarrierAPI._get_json = original_get_json
+        coordinator_module.async_get_clientsession = original_get_session
+
+    durations = [refresh["duration_ms"] / 1000 for refresh in refreshes]
+    return {
+        "benchmark": "api_load",
+        "environment": environment(),
+        "parameters": vars(args),
+        "refresh_p50_ms": percentile(durations, 0.5),
+        "refresh_p95_ms": percentile(durations, 0.95),
+        "api_calls_per_refresh": statistics.mean(refresh["api_calls"] for refresh in refreshes),
+        "refreshes": refreshes,
+        "circuit_breakers": hass.data[const.DOMAIN]["circuit_breakers"].stats,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--carrier", default="dhl", choices=list(CARRIER_ENDPOINTS))
+    parser.add_argument("--parcels", type=int, default=200)
+    parser.add_argument("--refreshes", type=int, default=3)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--jitter-ms", type=float, default=20)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON results to this file instead of stdout")
+    parser.add_argument("--log-level", default="CRITICAL", help="log level of the integration while benchmarking")
+    args = parser.parse_args()
+    logging.basicConfig(level=args.log_level.upper())
+
+    output = args.output
+    del args.output, args.log_level
+    write_results(asyncio.run(run(args)), output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+# custom_components/parcel_tracking_info/benchmarks/bench_jmap.py
+
+"""Benchmark fetch_jmap_emails against the fake JMAP server, with the same corpus read over IMAP as a baseline.
+
+Both servers add the same latency to every HTTP request and IMAP command, so
+the round trips the two protocols need show up in the timings.
+
+Example:
+    python benchmarks/bench_jmap.py --messages 1000 --latency-ms 40 --runs 3 --output jmap.json
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+
+import aiohttp
+
+from bench_refresh import carrier_settings, run_end_to_end, search_template, EMAIL_AGE, PASSWORD, USERNAME
+from common import BenchHass, environment, load_component_module, plain_imap, summarize, write_results
+from corpus import CARRIERS, generate_corpus
+from fake_imap import FakeImapServer, FakeImapState
+from fake_jmap import FakeJmapServer, FakeJmapState
+
+parcel_tracking = load_component_module("parcel_tracking")
+jmap = load_component_module("jmap")
+checksums = load_component_module("checksums")
+
+
+async def run_jmap(source, carrier, source_state=None):
+    """Run fetch_jmap_emails once for a carrier and return the tracking data."""
+    search_criteria, tracking_pattern, email_parsing = carrier_settings(carrier)
+    return await parcel_tracking.fetch_jmap_emails(
+        BenchHass(),
+        source,
+        search_criteria,
+        tracking_pattern,
+        set(),
+        email_parsing,
+        email_age=EMAIL_AGE,
+        carrier=carrier,
+        raise_errors=True,
+        validators=checksums.get_validators(carrier),
+        search_template=search_template(carrier, True),
+        source_state=source_state,
+    )
+
+
+def imap_commands(imap_state):
+    return sum(imap_state.commands.values())
+
+
+def jmap_requests(jmap_state):
+    return sum(jmap_state.requests.values())
+
+
+async def measure(runs, factory, counter):
+    """Await the coroutine returned by ``factory`` ``runs`` times; return durations, round trips and the last result."""
+    samples = []
+    round_trips = []
+    result = []
+    for _ in range(runs):
+        before = counter()
+        start = time.perf_counter()
+        result = await factory()
+        samples.append(time.perf_counter() - start)
+        round_trips.append(counter() - before)
+    return samples, round_trips, result
+
+
+async def bench_carrier(args, carrier, imap_server, imap_state, jmap_server, jmap_state, session, corpus, new_mail):
+    """Time full and incremental refreshes of one carrier over IMAP and JMAP."""
+    expected = {number for mail_carrier, _, numbers in corpus if mail_carrier == carrier for number in numbers}
+    results = {"tracking_numbers_expected": len(expected)}
+
+    def new_source():
+        return jmap.JmapMailSource(jmap_server.session_url, jmap_state.token, session, "inbox")
+
+    async def full_imap():
+        return await run_end_to_end(imap_server.port, carrier)
+
+    async def full_jmap():
+        return await run_jmap(new_source(), carrier)
+
+    samples, commands, found = await measure(args.runs, full_imap, lambda: imap_commands(imap_state))
+    results["imap"] = {
+        "full_refresh": summarize(samples),
+        "round_trips": max(commands),
+        "tracking_numbers_found": len({tracking["tracking_number"] for tracking in found} & expected),
+    }
+    samples, requests, found = await measure(args.runs, full_jmap, lambda: jmap_requests(jmap_state))
+    results["jmap"] = {
+        "full_refresh": summarize(samples),
+        "round_trips": max(requests),
+        "tracking_numbers_found": len({tracking["tracking_number"] for tracking in found} & expected),
+    }
+
+    # Incremental refreshes: a few new mails arrive between two refreshes
+    uid_state = {}
+    await run_end_to_end(imap_server.port, carrier, uid_state=uid_state)
+    jmap_source = new_source()
+    source_state = {}
+    await run_jmap(jmap_source, carrier, source_state)
+    imap_samples, jmap_samples, imap_trips, jmap_trips = [], [], [], []
+    for _ in range(args.runs):
+        for _, raw, _ in next(new_mail):
+            imap_state.mailbox("INBOX").append(raw)
+            jmap_state.append(raw)
+        samples, commands, _ = await measure(
+            1, lambda: run_end_to_end(imap_server.port, carrier, uid_state=uid_state), lambda: imap_commands(imap_state)
+        )
+        imap_samples += samples
+        imap_trips += commands
+        samples, requests, _ = await measure(
+            1, lambda: run_jmap(jmap_source, carrier, source_state), lambda: jmap_requests(jmap_state)
+        )
+        jmap_samples += samples
+        jmap_trips += requests
+    results["imap"]["incremental_refresh"] = summarize(imap_samples)
+    results["imap"]["incremental_round_trips"] = max(imap_trips)
+    results["jmap"]["incremental_refresh"] = summarize(jmap_samples)
+    results["jmap"]["incremental_round_trips"] = max(jmap_trips)
+    return results
+
+
+async def run_benchmark(args, corpus, new_mail, results):
+    imap_state = FakeImapState(USERNAME, PASSWORD)
+    imap_state.delay = args.latency_ms / 1000
+    jmap_state = FakeJmapState()
+    jmap_state.delay = args.latency_ms / 1000
+    for _, raw, _ in corpus:
+        imap_state.mailbox("INBOX").append(raw)
+        jmap_state.append(raw)
+
+    with plain_imap(), FakeImapServer(imap_state) as imap_server:
+        async with FakeJmapServer(jmap_state) as jmap_server, aiohttp.ClientSession() as session:
+            for carrier in args.carriers:
+                results["carriers"][carrier] = await bench_carrier(
+                    args, carrier, imap_server, imap_state, jmap_server, jmap_state, session, corpus, new_mail,
+                )
+    results["jmap_server"] = jmap_state.stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=1000, help="number of mails in the mailbox")
+    parser.add_argument("--new-messages", type=int, default=5, help="mails arriving before each incremental refresh")
+    parser.add_argument("--latency-ms", type=float, default=20, help="latency added to every request and command")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the corpus generator")
+    parser.add_argument("--runs", type=int, default=3, help="repetitions per measurement")
+    parser.add_argument("--carriers", nargs="+", default=list(CARRIERS), choices=list(CARRIERS))
+    parser.add_argument("--output", help="write the JSON results to this file instead of stdout")
+    parser.add_argument("--log-level", default="ERROR", help="log level of the integration while benchmarking")
+    args = parser.parse_args()
+    logging.basicConfig(level=args.log_level.upper())
+
+    corpus = generate_corpus(args.messages, seed=args.seed, carriers=args.carriers)
+    new_mail = [
+        generate_corpus(args.new_messages, seed=args.seed + 1 + run, carriers=args.carriers)
+        for run in range(args.runs * len(args.carriers))
+    ]
+    results = {
+        "benchmark": "jmap",
+        "environment": environment(),
+        "parameters": {
+            "messages": args.messages,
+            "new_messages": args.new_messages,
+            "latency_ms": args.latency_ms,
+            "seed": args.seed,
+            "runs": args.runs,
+            "carriers": args.carriers,
+        },
+        "carriers": {},
+    }
+    asyncio.run(run_benchmark(args, corpus, iter(new_mail), results))
+    write_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+# custom_components/parcel_tracking_info/benchmarks/bench_local.py
+
+"""Benchmark fetch_local_emails on a synthetic Maildir, mbox file and .eml directory.
+
+The same corpus is also read over IMAP from the fake IMAP server as a baseline.
+
+Example:
+    python benchmarks/bench_local.py --messages 2000 --runs 3 --output local.json
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import time
+
+from bench_refresh import carrier_settings, run_end_to_end, search_template, EMAIL_AGE, PASSWORD, USERNAME
+from common import BenchHass, environment, load_component_module, plain_imap, summarize, write_results
+from corpus import CARRIERS, generate_corpus
+from fake_imap import FakeImapServer, FakeImapState
+
+parcel_tracking = load_component_module("parcel_tracking")
+mail_sources = load_component_module("mail_sources")
+checksums = load_component_module("checksums")
+
+
+def write_sources(directory, corpus):
+    """Write the corpus as a Maildir, an mbox file and an .eml directory, returning their paths."""
+    maildir = os.path.join(directory, "Maildir")
+    for subdir in ("new", "cur", "tmp"):
+        os.makedirs(os.path.join(maildir, subdir))
+    eml_dir = os.path.join(directory, "export")
+    os.makedirs(eml_dir)
+    mbox = os.path.join(directory, "mbox")
+    with open(mbox, "wb") as mbox_file:
+        for index, (_, raw, _) in enumerate(corpus):
+            with open(os.path.join(maildir, "new", f"{index}.bench:2,"), "wb") as message_file:
+                message_file.write(raw)
+            with open(os.path.join(eml_dir, f"{index}.eml"), "wb") as message_file:
+                message_file.write(raw)
+            mbox_file.write(b"From bench@example.com Thu Jan  1 00:00:00 2026\n")
+            mbox_file.write(raw.replace(b"\r\n", b"\n").replace(b"\nFrom ", b"\n>From "))
+            mbox_file.write(b"\n")
+    return {
+        mail_sources.SOURCE_MAILDIR: maildir,
+        mail_sources.SOURCE_MBOX: mbox,
+        mail_sources.SOURCE_EML: eml_dir,
+    }
+
+
+async def run_local(path, carrier, source_state=None):
+    """Run fetch_local_emails once for a carrier and return the tracking data."""
+    search_criteria, tracking_pattern, email_parsing = carrier_settings(carrier)
+    return await parcel_tracking.fetch_local_emails(
+        BenchHass(),
+        mail_sources.LocalMailSource(path),
+        tracking_pattern,
+        set(),
+        email_parsing,
+        email_age=EMAIL_AGE,
+        carrier=carrier,
+        raise_errors=True,
+        validators=checksums.get_validators(carrier),
+        search_template=search_template(carrier, True),
+        source_state=source_state,
+    )
+
+
+def timed(runs, factory):
+    """Run the coroutine returned by ``factory`` ``runs`` times, returning the durations and the last result."""
+    samples = []
+    result = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = asyncio.run(factory())
+        samples.append(time.perf_counter() - start)
+    return samples, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=1000, help="number of mails in the mailbox")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the corpus generator")
+    parser.add_argument("--runs", type=int, default=3, help="repetitions per measurement")
+    parser.add_argument("--carriers", nargs="+", default=list(CARRIERS), choices=list(CARRIERS))
+    parser.add_argument("--output", help="write the JSON results to this file instead of stdout")
+    parser.add_argument("--log-level", default="ERROR", help="log level of the integration while benchmarking")
+    args = parser.parse_args()
+    logging.basicConfig(level=args.log_level.upper())
+
+    corpus = generate_corpus(args.messages, seed=args.seed, carriers=args.carriers)
+    state = FakeImapState(USERNAME, PASSWORD)
+    for _, raw, _ in corpus:
+        state.mailbox("INBOX").append(raw)
+
+    results = {
+        "benchmark": "local",
+        "environment": environment(),
+        "parameters": {
+            "messages": args.messages,
+            "seed": args.seed,
+            "runs": args.runs,
+            "carriers": args.carriers,
+            "corpus_bytes": sum(len(raw) for _, raw, _ in corpus),
+        },
+        "carriers": {},
+    }
+
+    with tempfile.TemporaryDirectory() as directory, plain_imap(), FakeImapServer(state) as server:
+        paths = write_sources(directory, corpus)
+        for carrier in args.carriers:
+            expected = {number for mail_carrier, _, numbers in corpus if mail_carrier == carrier for number in numbers}
+            carrier_results = {"tracking_numbers_expected": len(expected)}
+
+            samples, found = timed(args.runs, lambda: run_end_to_end(server.port, carrier))
+            carrier_results["imap"] = {
+                "full_refresh": summarize(samples),
+                "tracking_numbers_found": len({tracking["tracking_number"] for tracking in found} & expected),
+            }
+            for source_type, path in paths.items():
+                samples, found = timed(args.runs, lambda: run_local(path, carrier))
+                # A refresh after the first one only stats the files (or the mbox size)
+                source_state = {}
+                asyncio.run(run_local(path, carrier, source_state))
+                incremental, _ = timed(args.runs, lambda: run_local(path, carrier, source_state))
+                carrier_results[source_type] = {
+                    "full_refresh": summarize(samples),
+                    "incremental_refresh": summarize(incremental),
+                    "tracking_numbers_found": len({tracking["tracking_number"] for tracking in found} & expected),
+                }
+            results["carriers"][carrier] = carrier_results
+
+    write_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+# custom_components/parcel_tracking_info/benchmarks/bench_memory.py
+
+"""Measure the memory used by fetch_emails for growing mailboxes.
+
+Each mailbox size is served by a fake IMAP server in its own process and read
+by a fresh client process, so the reported peak RSS belongs to the refresh
+alone. With the streaming pipeline the peak should stay flat as the mailbox grows.
+
+Example:
+    python benchmarks/bench_memory.py --messages 200 1000 3000 --attachment-bytes 200000 --max-in-flight-mb 4
+"""
+
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import resource
+import time
+import tracemalloc
+
+from common import BenchHass, environment, load_component_module, plain_imap, write_results
+from corpus import generate_corpus
+from fake_imap import FakeImapServer, FakeImapState
+
+USERNAME = "bench@example.com"
+PASSWORD = "secret"
+CARRIER = "dhl"
+
+
+def serve(messages, seed, attachment_ratio, attachment_bytes, ports, stop):
+    """Serve a generated mailbox until ``stop`` is set (runs in a child process)."""
+    state = FakeImapState(USERNAME, PASSWORD)
+    corpus = generate_corpus(
+        messages, seed=seed, carriers=[CARRIER], attachment_ratio=attachment_ratio, attachment_bytes=attachment_bytes
+    )
+    for _, raw, _ in corpus:
+        state.mailbox("INBOX").append(raw)
+    expected = len({number for _, _, numbers in corpus for number in numbers})
+    corpus_bytes = sum(len(raw) for _, raw, _ in corpus)
+    del corpus
+    with FakeImapServer(state) as server:
+        ports.put((server.port, expected, corpus_bytes))
+        stop.wait()
+
+
+def measure(port, max_in_flight_bytes, log_level, results):
+    """Run one refresh against the server and report its memory use (runs in a child process)."""
+    logging.basicConfig(level=log_level)
+    parcel_tracking = load_component_module("parcel_tracking")
+    carriers = load_component_module("carriers")
+    checksums = load_component_module("checksums")
+    template = carriers.get_carrier_template(CARRIER)
+    baseline_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    async def refresh():
+        return await parcel_tracking.fetch_emails(
+            BenchHass(),
+            "127.0.0.1",
+            port,
+            USERNAME,
+            PASSWORD,
+            "inbox",
+            template["search_criteria"],
+            template["tracking_pattern"],
+            set(),
+            asyncio.Lock(),
+            template["email_parsing"],
+            email_age=10,
+            carrier=CARRIER,
+            raise_errors=True,
+            validators=checksums.get_validators(CARRIER),
+            max_in_flight_bytes=max_in_flight_bytes,
+        )
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    with plain_imap():
+        found = asyncio.run(refresh())
+    duration = time.perf_counter() - start
+    _, peak_traced = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    results.put({
+        "duration_ms": round(duration * 1000, 3),
+        "peak_traced_mib": round(peak_traced / 1024 / 1024, 2),
+        "peak_rss_growth_mib": round(
+            (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline_rss_kb) / 1024, 2
+        ),
+        "tracking_numbers_found": len({tracking["tracking_number"] for tracking in found}),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, nargs="+", default=[200, 1000, 3000], help="mailbox sizes")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the corpus generator")
+    parser.add_argument("--attachment-ratio", type=float, default=0.3, help="share of mails with a PDF attachment")
+    parser.add_argument("--attachment-bytes", type=int, default=200000, help="size of the PDF attachments")
+    parser.add_argument("--max-in-flight-mb", type=float, default=8, help="byte budget of the fetch pipeline")
+    parser.add_argument("--output", help="write the JSON results to this file instead of stdout")
+    parser.add_argument("--log-level", default="ERROR", help="log level of the integration while benchmarking")
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    results = {
+        "benchmark": "memory",
+        "environment": environment(),
+        "parameters": {
+            "seed": args.seed,
+            "attachment_ratio": args.attachment_ratio,
+            "attachment_bytes": args.attachment_bytes,
+            "max_in_flight_mb": args.max_in_flight_mb,
+        },
+        "mailboxes": {},
+    }
+
+    for messages in args.messages:
+        ports, stop = context.Queue(), context.Event()
+        server = context.Process(
+            target=serve, args=(messages, args.seed, args.attachment_ratio, args.attachment_bytes, ports, stop)
+        )
+        server.start()
+        try:
+            port, expected, corpus_bytes = ports.get(timeout=600)
+            measurements = context.Queue()
+            client = context.Process(
+                target=measure,
+                args=(port, int(args.max_in_flight_mb * 1024 * 1024), args.log_level.upper(), measurements),
+            )
+            client.start()
+            measurement = measurements.get(timeout=3600)
+            client.join()
+        finally:
+            stop.set()
+            server.join()
+
+        results["mailboxes"][str(messages)] = {
+            "corpus_mib": round(corpus_bytes / 1024 / 1024, 2),
+            "tracking_numbers_expected": expected,
+            **measurement,
+        }
+
+    write_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+# custom_components/parcel_tracking_info/benchmarks/bench_refresh.py
+
+"""Benchmark fetch_emails against a synthetic mailbox served by the fake IMAP server.
+
+Example:
+    python benchmarks/bench_refresh.py --messages 500 --runs 5 --output refresh.json
+"""
+
+import argparse
+import asyncio
+import email
+import logging
+import time
+from datetime import datetime, timedelta
+
+from common import (
+    BenchHass,
+    StageTimer,
+    environment,
+    load_component_module,
+    plain_imap,
+    summarize,
+    write_results,
+)
+from corpus import CARRIERS, generate_corpus
+from fake_imap import FakeImapServer, FakeImapState
+
+parcel_tracking = load_component_module("parcel_tracking")
+carriers = load_component_module("carriers")
+checksums = load_component_module("checksums")
+delivery_date_normalization = load_component_module("delivery_date_normalization")
+search = load_component_module("search")
+rules = load_component_module("rules")
+
+USERNAME = "bench@example.com"
+PASSWORD = "secret"
+EMAIL_AGE = 10
+
+
+def carrier_settings(carrier):
+    """Return search criteria, tracking pattern and parsing rules from the carrier template."""
+    template = carriers.get_carrier_template(carrier)
+    return template["search_criteria"], template["tracking_pattern"], template["email_parsing"]
+
+
+def search_template(carrier, compiler):
+    """Return the search template passed to fetch_emails, or None to use the plain criteria."""
+    return carriers.get_search_template(carrier, carriers.get_carrier_template(carrier)["search_criteria"]) if compiler else None
+
+
+def run_stages(port, carrier, timer, compiler=True):
+    """Run the refresh stages one by one, timing each of them."""
+    search_criteria, tracking_pattern, email_parsing = carrier_settings(carrier)
+    validators = checksums.get_validators(carrier)
+    plan = rules.get_evaluation_plan(tracking_pattern, email_parsing)
+
+    with timer.stage("connect"):
+        mail = parcel_tracking.get_imap_connection("127.0.0.1", port, USERNAME, PASSWORD)
+        mail.select("inbox")
+
+    with timer.stage("search"):
+        date_cutoff = datetime.now() - timedelta(days=EMAIL_AGE)
+        criteria = search.compile_search_criteria(
+            search_criteria,
+            date_cutoff.strftime("%d-%b-%Y"),
+            search.get_capabilities(mail),
+            search_template(carrier, compiler),
+        )
+        _, messages = mail.uid("SEARCH", None, criteria)
+
+    found = []
+    for uid in messages[0].split()[::-1]:
+        with timer.stage("fetch"):
+            _, data = mail.uid("FETCH", uid, "(BODY.PEEK[])")
+        with timer.stage("mime_parse"):
+            msg = email.message_from_bytes(data[0][1])
+        with timer.stage("html_to_text"):
+            body = parcel_tracking.extract_email_body(msg)
+        with timer.stage("regex"):
+            items = parcel_tracking.extract_tracking_numbers(body, plan.tracking_regex, set(), validators)
+            raw_etas = []
+            if items:
+                scan = plan.scan(body)
+                for item in items:
+                    raw_eta = scan.find_eta(item["section_start"], item["section_end"]) or scan.find_eta()
+                    if raw_eta:
+                        raw_etas.append(raw_eta)
+                    scan.find_status(item["section_start"], item["section_end"])
+        with timer.stage("date_normalization"):
+            for raw_eta in raw_etas:
+                delivery_date_normalization.normalize_date(raw_eta)
+        found.extend(item["tracking_number"] for item in items)
+
+    mail.logout()
+    return found
+
+
+async def run_end_to_end(port, carrier, compiler=True, uid_state=None):
+    """Run fetch_emails once for a carrier and return the tracking data."""
+    search_criteria, tracking_pattern, email_parsing = carrier_settings(carrier)
+    return await parcel_tracking.fetch_emails(
+        BenchHass(),
+        "127.0.0.1",
+        port,
+        USERNAME,
+        PASSWORD,
+        "inbox",
+        search_criteria,
+        tracking_pattern,
+        set(),
+        asyncio.Lock(),
+        email_parsing,
+        email_age=EMAIL_AGE,
+        carrier=carrier,
+        raise_errors=True,
+        validators=checksums.get_validators(carrier),
+        search_template=search_template(carrier, compiler),
+        uid_state=uid_state,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=200, help="number of mails in the mailbox")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the corpus generator")
+    parser.add_argument("--runs", type=int, default=3, help="repetitions per measurement")
+    parser.add_argument("--carriers", nargs="+", default=list(CARRIERS), choices=list(CARRIERS))
+    parser.add_argument("--gmail", action="store_true", help="advertise X-GM-EXT-1 so X-GM-RAW searches are used")
+    parser.add_argument("--no-compiler", action="store_true", help="search with the plain template criteria")
+    parser.add_argument("--output", help="write the JSON results to this file instead of stdout")
+    parser.add_argument("--log-level", default="ERROR", help="log level of the integration while benchmarking")
+    args = parser.parse_args()
+    logging.basicConfig(level=args.log_level.upper())
+
+    state = FakeImapState(USERNAME, PASSWORD)
+    if args.gmail:
+        state.capabilities.append("X-GM-EXT-1")
+    compiler = not args.no_compiler
+    corpus = generate_corpus(args.messages, seed=args.seed, carriers=args.carriers)
+    for _, raw, _ in corpus:
+        state.mailbox("INBOX").append(raw)
+
+    results = {
+        "benchmark": "refresh",
+        "environment": environment(),
+        "parameters": {
+            "messages": args.messages,
+            "seed": args.seed,
+            "runs": args.runs,
+            "carriers": args.carriers,
+            "gmail": args.gmail,
+            "compiler": compiler,
+            "corpus_bytes": sum(len(raw) for _, raw, _ in corpus),
+        },
+        "carriers": {},
+    }
+
+    with plain_imap(), FakeImapServer(state) as server:
+        for carrier in args.carriers:
+            expected = {number for mail_carrier, _, numbers in corpus if mail_carrier == carrier for number in numbers}
+            end_to_end = []
+            stage_runs = []
+            found = []
+            for _ in range(args.runs):
+                start = time.perf_counter()
+                found = asyncio.run(run_end_to_end(server.port, carrier, compiler))
+                end_to_end.append(time.perf_counter() - start)
+
+                timer = StageTimer()
+                run_stages(server.port, carrier, timer, compiler)
+                stage_runs.append(timer.totals)
+
+            # Bytes sent by the server for a full refresh and for a following incremental one
+            uid_state = {}
+            wire = {}
+            for refresh in ("full", "incremental"):
+                bytes_before = state.bytes_sent
+                asyncio.run(run_end_to_end(server.port, carrier, compiler, uid_state))
+                wire[f"{refresh}_refresh_bytes"] = state.bytes_sent - bytes_before
+
+            results["carriers"][carrier] = {
+                "end_to_end": summarize(end_to_end),
+                "stages": {
+                    stage: summarize([run.get(stage, 0.0) for run in stage_runs])
+                    for stage in sorted({stage for run in stage_runs for stage in run})
+                },
+                "tracking_numbers_expected": len(expected),
+                "tracking_numbers_found": len({tracking["tracking_number"] for tracking in found} & expected),
+                **wire,
+            }
+
+    results["server"] = {"commands": dict(sorted(state.commands.items())), "bytes_sent": state.bytes_sent}
+    write_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+# custom_components/parcel_tracking_info/benchmarks/bench_rules.py
+
+"""Compare the compiled rule evaluation plan with the previous per-rule evaluation.
+
+Both variants extract the tracking numbers of each mail text and the raw ETA
+and status of every parcel (preferring the parcel's own section of the text).
+The legacy variant is the evaluation fetch_emails used before rules.py: a
+``.lower()`` copy of the text per lookup, ``find`` for the ETA anchor and a
+loop over the (duplicated) status strings. Date normalization is the same for
+both and left out. The script also checks that both variants agree.
+
+Example:
+    python benchmarks/bench_rules.py --messages 1000 --runs 5
+"""
+
+import argparse
+import email
+import re
+import time
+
+from common import environment, load_component_module, summarize, write_results
+from corpus import CARRIERS, generate_corpus
+
+parcel_tracking = load_component_module("parcel_tracking")
+carriers = load_component_module("carriers")
+rules = load_component_module("rules")
+
+
+def legacy_eta(text, eta_string, eta_pattern):
+    """The raw ETA lookup of the former extract_eta_from_email."""
+    if not eta_string or not eta_pattern:
+        return None
+    eta_index = text.lower().find(eta_string.lower())
+    if eta_index != -1:
+        match = re.search(eta_pattern, text[eta_index + len(eta_string):], re.IGNORECASE)
+        if match:
+            return match.group(0)
+    return None
+
+
+def evaluate_legacy(body, tracking_pattern, email_parsing):
+    """Evaluate the rules one by one on the text of every section."""
+    found = parcel_tracking.extract_tracking_numbers(body, tracking_pattern, set())
+    results = []
+    for item in found:
+        section = body[item["section_start"]:item["section_end"]] if len(found) > 1 else body
+        eta = legacy_eta(section, email_parsing["eta_string"], email_parsing["eta_date_pattern"])
+        if eta is None and section is not body:
+            eta = legacy_eta(body, email_parsing["eta_string"], email_parsing["eta_date_pattern"])
+        status = parcel_tracking.extract_status_from_email(section, email_parsing["status_strings"])
+        if not status and section is not body:
+            status = parcel_tracking.extract_status_from_email(body, email_parsing["status_strings"])
+        results.append((item["tracking_number"], eta, status))
+    return results
+
+
+def evaluate_plan(body, plan):
+    """Evaluate the compiled plan: one keyword scan, then position lookups per parcel."""
+    found = parcel_tracking.extract_tracking_numbers(body, plan.tracking_regex, set())
+    results = []
+    if not found:
+        return results
+    scan = plan.scan(body)
+    for item in found:
+        bounds = (item["section_start"], item["section_end"]) if len(found) > 1 else (0, len(body))
+        eta = scan.find_eta(*bounds)
+        if eta is None and len(found) > 1:
+            eta = scan.find_eta()
+        status = scan.find_status(*bounds)
+        if not status and len(found) > 1:
+            status = scan.find_status()
+        results.append((item["tracking_number"], eta, status))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=1000, help="number of generated mails")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the corpus generator")
+    parser.add_argument("--runs", type=int, default=5, help="repetitions per measurement")
+    parser.add_argument("--carriers", nargs="+", default=list(CARRIERS), choices=list(CARRIERS))
+    parser.add_argument("--output", help="write the JSON results to this file instead of stdout")
+    args = parser.parse_args()
+
+    corpus = generate_corpus(args.messages, seed=args.seed, carriers=args.carriers)
+    results = {
+        "benchmark": "rules",
+        "environment": environment(),
+        "parameters": {"messages": args.messages, "seed": args.seed, "runs": args.runs, "carriers": args.carriers},
+        "carriers": {},
+    }
+
+    for carrier in args.carriers:
+        template = carriers.get_carrier_template(carrier)
+        tracking_pattern, email_parsing = template["tracking_pattern"], template["email_parsing"]
+        # Mail texts are extracted up front, only the rule evaluation is timed
+        bodies = [
+            parcel_tracking.extract_email_body(email.message_from_bytes(raw))
+            for mail_carrier, raw, _ in corpus
+            if mail_carrier == carrier
+        ]
+
+        compile_start = time.perf_counter()
+        plan = rules.EvaluationPlan(tracking_pattern, **email_parsing)
+        compile_seconds = time.perf_counter() - compile_start
+
+        timings = {"legacy": [], "plan": []}
+        for _ in range(args.runs):
+            for variant in timings:
+                start = time.perf_counter()
+                if variant == "legacy":
+                    for body in bodies:
+                        evaluate_legacy(body, tracking_pattern, email_parsing)
+                else:
+                    for body in bodies:
+                        evaluate_plan(body, plan)
+                timings[variant].append(time.perf_counter() - start)
+
+        mismatches = sum(
+            1 for body in bodies
+            if evaluate_legacy(body, tracking_pattern, email_parsing) != evaluate_plan(body, plan)
+        )
+        results["carriers"][carrier] = {
+            "mails": len(bodies),
+            "legacy": summarize(timings["legacy"]),
+            "plan": summarize(timings["plan"]),
+            "plan_compile_ms": round(compile_seconds * 1000, 3),
+            "speedup": round(min(timings["legacy"]) / min(timings["plan"]), 2),
+            "mismatches": mismatches,
+        }
+
+    write_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# custom_components/parcel_tracking_info/benchmarks/common.py
+
+"""Helpers shared by the benchmark scripts."""
+
+import asyncio
+import contextlib
+import imaplib
+import importlib
+import json
+import platform
+import statistics
+import sys
+import time
+from pathlib import Path
+
+COMPONENT_DIR = Path(__file__).resolve().parents[1]
+
+
+def load_component_module(name):
+    """Import a module of the integration (e.g. "parcel_tracking") from this checkout."""
+    if str(COMPONENT_DIR.parent) not in sys.path:
+        sys.path.insert(0, str(COMPONENT_DIR.parent))
+    return importlib.import_module(f"{COMPONENT_DIR.name}.{name}")
+
+
+def component_version():
+    """Return the version from manifest.json."""
+    with open(COMPONENT_DIR / "manifest.json", encoding="utf-8") as manifest:
+        return json.load(manifest).get("version")
+
+
+class BenchHass:
+    """The part of the HomeAssistant API used by fetch_emails, backed by the default executor."""
+
+    def __init__(self, config_dir=None):
+        self.config_dir = config_dir
+        self.data = {}
+
+    async def async_add_executor_job(self, target, *args):
+        return await asyncio.get_running_loop().run_in_executor(None, target, *args)
+
+
+@contextlib.contextmanager
+def plain_imap():
+    """Let the integration connect to the (plain text) fake IMAP server."""
+    original = imaplib.IMAP4_SSL
+    imaplib.IMAP4_SSL = imaplib.IMAP4
+    try:
+        yield
+    finally:
+        imaplib.IMAP4_SSL = original
+
+
+class StageTimer:
+    """Accumulate wall-clock time per named stage."""
+
+    def __init__(self):
+        self.totals = {}
+        self.counts = {}
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.totals[name] = self.totals.get(name, 0.0) + time.perf_counter() - start
+            self.counts[name] = self.counts.get(name, 0) + 1
+
+
+def summarize(samples):
+    """Return min/median/max (in milliseconds) of a list of durations in seconds."""
+    return {
+        "min_ms": round(min(samples) * 1000, 3),
+        "median_ms": round(statistics.median(samples) * 1000, 3),
+        "max_ms": round(max(samples) * 1000, 3),
+        "runs": len(samples),
+    }
+
+
+def environment():
+    """Return the environment description stored with every result."""
+    return {
+        "component_version": component_version(),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+    }
+
+
+def write_results(results, output):
+    """Write results as sorted, indented JSON to ``output`` or stdout."""
+    text = json.dumps(results, indent=2, sort_keys=True, ensure_ascii=False)
+    if output:
+        Path(output).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
@@ -0,0 +1,157 @@
+# custom_components/parcel_tracking_info/benchmarks/corpus.py
+
+"""Seeded generator of realistic carrier notification mails."""
+
+import random
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from email.utils import format_datetime
+
+WEEKDAYS = ["Montag", "Dienstag", "Mittwoch", "Donnerstag", "Freitag", "Samstag", "Sonntag"]
+MONTHS = ["Januar", "Februar", "März", "April", "Mai", "Juni", "Juli", "August", "September",
+          "Oktober", "November", "Dezember"]
+FILLER = (
+    "Vielen Dank für Ihre Bestellung. Bitte beachten Sie unsere Hinweise zum Datenschutz. "
+    "Sie erhalten diese E-Mail, weil Sie eine Sendungsbenachrichtigung abonniert haben. "
+)
+
+
+def _digits(rng, count):
+    return "".join(str(rng.randint(0, 9)) for _ in range(count))
+
+
+def dhl_number(rng):
+    """Return a 12-digit DHL number with a valid Identcode check digit."""
+    payload = _digits(rng, 11)
+    total = sum(int(digit) * (4 if index % 2 == 0 else 9) for index, digit in enumerate(payload))
+    return payload + str((10 - total % 10) % 10)
+
+
+def hermes_number(rng):
+    return "H" + _digits(rng, 19)
+
+
+def dpd_number(rng):
+    return "0" + _digits(rng, 13)
+
+
+def gls_number(rng):
+    return _digits(rng, 11)
+
+
+def amazon_number(rng):
+    return "DE" + _digits(rng, 10)
+
+
+def _eta_weekday(date):
+    return f"{WEEKDAYS[date.weekday()]}, {date.day} {MONTHS[date.month - 1]}"
+
+
+CARRIERS = {
+    "dhl": {
+        "sender": "DHL Paket <noreply@dhl.de>",
+        "subject": "Ihr DHL Paket kommt bald",
+        "number": dhl_number,
+        "eta": lambda date: f"Die Zustellung ist geplant für {_eta_weekday(date)}.",
+        "status": "Ihre Sendung ist in Zustellung.",
+    },
+    "hermes": {
+        "sender": "Hermes <noreply@myhermes.de>",
+        "subject": "Deine Sendung ist unterwegs",
+        "number": hermes_number,
+        "eta": lambda date: f"Voraussichtliche Zustellung am {date:%d.%m.%Y}.",
+        "status": "Deine Sendung ist unterwegs.",
+    },
+    "dpd": {
+        "sender": "DPD <noreply@dpd.de>",
+        "subject": "Ihr DPD Paket ist unterwegs",
+        "number": dpd_number,
+        "eta": lambda date: "Ihre Sendung stellen wir in 1-2 Werktagen zu.",
+        "status": "Diese Sendung stellen wir Ihnen bald zu.",
+    },
+    "gls": {
+        "sender": "GLS <noreply@gls-group.eu>",
+        "subject": "Ihr GLS Paket",
+        "number": gls_number,
+        "eta": lambda date: "",
+        "status": "Ihr Paket wird zugestellt.",
+    },
+    "amazon": {
+        "sender": "Amazon.de <versandbestaetigung@amazon.de>",
+        "subject": "Ihre Amazon-Bestellung wurde versandt",
+        "number": amazon_number,
+        "eta": lambda date: f"Zustellung: {_eta_weekday(date)}",
+        "status": "Ihre Bestellung wurde versandt.",
+    },
+}
+
+
+def build_message(rng, carrier, now, parcels=1, attachment_bytes=0, marketing=False):
+    """
+    Build one notification mail.
+
+    Returns:
+        Tuple[bytes, list]: The RFC 822 bytes and the tracking numbers it contains.
+    """
+    spec = CARRIERS[carrier]
+    sent = now - timedelta(days=rng.randint(0, 9), minutes=rng.randint(0, 1439))
+    numbers = [] if marketing else [spec["number"](rng) for _ in range(parcels)]
+
+    text_sections = []
+    html_sections = []
+    for number in numbers:
+        eta = spec["eta"](sent + timedelta(days=rng.randint(1, 4)))
+        text_sections.append(f"Sendungsnummer: {number}\n{spec['status']}\n{eta}\n")
+        html_sections.append(
+            f"<tr><td>Sendungsnummer</td><td><b>{number}</b></td></tr>"
+            f"<tr><td colspan='2'>{spec['status']} {eta}</td></tr>"
+        )
+    if marketing:
+        text_sections.append("Jetzt 10% Rabatt auf Ihre nächste Sendung sichern!\n")
+        html_sections.append("<tr><td>Jetzt 10% Rabatt auf Ihre nächste Sendung sichern!</td></tr>")
+
+    filler = FILLER * rng.randint(2, 12)
+    message = EmailMessage()
+    message["From"] = spec["sender"]
+    message["To"] = "bench@example.com"
+    message["Subject"] = spec["subject"] if not marketing else f"{spec['subject']} - Angebote"
+    message["Date"] = format_datetime(sent)
+    message["Message-ID"] = f"<{rng.getrandbits(64):x}@{carrier}.example>"
+    message.set_content("\n".join(text_sections) + "\n" + filler)
+    message.add_alternative(
+        "<html><head><style>td {font-family: Arial;}</style></head><body>"
+        "<table>" + "".join(html_sections) + "</table>"
+        f"<p>{filler}</p><img src='https://example.invalid/logo.png'/></body></html>",
+        subtype="html",
+    )
+    if attachment_bytes:
+        message.add_attachment(
+            rng.randbytes(attachment_bytes), maintype="application", subtype="pdf", filename="label.pdf"
+        )
+    return message.as_bytes().replace(b"\r\n", b"\n").replace(b"\n", b"\r\n"), numbers
+
+
+def generate_corpus(count, seed=0, carriers=None, now=None, multi_parcel_ratio=0.1,
+                    attachment_ratio=0.2, attachment_bytes=20000, marketing_ratio=0.2):
+    """
+    Generate ``count`` mails spread over the given carriers.
+
+    Returns:
+        list: Tuples of (carrier, raw bytes, tracking numbers).
+    """
+    rng = random.Random(seed)
+    carriers = carriers or list(CARRIERS)
+    now = now or datetime.now().astimezone().replace(hour=12, minute=0, second=0, microsecond=0)
+    corpus = []
+    for _ in range(count):
+        carrier = rng.choice(carriers)
+        raw, numbers = build_message(
+            rng,
+            carrier,
+            now,
+            parcels=rng.randint(2, 3) if rng.random() < multi_parcel_ratio else 1,
+            attachment_bytes=attachment_bytes if rng.random() < attachment_ratio else 0,
+            marketing=rng.random() < marketing_ratio,
+        )
+        corpus.append((carrier, raw, numbers))
+    return corpus
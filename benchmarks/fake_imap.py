@@ -0,0 +1,407 @@
+# custom_components/parcel_tracking_info/benchmarks/fake_imap.py
+
+"""In-process IMAP4rev1 stand-in serving a synthetic corpus over loopback.
+
+Only the subset of the protocol used by the integration is implemented. The
+server speaks plain IMAP, so benchmarks connect with ``imaplib.IMAP4`` in
+place of ``imaplib.IMAP4_SSL`` (see ``common.plain_imap``).
+"""
+
+import email
+import email.utils
+import re
+import socketserver
+import threading
+import time
+from datetime import datetime, timezone
+
+TOKEN_RE = re.compile(rb'\(|\)|"(?:[^"\\]|\\.)*"|[^\s()]+')
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+
+class FakeMessage:
+    """A message stored in a fake mailbox."""
+
+    def __init__(self, uid, raw, flags=(), modseq=1):
+        self.uid = uid
+        self.raw = raw
+        self.flags = set(flags)
+        self.modseq = modseq
+        headers = email.message_from_bytes(raw.split(b"\r\n\r\n", 1)[0] + b"\r\n\r\n")
+        self.sender = str(headers.get("From", ""))
+        self.subject = str(headers.get("Subject", ""))
+        try:
+            self.date = email.utils.parsedate_to_datetime(headers.get("Date")).date()
+        except (TypeError, ValueError):
+            self.date = datetime.now(timezone.utc).date()
+
+
+class FakeMailbox:
+    """A folder of the fake server."""
+
+    def __init__(self, name, uidvalidity=1):
+        self.name = name
+        self.uidvalidity = uidvalidity
+        self.messages = []
+        self.uidnext = 1
+        self.highestmodseq = 1
+        self.expunged = []  # (uid, modseq) of removed messages, for QRESYNC
+
+    def append(self, raw, flags=()):
+        """Add a message and return its UID."""
+        self.highestmodseq += 1
+        message = FakeMessage(self.uidnext, raw, flags, self.highestmodseq)
+        self.messages.append(message)
+        self.uidnext += 1
+        return message.uid
+
+    def set_flags(self, uid, flags):
+        """Replace the flags of a message."""
+        self.highestmodseq += 1
+        for message in self.messages:
+            if message.uid == uid:
+                message.flags = set(flags)
+                message.modseq = self.highestmodseq
+
+    def expunge(self, uid):
+        """Remove a message."""
+        self.highestmodseq += 1
+        self.messages = [message for message in self.messages if message.uid != uid]
+        self.expunged.append((uid, self.highestmodseq))
+
+
+class FakeImapState:
+    """Mailboxes and counters shared by all connections of a server."""
+
+    def __init__(self, username="bench@example.com", password="secret"):
+        self.username = username
+        self.password = password
+        self.mailboxes = {}
+        self.capabilities = ["IMAP4rev1"]
+        self.lock = threading.Lock()
+        self.commands = {}
+        self.bytes_sent = 0
+        # Seconds each command waits before it is answered, to simulate a slow server
+        self.delay = 0.0
+
+    def mailbox(self, name):
+        """Return a mailbox, creating it if needed."""
+        key = name.upper() if name.upper() == "INBOX" else name
+        if key not in self.mailboxes:
+            self.mailboxes[key] = FakeMailbox(key)
+        return self.mailboxes[key]
+
+    def count(self, command):
+        """Count a received command."""
+        with self.lock:
+            self.commands[command] = self.commands.get(command, 0) + 1
+
+
+def _unquote(token):
+    """Return the string value of a quoted or atom token."""
+    if token.startswith(b'"'):
+        return re.sub(rb'\\(.)', rb'\1', token[1:-1]).decode()
+    return token.decode()
+
+
+def _parse_date(value):
+    """Parse an IMAP date (e.g. 04-Oct-2026)."""
+    day, month, year = value.split("-")
+    return datetime(int(year), MONTHS.index(month.capitalize()) + 1, int(day)).date()
+
+
+def _parse_sequence_set(value, maximum):
+    """Return the numbers contained in an IMAP sequence set."""
+    numbers = set()
+    for part in value.split(","):
+        if ":" in part:
+            low, high = part.split(":")
+            low = maximum if low == "*" else int(low)
+            high = maximum if high == "*" else int(high)
+            low, high = min(low, high), max(low, high)
+            numbers.update(range(low, high + 1))
+        else:
+            numbers.add(maximum if part == "*" else int(part))
+    return numbers
+
+
+def _gmail_raw_predicate(query):
+    """Evaluate the from:/subject:/-subject: terms of a Gmail X-GM-RAW query."""
+    terms = []
+    for negated, field, value in re.findall(r"(-?)(from|subject):(\([^)]*\)|\S+)", query, re.IGNORECASE):
+        alternatives = [
+            alternative.strip().lower()
+            for alternative in re.split(r"\s+OR\s+", value.strip("()"), flags=re.IGNORECASE)
+            if alternative.strip()
+        ]
+        terms.append((bool(negated), field.lower(), alternatives))
+
+    def predicate(seq, msg):
+        for negated, field, alternatives in terms:
+            text = (msg.sender if field == "from" else msg.subject).lower()
+            if any(alternative in text for alternative in alternatives) == negated:
+                return False
+        return True
+
+    return predicate
+
+
+class _SearchParser:
+    """Evaluate a subset of IMAP SEARCH criteria against a message."""
+
+    def __init__(self, tokens, mailbox):
+        self.tokens = tokens
+        self.mailbox = mailbox
+
+    def parse(self):
+        """Parse all tokens into a list of predicates (implicitly AND'ed)."""
+        predicates = []
+        while self.tokens:
+            predicates.append(self._parse_key())
+        return lambda seq, msg: all(predicate(seq, msg) for predicate in predicates)
+
+    def _parse_key(self):
+        token = self.tokens.pop(0)
+        key = token.decode().upper()
+        if token == b"(":
+            predicates = []
+            while self.tokens[0] != b")":
+                predicates.append(self._parse_key())
+            self.tokens.pop(0)
+            return lambda seq, msg: all(predicate(seq, msg) for predicate in predicates)
+        if key == "ALL":
+            return lambda seq, msg: True
+        if key == "OR":
+            left, right = self._parse_key(), self._parse_key()
+            return lambda seq, msg: left(seq, msg) or right(seq, msg)
+        if key == "NOT":
+            inner = self._parse_key()
+            return lambda seq, msg: not inner(seq, msg)
+        if key in ("FROM", "SUBJECT", "TEXT", "BODY"):
+            needle = _unquote(self.tokens.pop(0)).lower()
+            if key == "FROM":
+                return lambda seq, msg: needle in msg.sender.lower()
+            if key == "SUBJECT":
+                return lambda seq, msg: needle in msg.subject.lower()
+            return lambda seq, msg: needle.encode() in msg.raw.lower()
+        if key == "SINCE":
+            since = _parse_date(_unquote(self.tokens.pop(0)))
+            return lambda seq, msg: msg.date >= since
+        if key == "BEFORE":
+            before = _parse_date(_unquote(self.tokens.pop(0)))
+            return lambda seq, msg: msg.date < before
+        if key in ("SEEN", "UNSEEN"):
+            return lambda seq, msg: ("\\Seen" in msg.flags) == (key == "SEEN")
+        if key == "X-GM-RAW":
+            return _gmail_raw_predicate(_unquote(self.tokens.pop(0)))
+        if key == "UID":
+            maximum = self.mailbox.uidnext - 1
+            uids = _parse_sequence_set(self.tokens.pop(0).decode(), max(maximum, 1))
+            return lambda seq, msg: msg.uid in uids
+        if re.fullmatch(r"[\d:*,]+", key):
+            numbers = _parse_sequence_set(key, max(len(self.mailbox.messages), 1))
+            return lambda seq, msg: seq in numbers
+        raise ValueError(f"Unsupported search key {key}")
+
+
+class FakeImapHandler(socketserver.StreamRequestHandler):
+    """Handle one IMAP connection."""
+
+    # Responses are written in several small chunks; don't let Nagle delay them
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        self.state = self.server.imap_state
+        self.mailbox = None
+        self.readonly = False
+
+    def send(self, data):
+        """Write a response and account for its size."""
+        self.wfile.write(data)
+        with self.state.lock:
+            self.state.bytes_sent += len(data)
+
+    def handle(self):
+        self.send(b"* OK [CAPABILITY " + " ".join(self.state.capabilities).encode() + b"] Fake IMAP ready\r\n")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            tag, _, rest = line.rstrip(b"\r\n").partition(b" ")
+            command, _, args = rest.partition(b" ")
+            command = command.decode().upper()
+            self.state.count(command)
+            if self.state.delay and command != "LOGOUT":
+                time.sleep(self.state.delay)
+            try:
+                if self.dispatch(tag, command, args) is False:
+                    return
+            except Exception as e:
+                self.send(tag + b" BAD " + str(e).encode() + b"\r\n")
+
+    def dispatch(self, tag, command, args):
+        """Run a command, returning False to close the connection."""
+        if command == "UID":
+            command, _, args = args.partition(b" ")
+            return self.dispatch_uid(tag, command.decode().upper(), args)
+        handler = getattr(self, f"cmd_{command.lower()}", None)
+        if handler is None:
+            self.send(tag + b" BAD unknown command\r\n")
+            return True
+        return handler(tag, args)
+
+    def dispatch_uid(self, tag, command, args):
+        if command == "SEARCH":
+            return self.cmd_search(tag, args, use_uid=True)
+        if command == "FETCH":
+            return self.cmd_fetch(tag, args, use_uid=True)
+        self.send(tag + b" BAD unsupported UID command\r\n")
+        return True
+
+    def cmd_capability(self, tag, args):
+        self.send(b"* CAPABILITY " + " ".join(self.state.capabilities).encode() + b"\r\n")
+        self.send(tag + b" OK CAPABILITY completed\r\n")
+
+    def cmd_enable(self, tag, args):
+        enabled = [
+            token.decode().upper() for token in TOKEN_RE.findall(args)
+            if token.decode().upper() in self.state.capabilities
+        ]
+        self.send(("* ENABLED " + " ".join(enabled)).rstrip().encode() + b"\r\n")
+        self.send(tag + b" OK ENABLE completed\r\n")
+
+    def cmd_noop(self, tag, args):
+        self.send(tag + b" OK NOOP completed\r\n")
+
+    def cmd_login(self, tag, args):
+        tokens = TOKEN_RE.findall(args)
+        username, password = _unquote(tokens[0]), _unquote(tokens[1])
+        if username != self.state.username or password != self.state.password:
+            self.send(tag + b" NO [AUTHENTICATIONFAILED] Authentication failed\r\n")
+        else:
+            self.send(tag + b" OK LOGIN completed\r\n")
+
+    def cmd_logout(self, tag, args):
+        self.send(b"* BYE logging out\r\n")
+        self.send(tag + b" OK LOGOUT completed\r\n")
+        return False
+
+    def _open(self, tag, args, readonly):
+        name = _unquote(TOKEN_RE.findall(args)[0])
+        self.mailbox = self.state.mailbox(name)
+        self.readonly = readonly
+        mailbox = self.mailbox
+        self.send(f"* {len(mailbox.messages)} EXISTS\r\n* 0 RECENT\r\n".encode())
+        self.send(f"* OK [UIDVALIDITY {mailbox.uidvalidity}] UIDs valid\r\n".encode())
+        self.send(f"* OK [UIDNEXT {mailbox.uidnext}] Predicted next UID\r\n".encode())
+        mode = b"READ-ONLY" if readonly else b"READ-WRITE"
+        self.send(tag + b" OK [" + mode + b"] completed\r\n")
+
+    def cmd_select(self, tag, args):
+        self._open(tag, args, readonly=False)
+
+    def cmd_examine(self, tag, args):
+        self._open(tag, args, readonly=True)
+
+    def cmd_close(self, tag, args):
+        self.mailbox = None
+        self.send(tag + b" OK CLOSE completed\r\n")
+
+    def cmd_status(self, tag, args):
+        tokens = TOKEN_RE.findall(args)
+        name = _unquote(tokens[0])
+        mailbox = self.state.mailbox(name)
+        values = {
+            "MESSAGES": len(mailbox.messages),
+            "UIDNEXT": mailbox.uidnext,
+            "UIDVALIDITY": mailbox.uidvalidity,
+            "UNSEEN": sum(1 for message in mailbox.messages if "\\Seen" not in message.flags),
+            "RECENT": 0,
+            "HIGHESTMODSEQ": mailbox.highestmodseq,
+        }
+        items = [token.decode().upper() for token in tokens[1:] if token not in (b"(", b")")]
+        pairs = " ".join(f"{item} {values[item]}" for item in items if item in values)
+        self.send(f'* STATUS "{mailbox.name}" ({pairs})\r\n'.encode())
+        self.send(tag + b" OK STATUS completed\r\n")
+
+    def cmd_search(self, tag, args, use_uid=False):
+        if self.mailbox is None:
+            self.send(tag + b" BAD no mailbox selected\r\n")
+            return True
+        tokens = TOKEN_RE.findall(args)
+        if tokens and tokens[0].upper() == b"CHARSET":
+            tokens = tokens[2:]
+        predicate = _SearchParser(tokens, self.mailbox).parse()
+        results = [
+            str(message.uid if use_uid else seq)
+            for seq, message in enumerate(self.mailbox.messages, 1)
+            if predicate(seq, message)
+        ]
+        self.send(("* SEARCH " + " ".join(results)).rstrip().encode() + b"\r\n")
+        self.send(tag + b" OK SEARCH completed\r\n")
+
+    def cmd_fetch(self, tag, args, use_uid=False):
+        if self.mailbox is None:
+            self.send(tag + b" BAD no mailbox selected\r\n")
+            return True
+        sequence_set, _, items = args.partition(b" ")
+        items = items.decode().upper()
+        changed_since = re.search(r"\(CHANGEDSINCE (\d+)( VANISHED)?\)", items)
+        messages = self.mailbox.messages
+        if use_uid:
+            maximum = max(self.mailbox.uidnext - 1, 1)
+            wanted = _parse_sequence_set(sequence_set.decode(), maximum)
+            selected = [(seq, message) for seq, message in enumerate(messages, 1) if message.uid in wanted]
+        else:
+            wanted = _parse_sequence_set(sequence_set.decode(), max(len(messages), 1))
+            selected = [(seq, message) for seq, message in enumerate(messages, 1) if seq in wanted]
+
+        if changed_since:
+            modseq = int(changed_since.group(1))
+            selected = [(seq, message) for seq, message in selected if message.modseq > modseq]
+            vanished = [uid for uid, expunged_at in self.mailbox.expunged if expunged_at > modseq and uid in wanted]
+            if use_uid and changed_since.group(2) and vanished:
+                self.send(f"* VANISHED (EARLIER) {','.join(map(str, vanished))}\r\n".encode())
+
+        for seq, message in selected:
+            parts = []
+            if use_uid or "UID" in items:
+                parts.append(f"UID {message.uid}".encode())
+            if "FLAGS" in items:
+                parts.append(f"FLAGS ({' '.join(sorted(message.flags))})".encode())
+            if changed_since or "MODSEQ" in items:
+                parts.append(f"MODSEQ ({message.modseq})".encode())
+            if "RFC822.SIZE" in items:
+                parts.append(f"RFC822.SIZE {len(message.raw)}".encode())
+            if "BODY.PEEK[]" in items or "BODY[]" in items or re.search(r"\bRFC822\b(?!\.)", items):
+                parts.append(f"BODY[] {{{len(message.raw)}}}\r\n".encode() + message.raw)
+                if "BODY[]" in items and "PEEK" not in items and not self.readonly:
+                    message.flags.add("\\Seen")
+            self.send(f"* {seq} FETCH (".encode() + b" ".join(parts) + b")\r\n")
+        self.send(tag + b" OK FETCH completed\r\n")
+
+
+class FakeImapServer(socketserver.ThreadingTCPServer):
+    """Threaded fake IMAP server bound to a free loopback port."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, imap_state=None, host="127.0.0.1", port=0):
+        self.imap_state = imap_state or FakeImapState()
+        super().__init__((host, port), FakeImapHandler)
+        self._thread = None
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,368 @@
+# custom_components/parcel_tracking_info/benchmarks/fake_jmap.py
+
+"""Local JMAP (RFC 8620/8621) stand-in serving a synthetic corpus over loopback.
+
+Only the subset used by the integration is implemented:
+    GET  /jmap/session   session resource (Bearer token)
+    POST /jmap/api       Mailbox/get, Email/query, Email/get and Email/changes,
+                         with "#" back-references to earlier calls of the request
+
+Run standalone:
+    python benchmarks/fake_jmap.py --port 8081 --messages 500 --latency-ms 40
+"""
+
+import argparse
+import asyncio
+import email
+import email.utils
+import itertools
+from datetime import datetime, timezone
+from email import policy
+
+from aiohttp import web
+
+JMAP_CORE = "urn:ietf:params:jmap:core"
+JMAP_MAIL = "urn:ietf:params:jmap:mail"
+ACCOUNT_ID = "bench"
+
+
+def _utc_date(value):
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _parse_utc_date(value):
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+class FakeEmail:
+    """A message of the fake account, with its text body parts decoded."""
+
+    def __init__(self, email_id, raw, mailbox_id):
+        self.id = email_id
+        self.mailbox_ids = {mailbox_id: True}
+        msg = email.message_from_bytes(raw, policy=policy.default)
+        name, address = email.utils.parseaddr(str(msg.get("From", "")))
+        self.sender = [{"name": name or None, "email": address}]
+        self.subject = str(msg.get("Subject", ""))
+        try:
+            self.sent_at = email.utils.parsedate_to_datetime(msg.get("Date"))
+        except (TypeError, ValueError):
+            self.sent_at = datetime.now(timezone.utc)
+        self.received_at = self.sent_at
+        self.size = len(raw)
+        # textBody: the text/plain alternative, or the HTML one of messages without it
+        part = msg.get_body(preferencelist=("plain", "html"))
+        self.parts = [("1", part.get_content_type(), part.get_content())] if part is not None else []
+
+    def to_json(self, properties, fetch_text_body_values, max_body_value_bytes):
+        values = {
+            "id": self.id,
+            "mailboxIds": dict(self.mailbox_ids),
+            "from": self.sender,
+            "subject": self.subject,
+            "sentAt": self.sent_at.isoformat(),
+            "receivedAt": _utc_date(self.received_at),
+            "size": self.size,
+            "textBody": [{"partId": part_id, "type": content_type} for part_id, content_type, _ in self.parts],
+            "bodyValues": {},
+        }
+        if fetch_text_body_values:
+            for part_id, _, value in self.parts:
+                truncated = max_body_value_bytes and len(value.encode()) > max_body_value_bytes
+                if truncated:
+                    value = value.encode()[:max_body_value_bytes].decode(errors="ignore")
+                values["bodyValues"][part_id] = {"value": value, "isTruncated": bool(truncated)}
+        return {name: values[name] for name in properties if name in values}
+
+
+class FakeJmapState:
+    """Mailboxes, messages and the change log of the fake account."""
+
+    def __init__(self, token="bench-token", max_objects=500, change_log_size=None):
+        self.token = token
+        self.max_objects = max_objects
+        self.change_log_size = change_log_size  # Oldest states answered with cannotCalculateChanges
+        self.mailboxes = {"inbox": {"id": "inbox", "name": "Inbox", "role": "inbox"}}
+        self.emails = {}
+        self.state = 0
+        self.changes = []  # (state, kind, email id)
+        self.delay = 0.0
+        self.requests = {}
+        self.method_calls = {}
+        self.bytes_sent = 0
+        self._ids = itertools.count(1)
+
+    def mailbox(self, name, role=None):
+        """Return the id of a mailbox, creating it."""
+        for mailbox in self.mailboxes.values():
+            if mailbox["name"].lower() == name.lower():
+                return mailbox["id"]
+        mailbox_id = f"mailbox-{len(self.mailboxes)}"
+        self.mailboxes[mailbox_id] = {"id": mailbox_id, "name": name, "role": role}
+        return mailbox_id
+
+    def _log(self, kind, email_id):
+        self.state += 1
+        self.changes.append((self.state, kind, email_id))
+        if self.change_log_size is not None:
+            del self.changes[:-self.change_log_size]
+
+    def append(self, raw, mailbox="Inbox"):
+        """Add a message and return its id."""
+        email_id = f"M{next(self._ids)}"
+        self.emails[email_id] = FakeEmail(email_id, raw, self.mailbox(mailbox))
+        self._log("created", email_id)
+        return email_id
+
+    def move(self, email_id, mailbox):
+        """Move a message to another mailbox."""
+        self.emails[email_id].mailbox_ids = {self.mailbox(mailbox): True}
+        self._log("updated", email_id)
+
+    def destroy(self, email_id):
+        """Delete a message."""
+        del self.emails[email_id]
+        self._log("destroyed", email_id)
+
+    def count(self, name, counters):
+        counters[name] = counters.get(name, 0) + 1
+
+    @property
+    def stats(self):
+        """Return the request counters."""
+        return {
+            "requests": dict(sorted(self.requests.items())),
+            "method_calls": dict(sorted(self.method_calls.items())),
+            "bytes_sent": self.bytes_sent,
+        }
+
+
+class MethodError(Exception):
+    """A method call failed with a JMAP error type."""
+
+    def __init__(self, error_type):
+        super().__init__(error_type)
+        self.error_type = error_type
+
+
+def _matches(message, condition):
+    operator = condition.get("operator")
+    if operator == "AND":
+        return all(_matches(message, item) for item in condition["conditions"])
+    if operator == "OR":
+        return any(_matches(message, item) for item in condition["conditions"])
+    if operator == "NOT":
+        return not any(_matches(message, item) for item in condition["conditions"])
+    for name, value in condition.items():
+        if name == "inMailbox" and value not in message.mailbox_ids:
+            return False
+        if name == "after" and message.received_at < _parse_utc_date(value):
+            return False
+        if name == "before" and message.received_at >= _parse_utc_date(value):
+            return False
+        if name == "from" and not any(
+            value.lower() in f"{address.get('name') or ''} <{address['email']}>".lower() for address in message.sender
+        ):
+            return False
+        if name == "subject" and value.lower() not in message.subject.lower():
+            return False
+    return True
+
+
+def _resolve(arguments, results):
+    """Replace "#name" back-references with the values they point to."""
+    resolved = {}
+    for name, value in arguments.items():
+        if not name.startswith("#"):
+            resolved[name] = value
+            continue
+        result = results.get(value["resultOf"])
+        if result is None or result[0] != value["name"]:
+            raise MethodError("invalidResultReference")
+        target = result[1]
+        for key in value["path"].strip("/").split("/"):
+            target = target[key]
+        resolved[name[1:]] = target
+    return resolved
+
+
+class FakeJmapApi:
+    """aiohttp application serving a FakeJmapState."""
+
+    def __init__(self, state=None):
+        self.state = state or FakeJmapState()
+        self.app = web.Application(middlewares=[self._middleware])
+        self.app.router.add_get("/jmap/session", self.session)
+        self.app.router.add_post("/jmap/api", self.api)
+
+    @web.middleware
+    async def _middleware(self, request, handler):
+        self.state.count(request.path, self.state.requests)
+        if self.state.delay:
+            await asyncio.sleep(self.state.delay)
+        if request.headers.get("Authorization") != f"Bearer {self.state.token}":
+            return web.json_response({"type": "about:blank", "status": 401}, status=401)
+        response = await handler(request)
+        self.state.bytes_sent += len(response.body or b"")
+        return response
+
+    async def session(self, request):
+        return web.json_response({
+            "capabilities": {
+                JMAP_CORE: {"maxObjectsInGet": self.state.max_objects, "maxCallsInRequest": 16},
+                JMAP_MAIL: {},
+            },
+            "accounts": {ACCOUNT_ID: {"name": "bench@example.com", "isPersonal": True, "isReadOnly": False}},
+            "primaryAccounts": {JMAP_MAIL: ACCOUNT_ID},
+            "username": "bench@example.com",
+            "apiUrl": "/jmap/api",
+            "state": "0",
+        })
+
+    async def api(self, request):
+        payload = await request.json()
+        results = {}
+        responses = []
+        for name, arguments, call_id in payload.get("methodCalls", []):
+            self.state.count(name, self.state.method_calls)
+            handler = {
+                "Mailbox/get": self.mailbox_get,
+                "Email/query": self.email_query,
+                "Email/get": self.email_get,
+                "Email/changes": self.email_changes,
+            }.get(name)
+            try:
+                if handler is None:
+                    raise MethodError("unknownMethod")
+                arguments = _resolve(arguments, results)
+                if arguments.get("accountId") != ACCOUNT_ID:
+                    raise MethodError("accountNotFound")
+                result = [name, handler(arguments), call_id]
+            except MethodError as e:
+                result = ["error", {"type": e.error_type}, call_id]
+            results[call_id] = result
+            responses.append(result)
+        return web.json_response({"methodResponses": responses, "sessionState": "0"})
+
+    def mailbox_get(self, arguments):
+        return {"accountId": ACCOUNT_ID, "state": "0", "list": list(self.state.mailboxes.values()), "notFound": []}
+
+    def email_query(self, arguments):
+        matching = [message for message in self.state.emails.values() if _matches(message, arguments.get("filter") or {})]
+        matching.sort(key=lambda message: message.received_at, reverse=True)
+        position = arguments.get("position", 0)
+        limit = min(arguments.get("limit") or self.state.max_objects, self.state.max_objects)
+        return {
+            "accountId": ACCOUNT_ID,
+            "queryState": str(self.state.state),
+            "canCalculateChanges": False,
+            "position": position,
+            "ids": [message.id for message in matching[position:position + limit]],
+            "total": len(matching),
+        }
+
+    def email_get(self, arguments):
+        ids = arguments.get("ids")
+        if ids is not None and len(ids) > self.state.max_objects:
+            raise MethodError("requestTooLarge")
+        properties = arguments.get("properties") or ["id", "mailboxIds", "from", "subject", "receivedAt"]
+        found = [self.state.emails[email_id] for email_id in ids or [] if email_id in self.state.emails]
+        return {
+            "accountId": ACCOUNT_ID,
+            "state": str(self.state.state),
+            "list": [
+                message.to_json(
+                    properties, arguments.get("fetchTextBodyValues", False), arguments.get("maxBodyValueBytes", 0)
+                )
+                for message in found
+            ],
+            "notFound": [email_id for email_id in ids or [] if email_id not in self.state.emails],
+        }
+
+    def email_changes(self, arguments):
+        try:
+            since = int(arguments["sinceState"])
+        except (KeyError, ValueError):
+            raise MethodError("cannotCalculateChanges")
+        if since > self.state.state or (
+            since < self.state.state and (not self.state.changes or self.state.changes[0][0] > since + 1)
+        ):
+            raise MethodError("cannotCalculateChanges")
+        max_changes = arguments.get("maxChanges") or self.state.max_objects
+        kinds = {}
+        new_state = since
+        for state, kind, email_id in self.state.changes:
+            if state <= since:
+                continue
+            if email_id not in kinds and len(kinds) >= max_changes:
+                break
+            previous = kinds.get(email_id, kind)
+            if previous == "created":
+                # Created since the state: only reported if it still exists
+                kinds[email_id] = None if kind == "destroyed" else "created"
+            elif previous == "updated":
+                kinds[email_id] = kind
+            else:
+                kinds[email_id] = previous
+            new_state = state
+        return {
+            "accountId": ACCOUNT_ID,
+            "oldState": str(since),
+            "newState": str(new_state),
+            "hasMoreChanges": new_state < self.state.state,
+            "created": [email_id for email_id, kind in kinds.items() if kind == "created"],
+            "updated": [email_id for email_id, kind in kinds.items() if kind == "updated"],
+            "destroyed": [email_id for email_id, kind in kinds.items() if kind == "destroyed"],
+        }
+
+
+class FakeJmapServer:
+    """Run a FakeJmapApi on a free loopback port inside the current event loop."""
+
+    def __init__(self, state=None, host="127.0.0.1", port=0):
+        self.api = FakeJmapApi(state)
+        self.host = host
+        self.port = port
+        self._runner = None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def session_url(self):
+        return f"{self.url}/jmap/session"
+
+    async def __aenter__(self):
+        self._runner = web.AppRunner(self.api.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self._runner.cleanup()
+
+
+def main():
+    from corpus import generate_corpus
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--token", default="bench-token")
+    args = parser.parse_args()
+
+    state = FakeJmapState(args.token)
+    state.delay = args.latency_ms / 1000
+    for _, raw, _ in generate_corpus(args.messages, seed=args.seed):
+        state.append(raw)
+    web.run_app(FakeJmapApi(state).app, host=args.host, port=args.port, access_log=None)
+
+
+if __name__ == "__main__":
+    main()
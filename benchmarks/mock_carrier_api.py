@@ -0,0 +1,239 @@
+# custom_components/parcel_tracking_info/benchmarks/mock_carrier_api.py
+
+"""Local stand-in for the carrier tracking APIs with configurable latency and failures.
+
+Endpoints:
+    GET  /track/shipments?trackingNumber=<n>[,<n>...]   DHL Unified Tracking API shape
+    GET  /gls/rstt001?match=<n>[,<n>...]                GLS track and trace shape
+    GET  /hermes/parceldetails/<n>                      Hermes parcel details shape
+    GET  /dpd/plc/de_DE/<n>                             DPD parcel life cycle shape
+    GET  /<carrier>/track/<n>                          generic schema (gls, hermes, dpd)
+    POST /<carrier>/track  {"trackingNumbers": [...]}  generic schema, batch
+
+Point the carrier API classes at ``<url>/gls/rstt001``, ``<url>/hermes/parceldetails``
+and ``<url>/dpd/plc/de_DE``.
+
+Run standalone:
+    python benchmarks/mock_carrier_api.py --port 8080 --latency-ms 150 --error-rate 0.05
+"""
+
+import argparse
+import asyncio
+import hashlib
+import random
+from datetime import date, timedelta
+
+from aiohttp import web
+
+DHL_STATUS_CODES = ["pre-transit", "transit", "transit", "delivered", "failure"]
+GENERIC_STATUSES = ["PREADVICE", "INTRANSIT", "INDELIVERY", "DELIVERED", "NOTDELIVERED"]
+HERMES_STATUSES = ["ANGEKUENDIGT", "UNTERWEGS", "IN_ZUSTELLUNG", "ZUGESTELLT", "IM_PAKETSHOP"]
+DPD_STATUSES = ["ACCEPTED", "ON_THE_ROAD", "AT_DELIVERY_DEPOT", "DELIVERY", "DELIVERED"]
+
+
+def _pick(tracking_number, choices):
+    """Pick a stable value for a tracking number."""
+    digest = hashlib.sha256(tracking_number.encode()).digest()
+    return choices[digest[0] % len(choices)]
+
+
+def _eta(tracking_number):
+    digest = hashlib.sha256(tracking_number.encode()).digest()
+    return (date.today() + timedelta(days=digest[1] % 5)).isoformat()
+
+
+class MockCarrierApi:
+    """aiohttp application mimicking the carrier APIs."""
+
+    def __init__(self, latency_ms=50, jitter_ms=20, error_rate=0.0, rate_limit_rate=0.0,
+                 max_batch=20, api_key="bench-key", seed=0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.max_batch = max_batch
+        self.api_key = api_key
+        self.rng = random.Random(seed)
+        self.requests = {}
+        self.responses = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+        self.app = web.Application(middlewares=[self._middleware])
+        self.app.router.add_get("/track/shipments", self.dhl_shipments)
+        self.app.router.add_get("/gls/rstt001", self.gls_status)
+        self.app.router.add_get("/hermes/parceldetails/{tracking_number}", self.hermes_details)
+        self.app.router.add_get("/dpd/plc/de_DE/{tracking_number}", self.dpd_life_cycle)
+        self.app.router.add_get("/{carrier}/track/{tracking_number}", self.generic_single)
+        self.app.router.add_post("/{carrier}/track", self.generic_batch)
+        self.app.router.add_get("/stats", self.stats_handler)
+
+    @property
+    def stats(self):
+        """Return request and response counters."""
+        return {
+            "requests": dict(sorted(self.requests.items())),
+            "responses": dict(sorted(self.responses.items())),
+            "max_in_flight": self.max_in_flight,
+        }
+
+    def reset_stats(self):
+        self.requests = {}
+        self.responses = {}
+        self.max_in_flight = 0
+
+    @web.middleware
+    async def _middleware(self, request, handler):
+        if request.path == "/stats":
+            return await handler(request)
+
+        route = request.match_info.route.resource.canonical if request.match_info.route.resource else request.path
+        self.requests[route] = self.requests.get(route, 0) + 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            delay = max(0.0, self.rng.gauss(self.latency_ms, self.jitter_ms)) / 1000
+            await asyncio.sleep(delay)
+
+            roll = self.rng.random()
+            if roll < self.rate_limit_rate:
+                response = web.json_response(
+                    {"status": 429, "title": "Too many requests"}, status=429, headers={"Retry-After": "1"}
+                )
+            elif roll < self.rate_limit_rate + self.error_rate:
+                response = web.json_response({"status": 503, "title": "Service unavailable"}, status=503)
+            else:
+                response = await handler(request)
+        finally:
+            self.in_flight -= 1
+
+        self.responses[str(response.status)] = self.responses.get(str(response.status), 0) + 1
+        return response
+
+    def _dhl_shipment(self, tracking_number):
+        status_code = _pick(tracking_number, DHL_STATUS_CODES)
+        return {
+            "id": tracking_number,
+            "service": "parcel-de",
+            "status": {"statusCode": status_code, "status": status_code.upper(), "description": status_code},
+            "estimatedTimeOfDelivery": _eta(tracking_number),
+            "serviceUrl": f"https://www.dhl.de/de/privatkunden/pakete-empfangen/verfolgen.html?idc={tracking_number}",
+        }
+
+    async def dhl_shipments(self, request):
+        if request.headers.get("DHL-API-Key") != self.api_key:
+            return web.json_response({"status": 401, "title": "Unauthorized"}, status=401)
+        numbers = [number for number in request.query.get("trackingNumber", "").split(",") if number]
+        if not numbers or len(numbers) > self.max_batch:
+            return web.json_response({"status": 400, "title": "Invalid trackingNumber"}, status=400)
+        return web.json_response({"shipments": [self._dhl_shipment(number) for number in numbers]})
+
+    async def gls_status(self, request):
+        numbers = [number for number in request.query.get("match", "").split(",") if number]
+        if not numbers or len(numbers) > self.max_batch:
+            return web.json_response({"exceptionText": "Invalid match"}, status=400)
+        return web.json_response({"tuStatus": [
+            {
+                "tuNo": number,
+                "progressBar": {"statusInfo": _pick(number, GENERIC_STATUSES), "statusText": ""},
+                "deliveryDate": _eta(number),
+            }
+            for number in numbers
+        ]})
+
+    async def hermes_details(self, request):
+        if request.headers.get("x-api-key") != self.api_key:
+            return web.json_response({"message": "Unauthorized"}, status=401)
+        number = request.match_info["tracking_number"]
+        return web.json_response({
+            "status": {"parcelStatus": _pick(number, HERMES_STATUSES), "text": {"longText": ""}},
+            "expectedDelivery": {"date": _eta(number)},
+        })
+
+    async def dpd_life_cycle(self, request):
+        number = request.match_info["tracking_number"]
+        return web.json_response({"parcellifecycleResponse": {"parcelLifeCycleData": {
+            "shipmentInfo": {"parcelLabelNumber": number, "predictInformation": {"date": _eta(number)}},
+            "statusInfo": [
+                {"status": "ACCEPTED", "label": "Auftrag übermittelt", "isCurrentStatus": False},
+                {"status": _pick(number, DPD_STATUSES), "label": "", "isCurrentStatus": True},
+            ],
+        }}})
+
+    def _generic_parcel(self, carrier, tracking_number):
+        return {
+            "trackingNumber": tracking_number,
+            "carrier": carrier,
+            "status": _pick(tracking_number, GENERIC_STATUSES),
+            "estimatedDelivery": _eta(tracking_number),
+            "trackingUrl": f"https://tracking.example/{carrier}/{tracking_number}",
+        }
+
+    async def generic_single(self, request):
+        carrier = request.match_info["carrier"]
+        return web.json_response({"parcels": [self._generic_parcel(carrier, request.match_info["tracking_number"])]})
+
+    async def generic_batch(self, request):
+        carrier = request.match_info["carrier"]
+        payload = await request.json()
+        numbers = payload.get("trackingNumbers", [])
+        if not numbers or len(numbers) > self.max_batch:
+            return web.json_response({"status": 400, "title": "Invalid batch"}, status=400)
+        return web.json_response({"parcels": [self._generic_parcel(carrier, number) for number in numbers]})
+
+    async def stats_handler(self, request):
+        return web.json_response(self.stats)
+
+
+class MockCarrierApiServer:
+    """Run a MockCarrierApi on a free loopback port inside the current event loop."""
+
+    def __init__(self, api=None, host="127.0.0.1", port=0):
+        self.api = api or MockCarrierApi()
+        self.host = host
+        self.port = port
+        self._runner = None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    async def __aenter__(self):
+        self._runner = web.AppRunner(self.api.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self._runner.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--jitter-ms", type=float, default=20)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--max-batch", type=int, default=20)
+    parser.add_argument("--api-key", default="bench-key")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    api = MockCarrierApi(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        max_batch=args.max_batch,
+        api_key=args.api_key,
+        seed=args.seed,
+    )
+    web.run_app(api.app, host=args.host, port=args.port, access_log=None)
+
+
+if __name__ == "__main__":
+    main()
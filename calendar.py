@@ -0,0 +1,81 @@
+# custom_components/parcel_tracking_info/calendar.py
+
+import logging
+from datetime import date, timedelta
+from homeassistant.components.calendar import CalendarEntity, CalendarEvent
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.device_registry import DeviceEntryType
+from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.util import dt as dt_util
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_setup_entry(hass, entry, async_add_entities: AddEntitiesCallback):
+    """Set up the calendar of expected deliveries."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    carrier = coordinator.carrier
+    display_name = hass.data.get(DOMAIN, {}).get('display_name', {}).get(carrier, carrier.capitalize())
+    async_add_entities([ParcelDeliveryCalendar(coordinator, carrier, display_name)])
+
+
+class ParcelDeliveryCalendar(CoordinatorEntity, CalendarEntity):
+    """Calendar with an all-day event on the expected delivery date of every parcel.
+
+    The events are read from the domain-wide parcel index, which keeps the
+    parcels of each config entry sorted by ETA date and is updated by the
+    coordinator after every refresh. Range queries bisect that list, so they
+    do not parse or scan the ETAs of all parcels.
+    """
+
+    def __init__(self, coordinator, carrier, display_name):
+        """Initialize the calendar."""
+        super().__init__(coordinator)
+        self.carrier = carrier
+        self.display_name = display_name
+
+        self._attr_name = f"{self.display_name} Deliveries"
+        self._attr_unique_id = f"{coordinator.unique_id}_{carrier}_deliveries"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, coordinator.unique_id)},
+            name=f"{self.display_name} Tracking Info",
+            manufacturer=carrier.upper(),
+            entry_type=DeviceEntryType.SERVICE,
+        )
+
+    def _deliveries(self, start, end, limit=None):
+        """Return the parcels expected from ``start`` until before ``end`` (dates)."""
+        parcel_index = self.hass.data.get(DOMAIN, {}).get("parcel_index")
+        if parcel_index is None:
+            return []
+        return parcel_index.eta_range(self.coordinator.entry.entry_id, start, end, limit=limit)
+
+    def _event(self, record):
+        """Return the all-day calendar event of an indexed parcel."""
+        description = f"Status: {record['status']}"
+        if record["service_url"] != "N/A":
+            description += f"\n{record['service_url']}"
+        return CalendarEvent(
+            start=record["eta_date"],
+            end=record["eta_date"] + timedelta(days=1),
+            summary=f"{self.display_name} {record['tracking_number']}",
+            description=description,
+            uid=f"{self.coordinator.unique_id}_{record['tracking_number']}",
+        )
+
+    @property
+    def event(self):
+        """Return the next expected delivery, starting today."""
+        today = dt_util.now().date()
+        deliveries = self._deliveries(today, date.max, limit=1)
+        return self._event(deliveries[0]) if deliveries else None
+
+    async def async_get_events(self, hass, start_date, end_date):
+        """Return the expected deliveries between ``start_date`` and ``end_date``."""
+        start = dt_util.as_local(start_date).date()
+        # end_date is exclusive: its own day only overlaps the range if end_date is after its midnight
+        end_local = dt_util.as_local(end_date)
+        end = end_local.date() + timedelta(days=1) if end_local.time() else end_local.date()
+        return [self._event(record) for record in self._deliveries(start, end)]
@@ -1,93 +1,281 @@
 # custom_components/parcel_tracking_info/carrier_apis.py
 
+import asyncio
 import aiohttp
 import logging
-from .trackingstatus import map_status
+from .circuit_breaker import CircuitOpenError, STATE_CLOSED
+from .deadline import Deadline, DeadlineExceeded
+from .trackingstatus import map_carrier_status
 
 _LOGGER = logging.getLogger(__name__)
 
+# Timeout (in seconds) of one request to a carrier API
+REQUEST_TIMEOUT = 10
+# Number of requests a carrier API instance runs at the same time
+MAX_CONCURRENT_REQUESTS = 4
+# HTTP status codes that count as a failure of the endpoint (others, e.g. 404 for an unknown parcel, do not)
+ENDPOINT_FAILURE_STATUSES = {401, 403, 408, 429}
+
+
+def is_endpoint_failure(error):
+    """Return True if a request error means the endpoint (or its credentials) is not usable."""
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status in ENDPOINT_FAILURE_STATUSES or error.status >= 500
+    return isinstance(error, (aiohttp.ClientError, asyncio.TimeoutError))
+
+
+def tracking_result(status_code="unknown", service_url="unknown", eta="N/A"):
+    """Return the normalized tracking info of a carrier API (merged into the parcel's data)."""
+    return {"status_code": status_code or "unknown", "service_url": service_url or "unknown", "eta": eta or "N/A"}
+
+
 class BaseCarrierAPI:
-    """Base class for carrier APIs."""
+    """
+    Base class for carrier APIs.
 
-    def __init__(self, api_key, api_url):
+    Subclasses implement ``_fetch_batch`` for up to ``batch_size`` tracking
+    numbers per request and return one tracking_result per number they know.
+    All requests of an instance share ``session`` (Home Assistant's client
+    session when given) and at most MAX_CONCURRENT_REQUESTS run at once.
+    With a ``breaker`` (circuit_breaker.CircuitBreaker) requests to an
+    endpoint that keeps failing are skipped instead of sent. Requests are not
+    started once ``deadline`` (deadline.Deadline) has expired, and their
+    timeout shrinks to the time left before it.
+    """
+
+    # Default endpoint, used when no API URL is configured
+    default_api_url = ""
+    # Whether the endpoint needs the configured API key
+    requires_api_key = True
+    # Tracking numbers per request
+    batch_size = 1
+
+    def __init__(self, api_key, api_url, session=None, metrics=None, breaker=None, deadline=None):
         self.api_key = api_key
-        self.api_url = api_url
+        # Older carrier templates store 'none' when there is no API URL
+        self.api_url = api_url if api_url and api_url.lower() != 'none' else self.default_api_url
+        self.session = session
+        self.metrics = metrics
+        self.breaker = breaker
+        self.deadline = deadline if deadline is not None else Deadline()
+        self._semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
 
-    async def fetch_tracking_info(self, tracking_number):
-        """Fetch tracking information. To be implemented by subclasses."""
+    @property
+    def base_url(self):
+        """Return the API URL including the scheme."""
+        api_url = self.api_url.rstrip("/")
+        if not api_url.startswith('http://') and not api_url.startswith('https://'):
+            api_url = 'https://' + api_url
+        return api_url
+
+    async def _get_json(self, url, params=None, headers=None):
+        """
+        GET a JSON document, raising aiohttp.ClientError on HTTP errors.
+
+        Raises CircuitOpenError without sending the request while the
+        endpoint's circuit is open, and DeadlineExceeded once the refresh
+        deadline has passed (or the request timed out because of it).
+        """
+        async with self._semaphore:
+            if self.deadline.expired:
+                raise DeadlineExceeded(url)
+            # Checked once a slot is free, so queued requests see failures of the ones before them
+            if self.breaker is not None and not self.breaker.allow_request():
+                if self.metrics is not None:
+                    self.metrics.increment("api_calls_rejected")
+                raise CircuitOpenError(self.breaker.endpoint)
+            if self.metrics is not None:
+                self.metrics.increment("api_calls")
+            timeout = self.deadline.timeout(REQUEST_TIMEOUT)
+            try:
+                tracking_info = await self._request_json(url, params, headers, timeout)
+            except asyncio.TimeoutError as e:
+                if timeout < REQUEST_TIMEOUT and self.deadline.expired:
+                    # Cut short by the refresh deadline, not a failure of the endpoint
+                    if self.breaker is not None:
+                        self.breaker.cancel_probe()
+                    raise DeadlineExceeded(url) from e
+                if self.breaker is not None:
+                    self.breaker.record_failure(type(e).__name__)
+                raise
+            except aiohttp.ClientError as e:
+                if self.breaker is not None:
+                    if is_endpoint_failure(e):
+                        self.breaker.record_failure(e)
+                    else:
+                        self.breaker.record_success()
+                raise
+            except BaseException:
+                if self.breaker is not None:
+                    self.breaker.cancel_probe()
+                raise
+            if self.breaker is not None:
+                self.breaker.record_success()
+            return tracking_info
+
+    async def _request_json(self, url, params, headers, timeout=REQUEST_TIMEOUT):
+        """Send the GET request through the shared session (or a temporary one)."""
+        timeout = aiohttp.ClientTimeout(total=timeout)
+        if self.session is not None:
+            async with self.session.get(url, params=params, headers=headers, timeout=timeout) as response:
+                response.raise_for_status()
+                return await response.json(content_type=None)
+        async with aiohttp.ClientSession() as session:
+            async with session.get(url, params=params, headers=headers, timeout=timeout) as response:
+                response.raise_for_status()
+                return await response.json(content_type=None)
+
+    async def _fetch_batch(self, tracking_numbers):
+        """Fetch up to ``batch_size`` tracking numbers. To be implemented by subclasses."""
         raise NotImplementedError
 
-class DHLAPI(BaseCarrierAPI):
-    """API implementation for DHL."""
+    async def _fetch_batch_safely(self, tracking_numbers):
+        """Fetch one batch, logging errors instead of raising them."""
+        try:
+            return await self._fetch_batch(tracking_numbers)
+        except CircuitOpenError:
+            _LOGGER.debug("Circuit of %s is open, skipping %d tracking numbers.", self.base_url, len(tracking_numbers))
+        except DeadlineExceeded:
+            _LOGGER.debug("Refresh deadline reached, skipping %d tracking numbers.", len(tracking_numbers))
+            self.deadline.truncate("api")
+        except aiohttp.ClientError as e:
+            _LOGGER.error("Client error while fetching %s tracking info: %s", type(self).__name__, e)
+        except asyncio.TimeoutError:
+            _LOGGER.error("Timeout while fetching %s tracking info", type(self).__name__)
+        except Exception as e:
+            _LOGGER.error("Unexpected error while fetching %s tracking info: %s", type(self).__name__, e)
+        return {}
+
+    async def fetch_tracking_infos(self, tracking_numbers):
+        """
+        Fetch tracking information for several tracking numbers.
+
+        Returns:
+            dict: tracking_result per tracking number the API answered for.
+            Numbers whose request failed or was skipped are left out, so the
+            caller keeps their email (or earlier API) data.
+        """
+        numbers = list(dict.fromkeys(
+            number for number in tracking_numbers if number and number.lower() != "unknown"
+        ))
+        batches = [numbers[index:index + self.batch_size] for index in range(0, len(numbers), self.batch_size)]
+        results = {}
+        if batches and self.breaker is not None and self.breaker.state != STATE_CLOSED:
+            # Probe a recovering endpoint with one batch before sending the others
+            results.update(await self._fetch_batch_safely(batches.pop(0)))
+            if self.breaker.state != STATE_CLOSED:
+                return results
+        for batch_results in await asyncio.gather(*(self._fetch_batch_safely(batch) for batch in batches)):
+            results.update(batch_results)
+        return results
 
     async def fetch_tracking_info(self, tracking_number):
+        """Fetch tracking information for one tracking number."""
         if not tracking_number or tracking_number.lower() == "unknown":
-            _LOGGER.debug(f"Invalid tracking number: {tracking_number}. Skipping API call.")
-            return {"status_code": "unknown", "service_url": "unknown", "eta": "N/A"}
+            _LOGGER.debug("Invalid tracking number: %s. Skipping API call.", tracking_number)
+            return tracking_result()
+        return (await self.fetch_tracking_infos([tracking_number])).get(tracking_number, tracking_result())
 
-        # Ensure the api_url includes the scheme
-        api_url = self.api_url
-        if not api_url.startswith('http://') and not api_url.startswith('https://'):
-            api_url = 'https://' + api_url
 
-        _LOGGER.debug(f"Fetching DHL tracking info for number: {tracking_number} from API: {api_url}")
-        headers = {"DHL-API-Key": self.api_key}
-        params = {"trackingNumber": tracking_number}
+class DHLAPI(BaseCarrierAPI):
+    """API implementation for DHL (Shipment Tracking - Unified)."""
 
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    api_url, headers=headers, params=params, timeout=10
-                ) as response:
-                    response.raise_for_status()
-                    tracking_info = await response.json()
-
-            if "shipments" in tracking_info and len(tracking_info["shipments"]) > 0:
-                shipment = tracking_info["shipments"][0]
-                eta = shipment.get("estimatedTimeOfDelivery", "N/A")
-                service_url = shipment.get("serviceUrl", "N/A")
-                status_description = shipment.get("status", {}).get("statusCode", "unknown")
-                _LOGGER.debug(f"Raw status description from DHL API: {status_description}")
-                status_code = map_status(status_description)
-                _LOGGER.debug(f"Normalized status code: {status_code}")
-                return {
-                    "status_code": status_code,
-                    "service_url": service_url,
-                    "eta": eta,
-                }
-            else:
-                _LOGGER.debug(f"No shipment data found for tracking number {tracking_number}")
-                return {"status_code": "unknown", "service_url": "unknown", "eta": "N/A"}
+    default_api_url = "https://api-eu.dhl.com/track/shipments"
 
-        except aiohttp.ClientError as e:
-            _LOGGER.error(f"Client error while fetching DHL tracking info: {e}")
-            return {"status_code": "unknown", "service_url": "unknown", "eta": "N/A"}
-        except Exception as e:
-            _LOGGER.error(f"Unexpected error while fetching DHL tracking info: {e}")
-            return {"status_code": "unknown", "service_url": "unknown", "eta": "N/A"}
+    async def _fetch_batch(self, tracking_numbers):
+        tracking_number = tracking_numbers[0]
+        _LOGGER.debug("Fetching DHL tracking info for number: %s from API: %s", tracking_number, self.base_url)
+        tracking_info = await self._get_json(
+            self.base_url, params={"trackingNumber": tracking_number}, headers={"DHL-API-Key": self.api_key}
+        )
+
+        if not tracking_info.get("shipments"):
+            _LOGGER.debug("No shipment data found for tracking number %s", tracking_number)
+            return {}
+        shipment = tracking_info["shipments"][0]
+        status = shipment.get("status", {})
+        status_description = status.get("statusCode", "unknown")
+        _LOGGER.debug("Raw status description from DHL API: %s", status_description)
+        return {tracking_number: tracking_result(
+            map_carrier_status("dhl", status_description, status.get("description")),
+            shipment.get("serviceUrl"),
+            shipment.get("estimatedTimeOfDelivery"),
+        )}
 
-# Implement other carrier APIs similarly
 
 class GLSAPI(BaseCarrierAPI):
-    """API implementation for GLS."""
+    """API implementation for GLS (public track and trace endpoint, several numbers per request)."""
+
+    default_api_url = "https://gls-group.eu/app/service/open/rest/DE/de/rstt001"
+    requires_api_key = False
+    batch_size = 10
+    tracking_url = "https://gls-group.eu/DE/de/paketverfolgung?match="
+
+    async def _fetch_batch(self, tracking_numbers):
+        _LOGGER.debug("Fetching GLS tracking info for %d numbers from API: %s", len(tracking_numbers), self.base_url)
+        tracking_info = await self._get_json(self.base_url, params={"match": ",".join(tracking_numbers)})
+
+        results = {}
+        for parcel in tracking_info.get("tuStatus", []):
+            tracking_number = str(parcel.get("tuNo", ""))
+            if tracking_number not in tracking_numbers:
+                continue
+            progress = parcel.get("progressBar", {})
+            results[tracking_number] = tracking_result(
+                map_carrier_status("gls", progress.get("statusInfo"), progress.get("statusText")),
+                self.tracking_url + tracking_number,
+                parcel.get("deliveryDate") or "N/A",
+            )
+        return results
 
-    async def fetch_tracking_info(self, tracking_number):
-        # Implement GLS API call logic here
-        pass
 
 class HermesAPI(BaseCarrierAPI):
-    """API implementation for Hermes."""
+    """API implementation for Hermes (parcel details endpoint, one number per request)."""
+
+    default_api_url = "https://api.my-deliveries.de/tnt/parcelservice/parceldetails"
+    tracking_url = "https://www.myhermes.de/empfangen/sendungsverfolgung/sendungsinformation/#"
+
+    async def _fetch_batch(self, tracking_numbers):
+        tracking_number = tracking_numbers[0]
+        _LOGGER.debug("Fetching Hermes tracking info for number: %s from API: %s", tracking_number, self.base_url)
+        tracking_info = await self._get_json(
+            f"{self.base_url}/{tracking_number}", headers={"x-api-key": self.api_key}
+        )
+
+        status = tracking_info.get("status") or {}
+        if not status:
+            _LOGGER.debug("No parcel data found for tracking number %s", tracking_number)
+            return {}
+        return {tracking_number: tracking_result(
+            map_carrier_status("hermes", status.get("parcelStatus"), (status.get("text") or {}).get("longText")),
+            self.tracking_url + tracking_number,
+            (tracking_info.get("expectedDelivery") or {}).get("date") or "N/A",
+        )}
 
-    async def fetch_tracking_info(self, tracking_number):
-        # Implement Hermes API call logic here
-        pass
 
 class DPDAPI(BaseCarrierAPI):
-    """API implementation for DPD."""
+    """API implementation for DPD (public parcel life cycle endpoint, one number per request)."""
+
+    default_api_url = "https://tracking.dpd.de/rest/plc/de_DE"
+    requires_api_key = False
+    tracking_url = "https://tracking.dpd.de/status/de_DE/parcel/"
+
+    async def _fetch_batch(self, tracking_numbers):
+        tracking_number = tracking_numbers[0]
+        _LOGGER.debug("Fetching DPD tracking info for number: %s from API: %s", tracking_number, self.base_url)
+        tracking_info = await self._get_json(f"{self.base_url}/{tracking_number}")
+
+        data = (tracking_info.get("parcellifecycleResponse") or {}).get("parcelLifeCycleData") or {}
+        current = next((status for status in data.get("statusInfo", []) if status.get("isCurrentStatus")), None)
+        if current is None:
+            _LOGGER.debug("No parcel data found for tracking number %s", tracking_number)
+            return {}
+        return {tracking_number: tracking_result(
+            map_carrier_status("dpd", current.get("status"), current.get("label")),
+            self.tracking_url + tracking_number,
+            ((data.get("shipmentInfo") or {}).get("predictInformation") or {}).get("date") or "N/A",
+        )}
 
-    async def fetch_tracking_info(self, tracking_number):
-        # Implement DPD API call logic here
-        pass
 
 # Map carrier names to their respective API classes
 CARRIER_API_CLASSES = {
@@ -97,3 +285,25 @@ CARRIER_API_CLASSES = {
     'dpd': DPDAPI,
     # Add other carriers as needed
 }
+
+
+def api_enabled(api_template, api_key, api_url, carrier=None):
+    """
+    Return True if parcels should be enriched through the carrier API.
+
+    Without an ``api_template`` the API of the ``carrier`` is used. An
+    ``api_url`` of 'none' (as in the GLS and DPD carrier templates) turns the
+    API off; without an ``api_url`` the API's default endpoint is only used if
+    the entry selected an ``api_template`` in the config or options flow, so
+    entries never call a public endpoint they did not opt into.
+    """
+    if api_template == 'no_api':
+        return False
+    api_class = CARRIER_API_CLASSES.get((api_template or carrier or "").lower())
+    if api_class is None:
+        return False
+    if api_class.requires_api_key and not api_key:
+        return False
+    if api_url:
+        return api_url.lower() != 'none'
+    return bool(api_template and api_class.default_api_url)
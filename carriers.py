@@ -5,14 +5,19 @@ CARRIER_TEMPLATES = {
         'name': 'DHL',
         'api_url': 'https://api-eu.dhl.com/track/shipments',
         'search_criteria': '(FROM "dhl")',
-        'tracking_pattern': r"\b\d{12}\b|\b\d{20}\b|\bJJD\d{12,24}\b",
+        'tracking_pattern': r"\b\d{12}\b|\b\d{20}\b|\bJJD\d{12,24}\b|\b[A-Z]{2}\d{9}[A-Z]{2}\b",
         'carrier': 'DHL',
         'email_parsing': {
             'eta_string': 'geplant für ',
             'eta_date_pattern': r"(?i)(?:Montag|Dienstag|Mittwoch|Donnerstag|Freitag|Samstag|Sonntag),\s+\d{1,2}\s+(?:Januar|Februar|März|April|Mai|Juni|Juli|August|September|Oktober|November|Dezember)",
             'status_strings': ['in transit', 'in delivery', 'out for delivery', 'in zustellung', 'wird zugestellt', 'unterwegs', 'in Kürze zugestellt', 'sendung unterwegs', 'in zustellung', 'wird zugestellt', 'abholbereit']
         },
-        'tracking_link_url': 'https://www.dhl.de/de/privatkunden/pakete-empfangen/verfolgen.html?lang=de&idc='
+        'tracking_link_url': 'https://www.dhl.de/de/privatkunden/pakete-empfangen/verfolgen.html?lang=de&idc=',
+        'checksums': ['dhl_paket', 'sscc', 'upu_s10'],
+        # Used to build a narrower server-side search (see search.compile_search_criteria)
+        'sender_domains': ['dhl.de', 'dhl.com', 'deutschepost.de'],
+        'subject_keywords': ['DHL', 'Paket', 'Sendung', 'Zustellung'],
+        'subject_exclude': ['Newsletter', 'Angebot', 'Gutschein', 'Umfrage'],
     },
     'hermes': {
         'name': 'Hermes',
@@ -25,7 +30,12 @@ CARRIER_TEMPLATES = {
             'eta_date_pattern': r"\d{2}\.\d{2}\.\d{4}",
             'status_strings': ['in transit', 'in delivery', 'out for delivery', 'in zustellung', 'wird zugestellt', 'unterwegs', 'in Kürze zugestellt', 'sendung unterwegs', 'in zustellung', 'wird zugestellt', 'abholbereit']
         },
-        'tracking_link_url': 'https://www.myhermes.de/empfangen/sendungsverfolgung/?suche='
+        'tracking_link_url': 'https://www.myhermes.de/empfangen/sendungsverfolgung/?suche=',
+        'checksums': ['hermes'],
+        # Used to build a narrower server-side search (see search.compile_search_criteria)
+        'sender_domains': ['myhermes.de', 'hermesworld.com', 'hermes-europe.de'],
+        'subject_keywords': ['Hermes', 'Paket', 'Sendung', 'Zustellung'],
+        'subject_exclude': ['Newsletter', 'Angebot', 'Gutschein', 'Umfrage'],
     },
     'amazon': {
         'name': 'Amazon',
@@ -37,7 +47,11 @@ CARRIER_TEMPLATES = {
             'eta_string': 'Zustellung:',
             'eta_date_pattern': r"\\w+,\\s+\\d{1,2}\\s+\\w+",
             'status_strings': ['in transit', 'in delivery', 'out for delivery', 'in zustellung', 'wird zugestellt', 'unterwegs', 'in Kürze zugestellt', 'sendung unterwegs', 'in zustellung', 'wird zugestellt', 'abholbereit']
-        }
+        },
+        # Used to build a narrower server-side search (see search.compile_search_criteria)
+        'sender_domains': ['amazon.de', 'amazon.com'],
+        'subject_keywords': ['versandt', 'Zustellung', 'Lieferung', 'zugestellt'],
+        'subject_exclude': ['Newsletter', 'Angebot', 'Gutschein', 'Umfrage'],
     },
     'DPD': {
         'name': 'DPD',
@@ -50,7 +64,12 @@ CARRIER_TEMPLATES = {
             'eta_date_pattern': '(\d+)-(\d+)\s+Werktagen',
             'status_strings': ['stellen wir', 'in transit', 'in delivery', 'out for delivery', 'in zustellung', 'wird zugestellt', 'unterwegs', 'in Kürze zugestellt', 'sendung unterwegs', 'in zustellung', 'wird zugestellt', 'abholbereit']
         },
-        'tracking_link_url': 'https://my.dpd.de/myparcels/dataprotection.aspx?action=2&parcelno=B2C0'
+        'tracking_link_url': 'https://my.dpd.de/myparcels/dataprotection.aspx?action=2&parcelno=B2C0',
+        'checksums': ['dpd'],
+        # Used to build a narrower server-side search (see search.compile_search_criteria)
+        'sender_domains': ['dpd.de', 'dpd.com'],
+        'subject_keywords': ['DPD', 'Paket', 'Sendung', 'Zustellung'],
+        'subject_exclude': ['Newsletter', 'Angebot', 'Gutschein', 'Umfrage'],
     },
     'GLS': {
         'name': 'GLS',
@@ -63,6 +82,11 @@ CARRIER_TEMPLATES = {
             'eta_date_pattern': '',
             'status_strings': ['in transit', 'in delivery', 'out for delivery', 'in zustellung', 'wird zugestellt', 'unterwegs', 'in Kürze zugestellt', 'sendung unterwegs', 'in zustellung', 'wird zugestellt', 'abholbereit']
         },
+        'checksums': ['gls'],
+        # Used to build a narrower server-side search (see search.compile_search_criteria)
+        'sender_domains': ['gls-group.eu', 'gls-pakete.de', 'gls-germany.com'],
+        'subject_keywords': ['GLS', 'Paket', 'Sendung', 'Zustellung'],
+        'subject_exclude': ['Newsletter', 'Angebot', 'Gutschein', 'Umfrage'],
     },     
     
 }
@@ -80,4 +104,30 @@ def add_custom_carrier(name, api_url="", search_criteria='', tracking_pattern=''
             'status_strings': []
         },
         'tracking_link_url': tracking_link_url
-    }
\ No newline at end of file
+    }
+
+def get_carrier_template(carrier):
+    """Return the template of a carrier, matching its name case-insensitively."""
+    if not carrier:
+        return {}
+    carrier = carrier.lower()
+    for key, template in CARRIER_TEMPLATES.items():
+        if key.lower() == carrier:
+            return template
+    return {}
+
+def get_search_template(carrier, search_criteria):
+    """
+    Return the search fields of a carrier template, or None if they should not be used.
+
+    The template is only used while the configured search criteria are still the
+    template's default; customized criteria are respected as they are.
+    """
+    template = get_carrier_template(carrier)
+    if not template.get('sender_domains') or search_criteria != template.get('search_criteria'):
+        return None
+    return {
+        'sender_domains': template['sender_domains'],
+        'subject_keywords': template.get('subject_keywords', []),
+        'subject_exclude': template.get('subject_exclude', []),
+    }
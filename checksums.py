@@ -0,0 +1,154 @@
+# custom_components/parcel_tracking_info/checksums.py
+
+import logging
+import re
+from datetime import datetime
+
+from .carriers import get_carrier_template
+
+_LOGGER = logging.getLogger(__name__)
+
+# Every validator returns None if it does not apply to the shape of the number,
+# otherwise True or False depending on whether the check digit is correct.
+# Forms printed without a check digit can only be rejected: they return False
+# for implausible digit runs (see _implausible_digits) and None otherwise.
+
+UPU_S10_WEIGHTS = (8, 6, 4, 2, 3, 5, 9, 7)
+ISO7064_ALPHABET = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+
+def _gs1_mod10(digits):
+    """Return the GS1 (weights 3,1 from the right) check digit of a digit string."""
+    total = sum(int(digit) * (3 if index % 2 == 0 else 1) for index, digit in enumerate(reversed(digits)))
+    return (10 - total % 10) % 10
+
+
+def _implausible_digits(digits):
+    """Return True for digit runs that are rarely parcel numbers.
+
+    Rejects runs made of one or two distinct digits (e.g. 10000000000000),
+    counting sequences (e.g. 12345678901) and 14-digit date-time stamps
+    (YYYYMMDDhhmmss, as found in order and invoice references).
+    """
+    if len(set(digits)) <= 2:
+        return True
+    if {(int(current) - int(previous)) % 10 for previous, current in zip(digits, digits[1:])} in ({1}, {9}):
+        return True
+    if len(digits) == 14 and digits[:2] in ("19", "20"):
+        try:
+            datetime.strptime(digits, "%Y%m%d%H%M%S")
+        except ValueError:
+            return False
+        return True
+    return False
+
+
+def validate_upu_s10(tracking_number):
+    """Validate a UPU S10 number (e.g. RR123456785DE) using the mod-11 check digit."""
+    match = re.fullmatch(r"[A-Z]{2}(\d{8})(\d)[A-Z]{2}", tracking_number.upper())
+    if not match:
+        return None
+    serial, check = match.groups()
+    total = sum(int(digit) * weight for digit, weight in zip(serial, UPU_S10_WEIGHTS))
+    expected = 11 - total % 11
+    if expected == 10:
+        expected = 0
+    elif expected == 11:
+        expected = 5
+    return expected == int(check)
+
+
+def validate_dhl_paket(tracking_number):
+    """Validate a 12-digit DHL Paket number (Identcode) using weights 4 and 9."""
+    if not re.fullmatch(r"\d{12}", tracking_number):
+        return None
+    total = sum(int(digit) * (4 if index % 2 == 0 else 9) for index, digit in enumerate(tracking_number[:11]))
+    return (10 - total % 10) % 10 == int(tracking_number[11])
+
+
+def validate_sscc(tracking_number):
+    """Validate a 20-digit SSCC-based number (00 + 18 digits) using the GS1 mod-10 check digit."""
+    if not re.fullmatch(r"00\d{18}", tracking_number):
+        return None
+    return _gs1_mod10(tracking_number[2:19]) == int(tracking_number[19])
+
+
+def validate_dpd(tracking_number):
+    """Validate a DPD parcel number with its ISO 7064 MOD 37,36 check character.
+
+    The 14-digit form printed in most mails carries no check character; it is
+    only rejected if its digits are implausible.
+    """
+    if re.fullmatch(r"\d{14}", tracking_number):
+        return False if _implausible_digits(tracking_number) else None
+    if not re.fullmatch(r"\d{14}[0-9A-Z]", tracking_number.upper()):
+        return None
+    product = 36
+    for char in tracking_number[:14]:
+        total = (product + ISO7064_ALPHABET.index(char)) % 36 or 36
+        product = (total * 2) % 37
+    expected = (37 - product) % 36
+    return ISO7064_ALPHABET[expected] == tracking_number[14].upper()
+
+
+def validate_gls(tracking_number):
+    """Validate a 12-digit GLS parcel number (11 digits + mod-10 check digit).
+
+    The 11-digit form without the check digit is only rejected if its digits are implausible.
+    """
+    if re.fullmatch(r"\d{11}", tracking_number):
+        return False if _implausible_digits(tracking_number) else None
+    if not re.fullmatch(r"\d{12}", tracking_number):
+        return None
+    total = sum(int(digit) * (3 if index % 2 == 0 else 1) for index, digit in enumerate(reversed(tracking_number[:11])))
+    return (10 - (total + 1) % 10) % 10 == int(tracking_number[11])
+
+
+def validate_hermes(tracking_number):
+    """Reject implausible Hermes numbers (H + 19 digits or 14 digits); they carry no known check digit."""
+    match = re.fullmatch(r"H(\d{19})|(\d{14})", tracking_number.upper())
+    if not match:
+        return None
+    return False if _implausible_digits(match.group(1) or match.group(2)) else None
+
+
+# Map validator names (as used in CARRIER_TEMPLATES 'checksums') to their functions
+CHECKSUM_VALIDATORS = {
+    'upu_s10': validate_upu_s10,
+    'dhl_paket': validate_dhl_paket,
+    'sscc': validate_sscc,
+    'dpd': validate_dpd,
+    'gls': validate_gls,
+    'hermes': validate_hermes,
+}
+
+
+def get_validators(carrier):
+    """Return the (name, function) validators configured for a carrier template."""
+    names = get_carrier_template(carrier).get('checksums', [])
+    validators = []
+    for name in names:
+        validator = CHECKSUM_VALIDATORS.get(name)
+        if validator is None:
+            _LOGGER.warning("Unknown checksum validator '%s' for carrier '%s'.", name, carrier)
+            continue
+        validators.append((name, validator))
+    return validators
+
+
+def check_tracking_number(tracking_number, validators):
+    """
+    Run the validators that apply to a tracking number.
+
+    Returns:
+        Tuple[Optional[bool], Optional[str]]: None if no validator applies, True if
+        all applicable validators passed, or False and the name of the failing one.
+    """
+    result = None
+    for name, validator in validators:
+        valid = validator(tracking_number)
+        if valid is False:
+            return False, name
+        if valid:
+            result = True
+    return result, None
@@ -0,0 +1,136 @@
+# custom_components/parcel_tracking_info/circuit_breaker.py
+
+import logging
+import time
+
+_LOGGER = logging.getLogger(__name__)
+
+# Consecutive failed requests that open the circuit of an endpoint
+DEFAULT_FAILURE_THRESHOLD = 3
+# Seconds an open circuit waits before letting a probe request through
+DEFAULT_PROBE_INTERVAL = 300
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request to an endpoint whose circuit is open."""
+
+
+class CircuitBreaker:
+    """Closed/open/half-open circuit of one carrier API endpoint.
+
+    While closed every request is sent. ``failure_threshold`` consecutive
+    failures open the circuit: requests are rejected right away until
+    ``probe_interval`` seconds have passed. Then the circuit is half-open and a
+    single probe request is let through; its success closes the circuit, its
+    failure opens it for another ``probe_interval``.
+    """
+
+    def __init__(self, endpoint, failure_threshold=DEFAULT_FAILURE_THRESHOLD, probe_interval=DEFAULT_PROBE_INTERVAL):
+        """Initialize the circuit breaker."""
+        self.endpoint = endpoint
+        self.failure_threshold = failure_threshold
+        self.probe_interval = probe_interval
+        self._state = STATE_CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = None
+        self._probe_in_flight = False
+        self.last_error = None
+        self.rejected = 0
+        self.times_opened = 0
+
+    @property
+    def state(self):
+        """Return the current state, moving an expired open circuit to half-open."""
+        if self._state == STATE_OPEN and time.monotonic() - self._opened_at >= self.probe_interval:
+            self._state = STATE_HALF_OPEN
+            self._probe_in_flight = False
+        return self._state
+
+    def allow_request(self):
+        """Return True if a request may be sent now, False if it has to be skipped."""
+        state = self.state
+        if state == STATE_CLOSED:
+            return True
+        if state == STATE_HALF_OPEN and not self._probe_in_flight:
+            _LOGGER.debug("Sending a probe request to %s.", self.endpoint)
+            self._probe_in_flight = True
+            return True
+        self.rejected += 1
+        return False
+
+    def cancel_probe(self):
+        """Forget a probe request that ended without telling whether the endpoint works."""
+        self._probe_in_flight = False
+
+    def record_success(self):
+        """Record a request the endpoint answered."""
+        if self._state != STATE_CLOSED:
+            _LOGGER.info("Carrier API %s is responding again, closing its circuit.", self.endpoint)
+        self._state = STATE_CLOSED
+        self._consecutive_failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self, error=None):
+        """Record a failed request, opening the circuit once the threshold is reached."""
+        self._consecutive_failures += 1
+        self.last_error = str(error) if error is not None else None
+        if self._state == STATE_HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+            if self._state != STATE_OPEN:
+                _LOGGER.warning(
+                    "Carrier API %s failed %s times, skipping it for %s seconds.",
+                    self.endpoint, self._consecutive_failures, self.probe_interval,
+                )
+                self.times_opened += 1
+            self._state = STATE_OPEN
+            self._opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+    @property
+    def stats(self):
+        """Return a snapshot of the circuit state."""
+        state = self.state
+        return {
+            "state": state,
+            "consecutive_failures": self._consecutive_failures,
+            "failure_threshold": self.failure_threshold,
+            "probe_interval": self.probe_interval,
+            "seconds_until_probe": (
+                max(0, round(self._opened_at + self.probe_interval - time.monotonic()))
+                if state == STATE_OPEN else None
+            ),
+            "rejected": self.rejected,
+            "times_opened": self.times_opened,
+            "last_error": self.last_error,
+        }
+
+
+class CircuitBreakerRegistry:
+    """Domain-wide circuit breakers, one per carrier API endpoint and credentials.
+
+    Carrier API instances only live for one refresh, so the breakers are kept
+    here to carry their state from one refresh (and config entry) to the next.
+    """
+
+    def __init__(self):
+        """Initialize the registry."""
+        self._breakers = {}  # (endpoint, api_key) -> CircuitBreaker
+
+    def get(self, endpoint, api_key=None, failure_threshold=DEFAULT_FAILURE_THRESHOLD,
+            probe_interval=DEFAULT_PROBE_INTERVAL):
+        """Return the breaker of an endpoint, applying the given thresholds."""
+        # Keyed by credentials too, so a revoked key does not block entries with a valid one
+        breaker = self._breakers.get((endpoint, api_key))
+        if breaker is None:
+            breaker = self._breakers[(endpoint, api_key)] = CircuitBreaker(endpoint)
+        breaker.failure_threshold = failure_threshold
+        breaker.probe_interval = probe_interval
+        return breaker
+
+    @property
+    def stats(self):
+        """Return the state of every breaker (without credentials)."""
+        return [{"endpoint": breaker.endpoint, **breaker.stats} for breaker in self._breakers.values()]
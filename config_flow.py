@@ -9,7 +9,7 @@ from homeassistant.helpers import config_validation as cv
 from homeassistant.components.persistent_notification import create as persistent_notification_create
 from .const import DOMAIN
 from .carriers import CARRIER_TEMPLATES, add_custom_carrier
-from .parcel_tracking import extract_tracking_number, extract_eta_from_email, extract_status_from_email
+from .parcel_tracking import extract_tracking_numbers, extract_eta_from_email, extract_status_from_email
 from .carrier_apis import CARRIER_API_CLASSES
 from .options_flow import OptionsFlowHandler  # Import the OptionsFlowHandler
 from .helpers import test_email_connection, process_status_strings
@@ -242,7 +242,9 @@ class ParcelTrackingInfoConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     status_strings = [s.strip() for s in self.user_input.get('status_strings', '').split(',') if s.strip()]
 
                     # Test tracking number extraction
-                    tracking_number = extract_tracking_number(email_body, tracking_pattern, set())
+                    tracking_number = ', '.join(
+                        item['tracking_number'] for item in extract_tracking_numbers(email_body, tracking_pattern, set())
+                    )
                     if not tracking_number:
                         errors['base'] = 'no_tracking_number_found'
 
@@ -312,15 +314,13 @@ class ParcelTrackingInfoConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         carrier = self.user_input.get('carrier')
         api_schema = vol.Schema({})
 
-        if carrier == 'dhl':
-            api_schema = vol.Schema({
-                vol.Required('api_key'): cv.string,
-                vol.Required('api_url', default='https://api-eu.dhl.com/track/shipments'): cv.url,
-            })
-        elif carrier == 'gls':
+        if carrier in CARRIER_API_CLASSES:
+            api_class = CARRIER_API_CLASSES[carrier]
+            # Public tracking endpoints (GLS, DPD) work without an API key
+            key_field = vol.Required('api_key') if api_class.requires_api_key else vol.Optional('api_key', default='')
             api_schema = vol.Schema({
-                vol.Required('api_key'): cv.string,
-                vol.Required('api_url', default='https://api.gls.com/track/shipments'): cv.url,
+                key_field: cv.string,
+                vol.Required('api_url', default=api_class.default_api_url): cv.url,
             })
         # Add other carriers as needed
 
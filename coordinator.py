@@ -3,15 +3,39 @@
 import asyncio
 from datetime import timedelta
 import logging
+import time
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
-from .parcel_tracking import fetch_tracking_info, fetch_emails
+from .parcel_tracking import (
+    fetch_tracking_infos,
+    fetch_emails,
+    fetch_jmap_emails,
+    fetch_local_emails,
+    DEFAULT_MAX_IN_FLIGHT_BYTES,
+)
+from .backfill import BackfillJob
+from .carrier_apis import api_enabled
 from .const import DOMAIN
-from .carriers import CARRIER_TEMPLATES
+from .carriers import CARRIER_TEMPLATES, get_search_template
+from .checksums import get_validators
+from .circuit_breaker import DEFAULT_FAILURE_THRESHOLD, DEFAULT_PROBE_INTERVAL
+from .deadline import Deadline, DEFAULT_REFRESH_TIMEOUT
+from .events import diff_parcel_states, parcel_states
+from .freshness import merge_tracking_info, needs_api_lookup
+from .instrumentation import RefreshMetrics
+from .jmap import JmapMailSource
+from .mailboxes import account_key, get_additional_accounts, parse_folders
+from .mail_sources import LocalMailSource, parse_local_paths
 from homeassistant.const import CONF_EMAIL, CONF_PASSWORD, CONF_HOST, CONF_PORT
 
 _LOGGER = logging.getLogger(__name__)
 
+SNAPSHOT_STORAGE_VERSION = 1
+# Delay (in seconds) before a changed snapshot is written to disk
+SNAPSHOT_SAVE_DELAY = 10
+
 
 class ParcelTrackingCoordinator(DataUpdateCoordinator):
     """Coordinator to manage fetching email data and API results efficiently."""
@@ -25,6 +49,20 @@ class ParcelTrackingCoordinator(DataUpdateCoordinator):
         self.lock = asyncio.Lock()  # Instance-specific lock
         self.processed_tracking_numbers = set()  # Instance-specific set
         self.active_indices = set()  # Track active sensor indices
+        self._parcels = {}  # Known parcels within email_age, keyed by tracking number
+        self._hydrated = False  # Whether the parcels were loaded from the history store
+        self._last_sync = None  # Timestamp of the last successful email sync
+        self._uid_state = {}  # STATUS values and highest UID seen per account and folder, sync state per JMAP account
+        self._local_state = {}  # Processed files per local mail source, saved with the snapshot
+        self._jmap_source = None  # JmapMailSource of the configured account, keeps its session between refreshes
+        self.removed_tracking_numbers = []  # Tracking numbers whose mails were deleted during the last refresh
+        self._parcel_states = None  # Normalized parcel states of the last refresh, None before the first one
+        self.checksum_rejects = {}  # Rejected tracking number candidates per checksum validator
+        self.metrics = RefreshMetrics()  # Stage timings and counters of the refreshes
+        self.profiler = None  # RefreshProfiler while a refresh is profiled on demand
+        self.carrier = entry.options.get("carrier", entry.data.get("carrier", "dhl")).lower()
+        self._snapshot_store = Store(hass, SNAPSHOT_STORAGE_VERSION, f"{DOMAIN}.snapshot.{entry.entry_id}")
+        self.backfill = BackfillJob(hass, self)  # Service-triggered reading of older mail into the history
 
         # Get the update interval from configuration
         update_interval_minutes = int(entry.options.get(
@@ -41,8 +79,55 @@ class ParcelTrackingCoordinator(DataUpdateCoordinator):
             update_interval=update_interval,
         )
 
+    @property
+    def mailbox_key(self):
+        """Return the key identifying the mail account this coordinator reads from (whatever its folders)."""
+        return (
+            self.entry.options.get(CONF_HOST, self.entry.data.get(CONF_HOST, "")),
+            self.entry.options.get(CONF_PORT, self.entry.data.get(CONF_PORT, 0)),
+            self.entry.options.get(CONF_EMAIL, self.entry.data.get(CONF_EMAIL, "")).lower(),
+        )
+
     async def _async_update_data(self):
-        """Fetch data from emails and API."""
+        """Fetch data from emails and API, scheduled through the domain orchestrator."""
+        orchestrator = self.hass.data.get(DOMAIN, {}).get("orchestrator")
+        if orchestrator is None:
+            return await self.async_refresh_tracking_data()
+        return await orchestrator.async_refresh(self.mailbox_key, self)
+
+    @property
+    def refresh_timeout(self):
+        """Return the time budget of a refresh in seconds, never longer than the update interval."""
+        refresh_timeout = int(self.entry.options.get(
+            'refresh_timeout', self.entry.data.get('refresh_timeout', DEFAULT_REFRESH_TIMEOUT)
+        ))
+        if self.update_interval is not None:
+            refresh_timeout = min(refresh_timeout, self.update_interval.total_seconds())
+        return refresh_timeout
+
+    async def async_refresh_tracking_data(self, sessions=None):
+        """
+        Fetch data from emails and API within the refresh deadline.
+
+        ``sessions`` (an orchestrator.ImapSessionPool) lets the refresh reuse the
+        IMAP sessions of the coordinators refreshed before it in the same job.
+        """
+        with self.metrics.refresh():
+            deadline = Deadline(self.refresh_timeout)
+            try:
+                return await self._async_refresh_tracking_data(deadline, sessions)
+            finally:
+                for stage in deadline.truncated:
+                    self.metrics.mark_truncated(stage)
+                if deadline.truncated:
+                    _LOGGER.warning(
+                        "Refresh of %s reached its deadline of %s seconds, cut short: %s. "
+                        "The rest follows with the next refresh.",
+                        self.entry.title, deadline.seconds, ', '.join(deadline.truncated),
+                    )
+
+    async def _async_refresh_tracking_data(self, deadline, sessions=None):
+        """Fetch data from emails and API, timed by async_refresh_tracking_data."""
         _LOGGER.debug("Starting data update in coordinator.")
 
         try:
@@ -97,20 +182,94 @@ class ParcelTrackingCoordinator(DataUpdateCoordinator):
 
             _LOGGER.debug("Updating coordinator data.")
 
+            history = self.hass.data.get(DOMAIN, {}).get("history")
+            sync_started = time.time()
+            window_start = sync_started - int(email_age) * 86400
+
+            # Hydrate the parcels from disk once, so only the delta needs to come from IMAP
+            if history is not None and not self._hydrated:
+                with self.metrics.span("history"):
+                    self._parcels = await self.hass.async_add_executor_job(
+                        history.load_parcels, self.entry.entry_id, window_start
+                    )
+                    self._last_sync = await self.hass.async_add_executor_job(
+                        history.get_last_sync, self.entry.entry_id
+                    )
+                self._hydrated = True
+                _LOGGER.debug("Hydrated %d parcels from history.", len(self._parcels))
+
+            # Only search mail received since the last successful sync (SINCE has day granularity)
+            search_age = int(email_age)
+            if self._last_sync is not None:
+                days_since_sync = int((sync_started - self._last_sync) // 86400) + 1
+                search_age = max(1, min(search_age, days_since_sync))
+
             # Fetch tracking numbers from emails
-            new_tracking_data = await self.fetch_tracking_numbers(
-                imap_server,
-                imap_port,
-                email_account,
-                email_password,
-                email_folder,
-                search_criteria,
-                tracking_pattern,
-                email_age,  # Pass email_age
-            )
+            with self.metrics.span("fetch_emails"):
+                new_tracking_data = await self.fetch_tracking_numbers(
+                    imap_server,
+                    imap_port,
+                    email_account,
+                    email_password,
+                    email_folder,
+                    search_criteria,
+                    tracking_pattern,
+                    search_age,  # Pass email_age
+                    deadline,
+                    sessions,
+                )
+
+            # Skip tracking numbers that another carrier found with a higher confidence
+            tracking_index = self.hass.data.get(DOMAIN, {}).get("tracking_index")
+            if tracking_index is not None:
+                new_tracking_data = [
+                    tracking for tracking in new_tracking_data
+                    if tracking_index.claim(
+                        tracking["tracking_number"], self.entry.entry_id, self.carrier, tracking.get("confidence", 0)
+                    )
+                ]
+                for tracking_number, tracking in list(self._parcels.items()):
+                    if not tracking_index.claim(
+                        tracking_number, self.entry.entry_id, self.carrier, tracking.get("confidence", 0)
+                    ):
+                        del self._parcels[tracking_number]
+
+            # Parcels known from earlier refreshes that did not have to be parsed again
+            fetched_numbers = {tracking["tracking_number"] for tracking in new_tracking_data}
+            self.metrics.increment("cache_hits", sum(1 for number in self._parcels if number not in fetched_numbers))
+
+            # Merge the delta into the known parcels (keeping the freshest value of each field)
+            # and drop those older than email_age
+            for tracking in new_tracking_data:
+                known = self._parcels.get(tracking["tracking_number"], {})
+                self._parcels[tracking["tracking_number"]] = merge_tracking_info(dict(known), tracking)
+            # Drop parcels whose mails were deleted from the mailbox
+            for tracking_number in self.removed_tracking_numbers:
+                if tracking_number not in fetched_numbers and self._parcels.pop(tracking_number, None):
+                    _LOGGER.debug("Removed %s, its email was deleted.", tracking_number)
+            self._parcels = {
+                number: tracking
+                for number, tracking in self._parcels.items()
+                if (tracking.get("email_timestamp") or sync_started) >= window_start
+            }
+
+            if tracking_index is not None:
+                tracking_index.release(self.entry.entry_id, keep=self._parcels)
+
+            if history is not None:
+                # Record the merged parcels: a mail without an ETA or with a vaguer status than the
+                # API reported earlier must not overwrite the stored values and log a false transition
+                merged_tracking_data = [
+                    self._parcels[tracking["tracking_number"]] for tracking in new_tracking_data
+                    if tracking["tracking_number"] in self._parcels
+                ]
+                with self.metrics.span("history"):
+                    await self.hass.async_add_executor_job(
+                        history.record, self.entry.entry_id, self.carrier, merged_tracking_data, "email"
+                    )
 
             # Sort tracking_data to maintain consistent ordering
-            new_tracking_data_sorted = sorted(new_tracking_data, key=lambda x: x["tracking_number"])
+            new_tracking_data_sorted = sorted(self._parcels.values(), key=lambda x: x["tracking_number"])
 
             # Update self.tracking_data with sorted data
             self.tracking_data = new_tracking_data_sorted
@@ -122,7 +281,21 @@ class ParcelTrackingCoordinator(DataUpdateCoordinator):
             self.active_indices = new_indices
 
             # Fetch tracking info for each tracking number
-            await self.fetch_tracking_info(api_key, api_url, api_template, carrier)
+            await self.fetch_tracking_info(api_key, api_url, api_template, carrier, deadline)
+            # Mail left unread by the deadline must still be covered by the next search
+            emails_complete = all(stage == "api" for stage in deadline.truncated)
+            if history is not None:
+                with self.metrics.span("history"):
+                    if api_enabled(api_template, api_key, api_url, carrier):
+                        await self.hass.async_add_executor_job(
+                            history.record, self.entry.entry_id, self.carrier, self.tracking_data, "api"
+                        )
+                    if emails_complete:
+                        await self.hass.async_add_executor_job(
+                            history.set_last_sync, self.entry.entry_id, sync_started
+                        )
+            if emails_complete:
+                self._last_sync = sync_started
 
             # Handle tracking_link_url to set service_url
             if tracking_link_url:
@@ -133,9 +306,16 @@ class ParcelTrackingCoordinator(DataUpdateCoordinator):
                         # Construct the tracking URL
                         tracking_url = self.construct_tracking_url(tracking_link_url, tracking_number)
                         tracking["service_url"] = tracking_url
-                        _LOGGER.debug(f"Set service_url for {tracking_number} to {tracking['service_url']}")
+                        _LOGGER.debug("Set service_url for %s to %s", tracking_number, tracking["service_url"])
+
+            # Tell automations about parcels whose state changed since the last refresh
+            self._fire_parcel_events()
+            self._update_parcel_index()
+
+            # Keep the last known data on disk for a warm start
+            self._snapshot_store.async_delay_save(self._snapshot_data, SNAPSHOT_SAVE_DELAY)
 
-            _LOGGER.debug(f"Coordinator tracking data after update: {self.tracking_data}")
+            _LOGGER.debug("Coordinator tracking data after update: %s", self.tracking_data)
             _LOGGER.debug("Data update completed successfully.")
             return self.tracking_data
 
@@ -143,6 +323,75 @@ class ParcelTrackingCoordinator(DataUpdateCoordinator):
             _LOGGER.error(f"Error updating data: {e}")
             raise UpdateFailed(f"Error fetching data: {e}")
 
+    def merge_parcels(self, tracking_data):
+        """
+        Merge parcels read outside of a refresh (e.g. by a backfill) into the known parcels.
+
+        Parcels older than email_age are left to the history; the next refresh
+        shows the merged ones.
+        """
+        email_age = int(self.entry.options.get('email_age', self.entry.data.get('email_age', 10)))
+        window_start = time.time() - email_age * 86400
+        for tracking in tracking_data:
+            if (tracking.get("email_timestamp") or 0) >= window_start:
+                known = self._parcels.get(tracking["tracking_number"], {})
+                self._parcels[tracking["tracking_number"]] = merge_tracking_info(dict(known), tracking)
+
+    def _fire_parcel_events(self):
+        """Fire an event for every parcel added, changed or delivered since the previous refresh."""
+        states = parcel_states(self.tracking_data)
+        # Without a previous snapshot (first setup) the current parcels are the baseline
+        if self._parcel_states is not None:
+            for event_type, event_data in diff_parcel_states(self._parcel_states, states):
+                _LOGGER.debug("Firing %s for %s.", event_type, event_data["tracking_number"])
+                self.hass.bus.async_fire(
+                    event_type, {"entry_id": self.entry.entry_id, "carrier": self.carrier, **event_data}
+                )
+                self.metrics.increment("events_fired")
+        self._parcel_states = states
+
+    def _update_parcel_index(self):
+        """Update this entry's parcels in the domain-wide index used by the query service and the calendar."""
+        parcel_index = self.hass.data.get(DOMAIN, {}).get("parcel_index")
+        if parcel_index is not None:
+            parcel_index.update_entry(self.entry.entry_id, self.carrier, self.tracking_data)
+
+    def _snapshot_data(self):
+        """Return the data written to the snapshot store."""
+        return {
+            "tracking_data": self.tracking_data,
+            "parcel_states": self._parcel_states,
+            # Local mail is not read again after a restart; its parcels come back with the snapshot or history
+            "local_sources": self._local_state,
+        }
+
+    async def async_restore_snapshot(self):
+        """Restore the last saved tracking data, returning True if a snapshot was found."""
+        try:
+            snapshot = await self._snapshot_store.async_load()
+        except Exception as e:
+            _LOGGER.warning("Could not load tracking data snapshot: %s", e)
+            return False
+
+        if not snapshot or "tracking_data" not in snapshot:
+            return False
+
+        self.tracking_data = snapshot["tracking_data"]
+        # Older snapshots have no parcel states; derive them so a restart does not fire events again
+        self._parcel_states = snapshot.get("parcel_states") or parcel_states(self.tracking_data)
+        # Keep the parcels of the processed local mail (replaced by the history when it is available)
+        self._parcels = {tracking["tracking_number"]: tracking for tracking in self.tracking_data}
+        self._local_state = snapshot.get("local_sources") or {}
+        self.active_indices = set(range(len(self.tracking_data)))
+        self._update_parcel_index()
+        self.async_set_updated_data(self.tracking_data)
+        _LOGGER.debug("Restored %s parcels from snapshot.", len(self.tracking_data))
+        return True
+
+    async def async_remove_snapshot(self):
+        """Delete the snapshot of this coordinator."""
+        await self._snapshot_store.async_remove()
+
     def construct_tracking_url(self, base_url, tracking_number):
         """Construct the tracking URL with tracking number appended appropriately."""
         # Include your existing method implementation here
@@ -191,6 +440,15 @@ class ParcelTrackingCoordinator(DataUpdateCoordinator):
             new_parsed_url = parsed_url._replace(path=new_path)
             return urlunparse(new_parsed_url)
 
+    @property
+    def email_parsing(self):
+        """Return the email parsing rules from config."""
+        return {
+            'eta_string': self.entry.options.get('eta_string', self.entry.data.get('eta_string', '')),
+            'eta_date_pattern': self.entry.options.get('eta_date_pattern', self.entry.data.get('eta_date_pattern', '')),
+            'status_strings': self.entry.options.get('status_strings', self.entry.data.get('status_strings', [])),
+        }
+
     async def fetch_tracking_numbers(
         self,
         imap_server,
@@ -201,48 +459,162 @@ class ParcelTrackingCoordinator(DataUpdateCoordinator):
         search_criteria,
         tracking_pattern,
         email_age,  # New parameter
+        deadline=None,
+        sessions=None,
     ):
         """Fetch tracking numbers from the email."""
         _LOGGER.debug("Fetching tracking numbers from email.")
 
-        # Get email parsing rules from config
-        email_parsing = {
-            'eta_string': self.entry.options.get('eta_string', self.entry.data.get('eta_string', '')),
-            'eta_date_pattern': self.entry.options.get('eta_date_pattern', self.entry.data.get('eta_date_pattern', '')),
-            'status_strings': self.entry.options.get('status_strings', self.entry.data.get('status_strings', [])),
-        }
+        email_parsing = self.email_parsing
+        max_in_flight_mb = int(self.entry.options.get(
+            'max_in_flight_mb',
+            self.entry.data.get('max_in_flight_mb', DEFAULT_MAX_IN_FLIGHT_BYTES // (1024 * 1024)),
+        ))
 
-        new_tracking_data = await fetch_emails(
-            self.hass,  # Pass hass instance
-            imap_server,
-            imap_port,
-            email_account,
-            email_password,
-            email_folder,
-            search_criteria,
-            tracking_pattern,
-            self.processed_tracking_numbers,  # Pass the instance-specific set
-            self.lock,  # Pass the lock
-            email_parsing,  # Pass the user-configured email parsing rules
-            email_age=email_age  # Pass email_age
-        )
-        _LOGGER.debug(f"New tracking numbers fetched: {new_tracking_data}")
+        new_tracking_data = []
+        self.removed_tracking_numbers = []
+        accounts = get_additional_accounts(self.entry)
+        jmap_session_url = self.entry.options.get('jmap_session_url', self.entry.data.get('jmap_session_url', ''))
+        if jmap_session_url:
+            # The configured account is read over JMAP, a page of messages per HTTP request
+            if self._jmap_source is None:
+                self._jmap_source = JmapMailSource(
+                    jmap_session_url,
+                    self.entry.options.get('jmap_token', self.entry.data.get('jmap_token', '')),
+                    async_get_clientsession(self.hass),
+                    email_folder,
+                )
+            new_tracking_data.extend(await fetch_jmap_emails(
+                self.profiler.hass if self.profiler else self.hass,
+                self._jmap_source,
+                search_criteria,
+                tracking_pattern,
+                self.processed_tracking_numbers,
+                email_parsing,
+                email_age=email_age,
+                carrier=self.carrier,
+                raise_errors=True,
+                validators=get_validators(self.carrier),
+                rejected=self.checksum_rejects,
+                metrics=self.metrics,
+                search_template=get_search_template(self.carrier, search_criteria),  # Narrow server-side query
+                source_state=self._uid_state.setdefault(self._jmap_source.key, {}),  # State string of the last sync
+                removed=self.removed_tracking_numbers,
+                deadline=deadline,
+            ))
+        else:
+            # The configured account first, then the additional ones, each in its own IMAP session
+            accounts.insert(0, {
+                "host": imap_server,
+                "port": imap_port,
+                "email": email_account,
+                "password": email_password,
+                "folders": parse_folders(email_folder),
+            })
+
+        for account in accounts:
+            new_tracking_data.extend(await fetch_emails(
+                self.profiler.hass if self.profiler else self.hass,  # Profile the executor jobs on demand
+                account["host"],
+                account["port"],
+                account["email"],
+                account["password"],
+                account["folders"],
+                search_criteria,
+                tracking_pattern,
+                self.processed_tracking_numbers,  # Pass the instance-specific set
+                self.lock,  # Pass the lock
+                email_parsing,  # Pass the user-configured email parsing rules
+                email_age=email_age,  # Pass email_age
+                carrier=self.carrier,  # Used to score the extracted tracking numbers
+                raise_errors=True,  # Keep the known parcels if a mailbox cannot be read
+                validators=get_validators(self.carrier),  # Discard candidates with a wrong check digit
+                rejected=self.checksum_rejects,
+                metrics=self.metrics,
+                max_in_flight_bytes=max_in_flight_mb * 1024 * 1024,
+                search_template=get_search_template(self.carrier, search_criteria),  # Narrow server-side search
+                # Skip unchanged folders and only search messages that arrived since the last refresh
+                uid_state=self._uid_state.setdefault(account_key(account), {}),
+                unseen_only=self.entry.options.get('unseen_only', self.entry.data.get('unseen_only', False)),
+                removed=self.removed_tracking_numbers,  # Parcels whose mails were deleted
+                deadline=deadline,  # Stop reading mail when the refresh runs out of time
+                sessions=sessions,  # Log in once per account for all coordinators of an orchestrator job
+            ))
+
+        # Mail delivered locally (e.g. by fetchmail) or exported to a Maildir, mbox file or .eml directory
+        local_mail_paths = self.entry.options.get('local_mail_paths', self.entry.data.get('local_mail_paths', ''))
+        sources = [LocalMailSource(path) for path in parse_local_paths(local_mail_paths)]
+        # Forget the state of paths that were removed from the options
+        self._local_state = {
+            source.key: self._local_state[source.key] for source in sources if source.key in self._local_state
+        }
+        for source in sources:
+            new_tracking_data.extend(await fetch_local_emails(
+                self.profiler.hass if self.profiler else self.hass,
+                source,
+                tracking_pattern,
+                self.processed_tracking_numbers,
+                email_parsing,
+                email_age=email_age,
+                carrier=self.carrier,
+                raise_errors=True,
+                validators=get_validators(self.carrier),
+                rejected=self.checksum_rejects,
+                metrics=self.metrics,
+                max_in_flight_bytes=max_in_flight_mb * 1024 * 1024,
+                search_template=get_search_template(self.carrier, search_criteria),  # Matched against the headers
+                source_state=self._local_state.setdefault(source.key, {}),  # Messages already processed
+                removed=self.removed_tracking_numbers,
+                deadline=deadline,
+            ))
+        _LOGGER.debug("New tracking numbers fetched: %s", new_tracking_data)
         return new_tracking_data
 
-    async def fetch_tracking_info(self, api_key, api_url, api_template, carrier):
-        """Fetch tracking info via the API for all tracking numbers."""
-        _LOGGER.debug("Fetching tracking information via API.")
+    async def fetch_tracking_info(self, api_key, api_url, api_template, carrier, deadline=None):
+        """Fetch tracking info via the API for all tracking numbers, batched where the API allows."""
+        if not api_enabled(api_template, api_key, api_url, carrier):
+            _LOGGER.debug("No API available or missing API info. Using email data.")
+            return
+        if deadline is not None and deadline.expired:
+            deadline.truncate("api")
+            return
+
+        tracking_numbers = [
+            tracking["tracking_number"] for tracking in self.tracking_data
+            if tracking.get("tracking_number") and needs_api_lookup(tracking)
+        ]
+        # Recently delivered parcels need no API call
+        self.metrics.increment("api_lookups_skipped", len(self.tracking_data) - len(tracking_numbers))
+        if not tracking_numbers:
+            return
+        _LOGGER.debug("Fetching tracking information via API for %d parcels.", len(tracking_numbers))
 
+        with self.metrics.span("api"):
+            api_data = await fetch_tracking_infos(
+                tracking_numbers,
+                api_key,
+                api_url,
+                api_template,
+                carrier,
+                session=async_get_clientsession(self.hass),  # Share Home Assistant's connection pool
+                metrics=self.metrics,  # Counts the API requests
+                # Skip endpoints that keep failing; their parcels keep the email or earlier API data
+                breakers=self.hass.data.get(DOMAIN, {}).get("circuit_breakers"),
+                failure_threshold=int(self.entry.options.get(
+                    'breaker_failure_threshold',
+                    self.entry.data.get('breaker_failure_threshold', DEFAULT_FAILURE_THRESHOLD),
+                )),
+                probe_interval=int(self.entry.options.get(
+                    'breaker_probe_interval',
+                    self.entry.data.get('breaker_probe_interval', DEFAULT_PROBE_INTERVAL),
+                )),
+                deadline=deadline,
+            )
         for tracking in self.tracking_data:
-            tracking_number = tracking.get("tracking_number", None)
-            if tracking_number and api_key and api_url:
-                api_data = await fetch_tracking_info(tracking_number, api_key, api_url, api_template, carrier)
-                tracking.update(api_data)
-                _LOGGER.debug(f"Updated tracking data with API info: {tracking}")
-            else:
-                _LOGGER.debug(
-                    f"No API available or missing info for tracking number {tracking_number}. Using email data."
-                )
+            if tracking.get("tracking_number") in api_data:
+                # Unknown or older API values do not replace what the emails said
+                merge_tracking_info(tracking, api_data[tracking["tracking_number"]], "api")
+                _LOGGER.debug("Updated tracking data with API info: %s", tracking)
 
     @property
     def total_packages(self):
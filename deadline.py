@@ -0,0 +1,54 @@
+# custom_components/parcel_tracking_info/deadline.py
+
+import logging
+import math
+import time
+
+_LOGGER = logging.getLogger(__name__)
+
+# Default time budget (in seconds) of one refresh
+DEFAULT_REFRESH_TIMEOUT = 120
+# Upper bound (in seconds) of a single blocking IMAP call
+IMAP_TIMEOUT = 30
+# Shortest timeout handed to a network call; below this it is not worth starting
+MIN_CALL_TIMEOUT = 0.5
+
+
+class DeadlineExceeded(Exception):
+    """Raised instead of starting a call once the refresh deadline has passed."""
+
+
+class Deadline:
+    """The time budget of one refresh, shared by all of its stages.
+
+    Each stage checks ``expired`` before starting more work and bounds its
+    network calls with ``timeout()``, so calls get shorter as the budget runs
+    out. Stages that stop early report it with ``truncate``; a deadline of
+    ``None`` seconds never expires.
+    """
+
+    def __init__(self, seconds=None):
+        """Start the deadline."""
+        self.seconds = seconds
+        self._expires_at = time.monotonic() + seconds if seconds is not None else math.inf
+        self.truncated = []  # Stages that were cut short, in order
+
+    @property
+    def remaining(self):
+        """Return the seconds left (math.inf without a deadline)."""
+        return max(0.0, self._expires_at - time.monotonic())
+
+    @property
+    def expired(self):
+        """Return True if there is no time left for another call."""
+        return self.remaining < MIN_CALL_TIMEOUT
+
+    def timeout(self, limit):
+        """Return the timeout of a call that may take at most ``limit`` seconds."""
+        return max(MIN_CALL_TIMEOUT, min(limit, self.remaining))
+
+    def truncate(self, stage):
+        """Record that ``stage`` stopped before finishing its work."""
+        if stage not in self.truncated:
+            _LOGGER.debug("Refresh deadline of %s seconds reached during %s.", self.seconds, stage)
+            self.truncated.append(stage)
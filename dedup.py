@@ -0,0 +1,94 @@
+# custom_components/parcel_tracking_info/dedup.py
+
+import logging
+import time
+
+_LOGGER = logging.getLogger(__name__)
+
+# Weights of the confidence score components, adding up to 1.0
+SENDER_MATCH_WEIGHT = 0.5
+CHECKSUM_WEIGHT = 0.3
+SPECIFICITY_WEIGHT = 0.2
+
+
+def score_tracking_number(tracking_number, carrier, sender, checksum_valid=None):
+    """
+    Score how likely a tracking number belongs to the given carrier.
+
+    Args:
+        tracking_number (str): The extracted tracking number.
+        carrier (str): The carrier of the coordinator that found the number.
+        sender (str): The From header of the email the number was found in.
+        checksum_valid (Optional[bool]): Result of the carrier's check-digit
+            validation, or None if no validator applies to the number.
+
+    Returns:
+        float: A confidence between 0.0 and 1.0.
+    """
+    score = 0.0
+
+    # Mail sent by the carrier itself is the strongest signal
+    if carrier and sender and carrier.lower() in sender.lower():
+        score += SENDER_MATCH_WEIGHT
+
+    if checksum_valid:
+        score += CHECKSUM_WEIGHT
+
+    # Letter prefixes (JJD, H, DE, ...) and longer numbers are less likely to be accidental matches
+    letters = sum(1 for char in tracking_number if char.isalpha())
+    specificity = min(letters, 3) / 3 * 0.5 + min(len(tracking_number), 20) / 20 * 0.5
+    score += SPECIFICITY_WEIGHT * specificity
+
+    return round(score, 3)
+
+
+class TrackingNumberIndex:
+    """Domain-wide index recording which config entry owns each tracking number.
+
+    Several carrier patterns can match the same number (e.g. the Amazon and GLS
+    patterns match digits inside DHL mails). The entry that found the number
+    with the highest confidence owns it; other entries skip it before spending
+    API calls or creating entities for it.
+    """
+
+    def __init__(self):
+        """Initialize the index."""
+        self._claims = {}  # tracking_number -> {"owner", "carrier", "confidence", "claimed_at"}
+        self.skipped = 0
+
+    def claim(self, tracking_number, owner, carrier, confidence):
+        """Claim a tracking number for an entry, returning True if the entry owns it."""
+        current = self._claims.get(tracking_number)
+        if current is not None and current["owner"] != owner and current["confidence"] >= confidence:
+            _LOGGER.debug(
+                "Tracking number %s is owned by %s (%s >= %s), skipping for %s.",
+                tracking_number, current['carrier'], current['confidence'], confidence, carrier,
+            )
+            self.skipped += 1
+            return False
+
+        if current is not None and current["owner"] != owner:
+            _LOGGER.debug(
+                "Tracking number %s moves from %s to %s (%s > %s).",
+                tracking_number, current['carrier'], carrier, confidence, current['confidence'],
+            )
+        self._claims[tracking_number] = {
+            "owner": owner,
+            "carrier": carrier,
+            "confidence": confidence,
+            "claimed_at": time.time(),
+        }
+        return True
+
+    def release(self, owner, keep=()):
+        """Release the claims of an entry, except for the tracking numbers in ``keep``."""
+        keep = set(keep)
+        for tracking_number in [
+            number for number, claim in self._claims.items() if claim["owner"] == owner and number not in keep
+        ]:
+            del self._claims[tracking_number]
+
+    @property
+    def stats(self):
+        """Return a snapshot of the index metrics."""
+        return {"claimed": len(self._claims), "skipped": self.skipped}
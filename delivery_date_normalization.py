@@ -2,7 +2,7 @@
 
 import logging
 import re
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from typing import Optional
 
 import dateparser
@@ -92,10 +92,12 @@ def normalize_date(date_string: str) -> Optional[str]:
 
     # Attempt to parse using dateparser as a fallback
     try:
+        # dateparser caches its parsers per settings, so keep RELATIVE_BASE stable for the day
+        relative_base = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
         parsed_date = dateparser.parse(
             date_string,
             languages=['de'],
-            settings={'PREFER_DAY_OF_MONTH': 'first', 'RELATIVE_BASE': datetime.now()}
+            settings={'PREFER_DAY_OF_MONTH': 'first', 'RELATIVE_BASE': relative_base}
         )
         if parsed_date:
             normalized_date = parsed_date.strftime("%d.%m.%Y")
@@ -119,3 +121,23 @@ def normalize_date(date_string: str) -> Optional[str]:
 
     _LOGGER.warning(f"Failed to normalize date: '{date_string}'")
     return None
+
+
+def eta_to_date(eta) -> Optional[date]:
+    """
+    Return the calendar date of a parcel's ETA, or None if it has none.
+
+    Accepts the DD.MM.YYYY dates of normalize_date and the ISO 8601 dates or
+    timestamps returned by the carrier APIs (only the date part is used).
+    """
+    if not eta or not isinstance(eta, str) or eta in ("N/A", "unknown"):
+        return None
+    try:
+        return datetime.strptime(eta, "%d.%m.%Y").date()
+    except ValueError:
+        pass
+    try:
+        return date.fromisoformat(eta[:10])
+    except ValueError:
+        _LOGGER.debug("ETA '%s' is not a date.", eta)
+        return None
@@ -0,0 +1,43 @@
+# custom_components/parcel_tracking_info/diagnostics.py
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.const import CONF_EMAIL, CONF_PASSWORD
+
+from .const import DOMAIN
+
+TO_REDACT = {CONF_PASSWORD, CONF_EMAIL, "api_key", "jmap_token"}
+
+
+async def async_get_config_entry_diagnostics(hass, entry):
+    """Return diagnostics for a config entry."""
+    domain_data = hass.data.get(DOMAIN, {})
+    coordinator = domain_data.get(entry.entry_id)
+
+    diagnostics = {
+        "entry": {
+            "title": entry.title,
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": async_redact_data(dict(entry.options), TO_REDACT),
+        },
+    }
+
+    if coordinator is not None:
+        diagnostics["coordinator"] = {
+            "carrier": coordinator.carrier,
+            "last_update_success": coordinator.last_update_success,
+            "total_packages": coordinator.total_packages,
+            "checksum_rejects": dict(coordinator.checksum_rejects),
+            "metrics": coordinator.metrics.stats,
+            "backfill": coordinator.backfill.stats,
+        }
+
+    if "orchestrator" in domain_data:
+        diagnostics["orchestrator"] = domain_data["orchestrator"].stats
+    if "tracking_index" in domain_data:
+        diagnostics["tracking_index"] = domain_data["tracking_index"].stats
+    if "parcel_index" in domain_data:
+        diagnostics["parcel_index"] = domain_data["parcel_index"].stats
+    if "circuit_breakers" in domain_data:
+        diagnostics["circuit_breakers"] = domain_data["circuit_breakers"].stats
+
+    return diagnostics
@@ -0,0 +1,56 @@
+# custom_components/parcel_tracking_info/events.py
+
+import logging
+
+from .const import DOMAIN
+from .freshness import TERMINAL_STATUSES, is_known
+
+_LOGGER = logging.getLogger(__name__)
+
+EVENT_PARCEL_ADDED = f"{DOMAIN}_parcel_added"
+EVENT_STATUS_CHANGED = f"{DOMAIN}_status_changed"
+EVENT_PARCEL_DELIVERED = f"{DOMAIN}_parcel_delivered"
+
+
+def parcel_state(tracking):
+    """Return the normalized state of a parcel that events are derived from."""
+    return {
+        "status": tracking.get("status_code") or "unknown",
+        "eta": tracking.get("eta") or "N/A",
+        "source": ((tracking.get("sources") or {}).get("status_code") or {}).get("source"),
+    }
+
+
+def parcel_states(tracking_data):
+    """Return the normalized state of every parcel, keyed by tracking number."""
+    return {
+        tracking["tracking_number"]: parcel_state(tracking)
+        for tracking in tracking_data
+        if tracking.get("tracking_number")
+    }
+
+
+def diff_parcel_states(previous, current):
+    """
+    Compare two parcel_states snapshots and return the events to fire.
+
+    - EVENT_PARCEL_ADDED for tracking numbers that were not known before;
+    - EVENT_STATUS_CHANGED when the status of a known parcel changed to a
+      known status (placeholders are not a change);
+    - EVENT_PARCEL_DELIVERED when a parcel reached a terminal status it did
+      not have before, also for new parcels.
+
+    Returns:
+        list: (event_type, event_data) tuples, ordered by tracking number.
+    """
+    events = []
+    for tracking_number, state in sorted(current.items()):
+        before = previous.get(tracking_number)
+        data = {"tracking_number": tracking_number, **state}
+        if before is None:
+            events.append((EVENT_PARCEL_ADDED, data))
+        elif is_known(state["status"]) and state["status"] != before["status"]:
+            events.append((EVENT_STATUS_CHANGED, {**data, "previous_status": before["status"]}))
+        if state["status"] in TERMINAL_STATUSES and (before is None or before["status"] not in TERMINAL_STATUSES):
+            events.append((EVENT_PARCEL_DELIVERED, data))
+    return events
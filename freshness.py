@@ -0,0 +1,104 @@
+# custom_components/parcel_tracking_info/freshness.py
+
+import logging
+import time
+
+_LOGGER = logging.getLogger(__name__)
+
+# Fields of a parcel that are merged value by value, keeping the freshest known one
+MERGED_FIELDS = ("status_code", "eta", "service_url")
+# Placeholder values meaning "not known"; they never replace a known value
+UNKNOWN_VALUES = {None, "", "unknown", "N/A"}
+# Statuses after which a parcel does not change any more
+TERMINAL_STATUSES = {"Zugestellt"}
+# A terminal status younger than this (in seconds) is not checked with the carrier API again
+TERMINAL_STATUS_MAX_AGE = 24 * 3600
+
+
+def is_known(value):
+    """Return True if ``value`` is an actual value and not a placeholder."""
+    return value not in UNKNOWN_VALUES
+
+
+def stamp_sources(tracking_info, source, observed_at=None):
+    """
+    Record ``source`` and ``observed_at`` for every known merged field of a parcel.
+
+    The metadata is kept in ``tracking_info["sources"]`` as
+    ``{field: {"source": source, "observed_at": timestamp}}``.
+
+    Returns:
+        dict: ``tracking_info``, updated in place.
+    """
+    observed_at = observed_at if observed_at is not None else time.time()
+    sources = dict(tracking_info.get("sources") or {})
+    for field in MERGED_FIELDS:
+        if is_known(tracking_info.get(field)):
+            sources[field] = {"source": source, "observed_at": observed_at}
+    tracking_info["sources"] = sources
+    return tracking_info
+
+
+def merge_tracking_info(current, update, source=None, observed_at=None):
+    """
+    Merge ``update`` into the parcel ``current``, field by field.
+
+    A merged field takes the value of ``update`` if that value is known and
+    was observed at least as recently as the current one. Fields without
+    metadata count as observed at 0, so they are older than anything. The
+    metadata of ``update`` comes from its own "sources", or else from
+    ``source`` and ``observed_at`` (default now, or 0 without a source).
+    Other keys, e.g. email_timestamp or confidence, are taken from the update
+    with the newer email. Keys that ``current`` does not have yet are always
+    taken.
+
+    Returns:
+        dict: ``current``, updated in place.
+    """
+    if observed_at is None:
+        observed_at = time.time() if source is not None else 0
+    update_sources = update.get("sources") or {}
+    sources = dict(current.get("sources") or {})
+
+    for field in MERGED_FIELDS:
+        value = update.get(field)
+        if not is_known(value):
+            continue
+        update_meta = update_sources.get(field) or {"source": source, "observed_at": observed_at}
+        current_meta = sources.get(field) or {"observed_at": 0}
+        if is_known(current.get(field)) and current_meta["observed_at"] > update_meta["observed_at"]:
+            _LOGGER.debug(
+                "Keeping %s '%s' of %s, it is fresher than '%s'.",
+                field, current.get(field), current.get("tracking_number"), value,
+            )
+            continue
+        current[field] = value
+        sources[field] = update_meta
+
+    newer_email = (update.get("email_timestamp") or 0) >= (current.get("email_timestamp") or 0)
+    for key, value in update.items():
+        if key in MERGED_FIELDS or key == "sources":
+            continue
+        if newer_email or key not in current:
+            current[key] = value
+    for field in MERGED_FIELDS:
+        current.setdefault(field, update.get(field))
+    current["sources"] = sources
+    return current
+
+
+def needs_api_lookup(tracking_info, now=None):
+    """
+    Return False if a parcel's recent status is terminal and the carrier API cannot add anything.
+
+    Applies to terminal statuses from emails and from earlier API replies
+    alike; once the status is older than TERMINAL_STATUS_MAX_AGE it is
+    checked again (e.g. in case the delivery was reverted).
+    """
+    if tracking_info.get("status_code") not in TERMINAL_STATUSES:
+        return True
+    status_meta = (tracking_info.get("sources") or {}).get("status_code")
+    if not status_meta:
+        return True
+    now = now if now is not None else time.time()
+    return now - status_meta["observed_at"] > TERMINAL_STATUS_MAX_AGE
@@ -0,0 +1,227 @@
+# custom_components/parcel_tracking_info/history.py
+
+import logging
+import sqlite3
+import threading
+import time
+
+_LOGGER = logging.getLogger(__name__)
+
+# Default number of days parcels and their transitions are kept on disk
+DEFAULT_RETENTION_DAYS = 90
+# Only VACUUM when at least this many pages are free after purging
+VACUUM_FREE_PAGES_THRESHOLD = 64
+
+# Fields whose changes are recorded as transitions
+TRACKED_FIELDS = ("status_code", "eta")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS parcels (
+    entry_id TEXT NOT NULL,
+    tracking_number TEXT NOT NULL,
+    carrier TEXT NOT NULL,
+    status_code TEXT,
+    eta TEXT,
+    service_url TEXT,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    last_email_at REAL,
+    confidence REAL,
+    PRIMARY KEY (entry_id, tracking_number)
+);
+CREATE INDEX IF NOT EXISTS idx_parcels_tracking_number ON parcels (tracking_number);
+CREATE INDEX IF NOT EXISTS idx_parcels_carrier ON parcels (carrier);
+CREATE TABLE IF NOT EXISTS transitions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    entry_id TEXT NOT NULL,
+    tracking_number TEXT NOT NULL,
+    carrier TEXT NOT NULL,
+    field TEXT NOT NULL,
+    old_value TEXT,
+    new_value TEXT,
+    source TEXT NOT NULL,
+    observed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_transitions_tracking_number ON transitions (tracking_number, observed_at);
+CREATE INDEX IF NOT EXISTS idx_transitions_carrier ON transitions (carrier, observed_at);
+CREATE TABLE IF NOT EXISTS sync_state (
+    entry_id TEXT PRIMARY KEY,
+    last_sync REAL NOT NULL
+);
+"""
+
+
+class ParcelHistoryStore:
+    """Local sqlite store of parcels and their status/ETA transitions.
+
+    All methods are blocking and must be run in the executor.
+    """
+
+    def __init__(self, path):
+        """Initialize the store."""
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def open(self):
+        """Open the database and create the schema if needed."""
+        with self._lock:
+            if self._conn is None:
+                self._conn = sqlite3.connect(self.path, check_same_thread=False)
+                self._conn.row_factory = sqlite3.Row
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.executescript(SCHEMA)
+                self._migrate()
+                _LOGGER.debug("Opened parcel history database at %s", self.path)
+
+    def _migrate(self):
+        """Add the columns introduced after the database was created."""
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(parcels)")}
+        if "confidence" not in columns:
+            with self._conn:
+                self._conn.execute("ALTER TABLE parcels ADD COLUMN confidence REAL")
+
+    def close(self):
+        """Close the database."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def load_parcels(self, entry_id, since):
+        """Return the parcels of an entry whose last email is newer than ``since``."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT tracking_number, status_code, eta, service_url, last_email_at, confidence "
+                "FROM parcels WHERE entry_id = ? AND last_email_at >= ?",
+                (entry_id, since),
+            ).fetchall()
+        parcels = {}
+        for row in rows:
+            parcels[row["tracking_number"]] = {
+                "tracking_number": row["tracking_number"],
+                "status_code": row["status_code"] or "unknown",
+                "eta": row["eta"] or "N/A",
+                "service_url": row["service_url"] or "N/A",
+                "email_timestamp": row["last_email_at"],
+            }
+            if row["confidence"] is not None:
+                # Hydrated parcels keep their claim on the tracking number against other carriers
+                parcels[row["tracking_number"]]["confidence"] = row["confidence"]
+        return parcels
+
+    def get_last_sync(self, entry_id):
+        """Return the timestamp of the last successful email sync of an entry."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT last_sync FROM sync_state WHERE entry_id = ?", (entry_id,)
+            ).fetchone()
+        return row["last_sync"] if row else None
+
+    def set_last_sync(self, entry_id, timestamp):
+        """Store the timestamp of the last successful email sync of an entry."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO sync_state (entry_id, last_sync) VALUES (?, ?) "
+                "ON CONFLICT(entry_id) DO UPDATE SET last_sync = excluded.last_sync",
+                (entry_id, timestamp),
+            )
+
+    def record(self, entry_id, carrier, parcels, source, observed_at=None, keep_newer=False):
+        """Upsert parcels and record a transition for every changed field.
+
+        Args:
+            entry_id (str): The config entry the parcels belong to.
+            carrier (str): The carrier of the parcels.
+            parcels (list): Tracking info dicts as produced by the coordinator.
+            source (str): Where the values came from, "email" or "api".
+            observed_at (float): Timestamp of the observation, defaults to now.
+            keep_newer (bool): Leave parcels alone whose stored email is at
+                least as recent as the parcel's (used when reading old mail).
+        """
+        observed_at = observed_at or time.time()
+        with self._lock, self._conn:
+            for parcel in parcels:
+                tracking_number = parcel.get("tracking_number")
+                if not tracking_number:
+                    continue
+                row = self._conn.execute(
+                    "SELECT status_code, eta, last_email_at FROM parcels WHERE entry_id = ? AND tracking_number = ?",
+                    (entry_id, tracking_number),
+                ).fetchone()
+                if keep_newer and row and (row["last_email_at"] or 0) >= (parcel.get("email_timestamp") or 0):
+                    continue
+
+                for field in TRACKED_FIELDS:
+                    old_value = row[field] if row else None
+                    new_value = parcel.get(field)
+                    if new_value != old_value:
+                        self._conn.execute(
+                            "INSERT INTO transitions (entry_id, tracking_number, carrier, field, old_value, "
+                            "new_value, source, observed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                            (entry_id, tracking_number, carrier, field, old_value, new_value, source, observed_at),
+                        )
+
+                last_email_at = parcel.get("email_timestamp") if source == "email" else None
+                self._conn.execute(
+                    "INSERT INTO parcels (entry_id, tracking_number, carrier, status_code, eta, service_url, "
+                    "first_seen, last_seen, last_email_at, confidence) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(entry_id, tracking_number) DO UPDATE SET "
+                    "carrier = excluded.carrier, status_code = excluded.status_code, eta = excluded.eta, "
+                    "service_url = excluded.service_url, last_seen = excluded.last_seen, "
+                    "last_email_at = COALESCE(MAX(excluded.last_email_at, parcels.last_email_at), "
+                    "excluded.last_email_at, parcels.last_email_at), "
+                    "confidence = COALESCE(excluded.confidence, parcels.confidence)",
+                    (
+                        entry_id,
+                        tracking_number,
+                        carrier,
+                        parcel.get("status_code"),
+                        parcel.get("eta"),
+                        parcel.get("service_url"),
+                        observed_at,
+                        observed_at,
+                        last_email_at,
+                        parcel.get("confidence"),
+                    ),
+                )
+
+    def get_transitions(self, tracking_number):
+        """Return all recorded transitions of a tracking number, oldest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT carrier, field, old_value, new_value, source, observed_at FROM transitions "
+                "WHERE tracking_number = ? ORDER BY observed_at",
+                (tracking_number,),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def purge(self, entry_id, retention_days):
+        """Delete parcels and transitions of an entry older than the retention period."""
+        cutoff = time.time() - retention_days * 86400
+        with self._lock, self._conn:
+            deleted = self._conn.execute(
+                "DELETE FROM parcels WHERE entry_id = ? AND last_seen < ?", (entry_id, cutoff)
+            ).rowcount
+            deleted += self._conn.execute(
+                "DELETE FROM transitions WHERE entry_id = ? AND observed_at < ?", (entry_id, cutoff)
+            ).rowcount
+        if deleted:
+            _LOGGER.debug("Purged %s history rows of entry %s older than %s days", deleted, entry_id, retention_days)
+        return deleted
+
+    def remove_entry(self, entry_id):
+        """Delete all history of an entry."""
+        with self._lock, self._conn:
+            for table in ("parcels", "transitions", "sync_state"):
+                self._conn.execute(f"DELETE FROM {table} WHERE entry_id = ?", (entry_id,))
+
+    def compact(self):
+        """Reclaim free pages with VACUUM when enough of the file is unused."""
+        with self._lock:
+            free_pages = self._conn.execute("PRAGMA freelist_count").fetchone()[0]
+            if free_pages < VACUUM_FREE_PAGES_THRESHOLD:
+                return False
+            _LOGGER.debug("Compacting parcel history database (%s free pages)", free_pages)
+            self._conn.execute("VACUUM")
+        return True
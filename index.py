@@ -0,0 +1,220 @@
+# custom_components/parcel_tracking_info/index.py
+
+import bisect
+import logging
+import time
+from datetime import date
+
+from .delivery_date_normalization import eta_to_date
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class ParcelIndex:
+    """Domain-wide secondary indexes over the parcels of all config entries.
+
+    Parcels are indexed by status, carrier, config entry and ETA date, and per
+    status by the time their status last changed. Coordinators update their
+    parcels after every refresh; only parcels whose indexed values changed
+    touch the indexes. A query intersects the smallest matching buckets, so
+    its cost grows with the number of matching parcels rather than with the
+    number of parcels (or sensor entities).
+    """
+
+    def __init__(self):
+        """Initialize the index."""
+        self._records = {}  # (entry_id, tracking_number) -> record
+        self._by_status = {}  # status -> set of keys
+        self._by_carrier = {}  # carrier -> set of keys
+        self._by_entry = {}  # entry_id -> set of keys
+        self._by_eta_date = {}  # date -> set of keys
+        self._eta_dates = []  # sorted dates of _by_eta_date
+        self._etas_by_entry = {}  # entry_id -> sorted list of (eta_date, tracking_number)
+        self._changes_by_status = {}  # status -> sorted list of (status_since, key)
+        self.updates = 0
+        self.queries = 0
+
+    @staticmethod
+    def _add(buckets, value, key):
+        buckets.setdefault(value, set()).add(key)
+
+    @staticmethod
+    def _discard(buckets, value, key):
+        bucket = buckets.get(value)
+        if bucket is not None:
+            bucket.discard(key)
+            if not bucket:
+                del buckets[value]
+
+    def _insert(self, key, record):
+        self._records[key] = record
+        self._add(self._by_status, record["status"], key)
+        self._add(self._by_carrier, record["carrier"], key)
+        self._add(self._by_entry, record["entry_id"], key)
+        if record["eta_date"] is not None:
+            if record["eta_date"] not in self._by_eta_date:
+                bisect.insort(self._eta_dates, record["eta_date"])
+            self._add(self._by_eta_date, record["eta_date"], key)
+            bisect.insort(
+                self._etas_by_entry.setdefault(record["entry_id"], []), (record["eta_date"], record["tracking_number"])
+            )
+        bisect.insort(self._changes_by_status.setdefault(record["status"], []), (record["status_since"], key))
+
+    def _remove(self, key):
+        record = self._records.pop(key)
+        self._discard(self._by_status, record["status"], key)
+        self._discard(self._by_carrier, record["carrier"], key)
+        self._discard(self._by_entry, record["entry_id"], key)
+        if record["eta_date"] is not None:
+            self._discard(self._by_eta_date, record["eta_date"], key)
+            if record["eta_date"] not in self._by_eta_date:
+                del self._eta_dates[bisect.bisect_left(self._eta_dates, record["eta_date"])]
+            etas = self._etas_by_entry[record["entry_id"]]
+            del etas[bisect.bisect_left(etas, (record["eta_date"], record["tracking_number"]))]
+            if not etas:
+                del self._etas_by_entry[record["entry_id"]]
+        changes = self._changes_by_status[record["status"]]
+        del changes[bisect.bisect_left(changes, (record["status_since"], key))]
+        if not changes:
+            del self._changes_by_status[record["status"]]
+        return record
+
+    def update_entry(self, entry_id, carrier, tracking_data, now=None):
+        """
+        Bring the parcels of a config entry up to date with its tracking data.
+
+        Parcels no longer in ``tracking_data`` are dropped. A parcel's
+        ``status_since`` is kept while its status stays the same; a new status
+        starts at the time its source observed it (or ``now``).
+        """
+        now = now if now is not None else time.time()
+        current = set()
+        for tracking in tracking_data:
+            tracking_number = tracking.get("tracking_number")
+            if not tracking_number:
+                continue
+            key = (entry_id, tracking_number)
+            current.add(key)
+            status = tracking.get("status_code") or "unknown"
+            eta = tracking.get("eta") or "N/A"
+            service_url = tracking.get("service_url") or "N/A"
+            previous = self._records.get(key)
+            if (
+                previous is not None
+                and (previous["status"], previous["eta"], previous["carrier"]) == (status, eta, carrier)
+            ):
+                previous["service_url"] = service_url
+                continue
+
+            if previous is not None and previous["status"] == status:
+                status_since = previous["status_since"]
+            else:
+                status_meta = (tracking.get("sources") or {}).get("status_code") or {}
+                status_since = min(status_meta.get("observed_at") or now, now)
+            if previous is not None:
+                self._remove(key)
+            self._insert(key, {
+                "entry_id": entry_id,
+                "carrier": carrier,
+                "tracking_number": tracking_number,
+                "status": status,
+                "eta": eta,
+                "eta_date": eta_to_date(eta),
+                "service_url": service_url,
+                "status_since": status_since,
+            })
+            self.updates += 1
+
+        for key in self._by_entry.get(entry_id, set()) - current:
+            self._remove(key)
+
+    def remove_entry(self, entry_id):
+        """Drop all parcels of a config entry."""
+        for key in list(self._by_entry.get(entry_id, ())):
+            self._remove(key)
+
+    def _union(self, buckets, values):
+        keys = set()
+        for value in values:
+            keys |= buckets.get(value, set())
+        return keys
+
+    def query(self, statuses=None, carriers=None, entry_ids=None, eta_from=None, eta_to=None,
+              changed_before=None, changed_after=None, limit=None):
+        """
+        Return the parcels matching all given filters, ordered by ETA date and tracking number.
+
+        Args:
+            statuses, carriers, entry_ids (Optional[list]): Match any of the values.
+            eta_from, eta_to (Optional[date]): Inclusive range of the ETA date;
+                parcels without an ETA date only match when neither is given.
+            changed_before, changed_after (Optional[float]): Range of the
+                timestamp since which the parcel has its current status.
+            limit (Optional[int]): Maximum number of parcels returned.
+
+        Returns:
+            list: Copies of the matching records.
+        """
+        self.queries += 1
+        candidates = []
+        if statuses:
+            candidates.append(self._union(self._by_status, statuses))
+        if carriers:
+            candidates.append(self._union(self._by_carrier, carriers))
+        if entry_ids:
+            candidates.append(self._union(self._by_entry, entry_ids))
+        if eta_from is not None or eta_to is not None:
+            start = bisect.bisect_left(self._eta_dates, eta_from or date.min)
+            end = bisect.bisect_right(self._eta_dates, eta_to or date.max)
+            candidates.append(self._union(self._by_eta_date, self._eta_dates[start:end]))
+        if changed_before is not None or changed_after is not None:
+            keys = set()
+            for status in statuses or list(self._changes_by_status):
+                changes = self._changes_by_status.get(status, [])
+                start = bisect.bisect_left(changes, (changed_after,)) if changed_after is not None else 0
+                end = bisect.bisect_left(changes, (changed_before,)) if changed_before is not None else len(changes)
+                keys.update(key for _, key in changes[start:end])
+            candidates.append(keys)
+
+        if candidates:
+            candidates.sort(key=len)
+            keys = candidates[0].intersection(*candidates[1:])
+        else:
+            keys = self._records.keys()
+
+        records = sorted(
+            (self._records[key] for key in keys),
+            key=lambda record: (record["eta_date"] or date.max, record["tracking_number"]),
+        )
+        if limit is not None:
+            records = records[:limit]
+        return [dict(record) for record in records]
+
+    def eta_range(self, entry_id, start, end, limit=None):
+        """
+        Return the parcels of a config entry whose ETA date lies in ``[start, end)``.
+
+        The entry's parcels are kept sorted by ETA date, so this bisects to the
+        range instead of scanning the parcels.
+
+        Returns:
+            list: Copies of the records, ordered by ETA date and tracking number.
+        """
+        etas = self._etas_by_entry.get(entry_id, [])
+        first = bisect.bisect_left(etas, (start,))
+        last = bisect.bisect_left(etas, (end,))
+        if limit is not None:
+            last = min(last, first + limit)
+        return [dict(self._records[(entry_id, tracking_number)]) for _, tracking_number in etas[first:last]]
+
+    @property
+    def stats(self):
+        """Return a snapshot of the index metrics."""
+        return {
+            "parcels": len(self._records),
+            "by_status": {status: len(keys) for status, keys in sorted(self._by_status.items())},
+            "by_carrier": {carrier: len(keys) for carrier, keys in sorted(self._by_carrier.items())},
+            "eta_dates": len(self._eta_dates),
+            "updates": self.updates,
+            "queries": self.queries,
+        }
@@ -0,0 +1,135 @@
+# custom_components/parcel_tracking_info/instrumentation.py
+
+import contextlib
+import time
+from collections import deque
+
+# Number of samples kept per stage for the rolling histograms
+DEFAULT_WINDOW = 200
+# Upper bounds (in milliseconds) of the histogram buckets
+BUCKET_BOUNDS_MS = (10, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+
+class RollingHistogram:
+    """Durations of the last ``window`` samples of a stage."""
+
+    def __init__(self, window=DEFAULT_WINDOW):
+        """Initialize the histogram."""
+        self._samples = deque(maxlen=window)
+        self.total_count = 0
+
+    def add(self, seconds):
+        """Add a duration in seconds."""
+        self._samples.append(seconds)
+        self.total_count += 1
+
+    def _percentile(self, ordered, fraction):
+        index = min(len(ordered) - 1, round(fraction * (len(ordered) - 1)))
+        return round(ordered[index] * 1000, 3)
+
+    @property
+    def summary(self):
+        """Return count, percentiles and bucket counts (in milliseconds) of the window."""
+        if not self._samples:
+            return {"count": self.total_count}
+
+        ordered = sorted(self._samples)
+        buckets = {f"le_{bound}": 0 for bound in BUCKET_BOUNDS_MS}
+        buckets["inf"] = 0
+        for sample in ordered:
+            sample_ms = sample * 1000
+            bound = next((bound for bound in BUCKET_BOUNDS_MS if sample_ms <= bound), None)
+            buckets[f"le_{bound}" if bound is not None else "inf"] += 1
+
+        return {
+            "count": self.total_count,
+            "window": len(ordered),
+            "last_ms": round(self._samples[-1] * 1000, 3),
+            "p50_ms": self._percentile(ordered, 0.5),
+            "p95_ms": self._percentile(ordered, 0.95),
+            "max_ms": round(ordered[-1] * 1000, 3),
+            "buckets": buckets,
+        }
+
+
+class RefreshMetrics:
+    """Timing spans and counters of the refreshes of one coordinator.
+
+    Spans are measured on the event loop around the awaited executor jobs, so
+    their durations include the time spent waiting for a free executor thread.
+    Counters are cumulative since setup; ``last_refresh`` holds the stage totals
+    and counters of the most recent refresh only.
+    """
+
+    def __init__(self, window=DEFAULT_WINDOW):
+        """Initialize the metrics."""
+        self.window = window
+        self.histograms = {}
+        self.counters = {}
+        self.last_refresh = {}
+        self._current = None
+
+    @contextlib.contextmanager
+    def span(self, stage):
+        """Time the enclosed block as one sample of ``stage``."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def record(self, stage, seconds):
+        """Record a duration in seconds for ``stage``."""
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            histogram = self.histograms[stage] = RollingHistogram(self.window)
+        histogram.add(seconds)
+        if self._current is not None:
+            stages = self._current["stages_ms"]
+            stages[stage] = stages.get(stage, 0.0) + seconds * 1000
+
+    def increment(self, counter, amount=1):
+        """Increase ``counter`` by ``amount``."""
+        self.counters[counter] = self.counters.get(counter, 0) + amount
+        if self._current is not None:
+            counters = self._current["counters"]
+            counters[counter] = counters.get(counter, 0) + amount
+
+    def mark_truncated(self, stage):
+        """Record that ``stage`` of the current refresh was cut short by the refresh deadline."""
+        self.increment(f"truncated_{stage}")
+        if self._current is not None and stage not in self._current["truncated_stages"]:
+            self._current["truncated_stages"].append(stage)
+
+    @contextlib.contextmanager
+    def refresh(self):
+        """Collect the enclosed refresh into ``last_refresh`` and the "refresh" histogram."""
+        self._current = {
+            "started_at": time.time(), "success": False, "stages_ms": {}, "counters": {}, "truncated_stages": [],
+        }
+        try:
+            with self.span("refresh"):
+                yield
+            self._current["success"] = True
+        finally:
+            current, self._current = self._current, None
+            current["stages_ms"] = {stage: round(value, 3) for stage, value in current["stages_ms"].items()}
+            self.last_refresh = current
+
+    def get_counter(self, counter):
+        """Return the cumulative value of ``counter``."""
+        return self.counters.get(counter, 0)
+
+    @property
+    def last_refresh_duration_ms(self):
+        """Return the duration of the last completed refresh in milliseconds, if any."""
+        return self.last_refresh.get("stages_ms", {}).get("refresh")
+
+    @property
+    def stats(self):
+        """Return a snapshot of the metrics."""
+        return {
+            "stages": {stage: histogram.summary for stage, histogram in sorted(self.histograms.items())},
+            "counters": dict(sorted(self.counters.items())),
+            "last_refresh": self.last_refresh,
+        }
@@ -0,0 +1,316 @@
+# custom_components/parcel_tracking_info/jmap.py
+
+import logging
+from datetime import datetime, timezone
+from email.utils import formataddr
+from urllib.parse import urljoin
+
+import aiohttp
+
+from .deadline import Deadline
+from .instrumentation import RefreshMetrics
+from .mailboxes import parse_folders
+from .search import compile_jmap_filter, matches_search_template
+
+_LOGGER = logging.getLogger(__name__)
+
+JMAP_CORE = "urn:ietf:params:jmap:core"
+JMAP_MAIL = "urn:ietf:params:jmap:mail"
+# Upper bound (in seconds) of a single JMAP request
+JMAP_TIMEOUT = 30
+# Properties needed to decide whether a message is read
+HEADER_PROPERTIES = ["id", "mailboxIds", "from", "subject", "sentAt", "receivedAt"]
+# Properties of a message that is read; only the values of its textBody parts are fetched
+EMAIL_PROPERTIES = HEADER_PROPERTIES + ["textBody", "bodyValues"]
+# Messages per Email/query page and per Email/changes call (lowered to the server's maxObjectsInGet)
+DEFAULT_QUERY_LIMIT = 100
+# Longest body value fetched per part; carrier notifications are far shorter
+MAX_BODY_VALUE_BYTES = 256 * 1024
+# JMAP error type of an Email/changes call whose state is too old for the server
+CANNOT_CALCULATE_CHANGES = "cannotCalculateChanges"
+
+
+class JmapError(Exception):
+    """A JMAP request or method call failed."""
+
+    def __init__(self, message, error_type=None):
+        """Initialize the error with the JMAP error type, if the server returned one."""
+        super().__init__(message)
+        self.error_type = error_type
+
+
+def utc_date(timestamp):
+    """Return a POSIX timestamp as a JMAP UTCDate."""
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def parse_utc_date(value):
+    """Return a JMAP (UTC)Date as a POSIX timestamp, or None."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        _LOGGER.debug("Could not parse JMAP date '%s'.", value)
+        return None
+
+
+def _result_of(call_id, name, path):
+    """Return a back-reference to a result of an earlier method call of the same request."""
+    return {"resultOf": call_id, "name": name, "path": path}
+
+
+class JmapMailSource:
+    """Mail of a JMAP account (RFC 8620/8621), e.g. Fastmail.
+
+    IMAP needs a round trip per command and per folder; JMAP chains method
+    calls in one HTTP request, where later calls refer to the results of
+    earlier ones. A first sync runs Email/query together with an Email/get
+    of the ids it returned, a page of messages per request, fetching only the
+    decoded values of the text body parts instead of the raw messages. Later
+    syncs ask Email/changes for what happened since the state string of the
+    last one and get the headers of the new messages in the same request;
+    only the bodies of messages that match the carrier's search template are
+    fetched in a second one.
+
+    The state dict kept by the caller holds the Email state string, the
+    resolved mailbox ids and the tracking numbers found per message id, so
+    destroyed messages (and messages moved out of the folders) reveal which
+    parcels vanished.
+    """
+
+    def __init__(self, session_url, token, session, folders=None):
+        """Initialize the source."""
+        self.session_url = session_url
+        self.token = token
+        self.session = session
+        self.folders = parse_folders(folders or "inbox")
+        self.api_url = None
+        self.account_id = None
+        self.limit = DEFAULT_QUERY_LIMIT
+
+    @property
+    def key(self):
+        """Return the key of this source's state."""
+        return f"jmap:{self.session_url}"
+
+    @property
+    def _headers(self):
+        return {"Authorization": f"Bearer {self.token}", "Accept": "application/json"}
+
+    @staticmethod
+    def _check_status(response):
+        if response.status in (401, 403):
+            raise JmapError(f"JMAP server rejected the token (HTTP {response.status})", "unauthorized")
+        response.raise_for_status()
+
+    async def async_connect(self, timeout=JMAP_TIMEOUT):
+        """Fetch the session resource: the API URL, the mail account and the server's limits."""
+        async with self.session.get(
+            self.session_url, headers=self._headers, timeout=aiohttp.ClientTimeout(total=timeout)
+        ) as response:
+            self._check_status(response)
+            session = await response.json()
+        account_id = session.get("primaryAccounts", {}).get(JMAP_MAIL)
+        if not account_id or not session.get("apiUrl"):
+            raise JmapError("The JMAP session has no mail account")
+        self.api_url = urljoin(self.session_url, session["apiUrl"])
+        self.account_id = account_id
+        core = session.get("capabilities", {}).get(JMAP_CORE, {})
+        self.limit = max(1, min(DEFAULT_QUERY_LIMIT, int(core.get("maxObjectsInGet") or DEFAULT_QUERY_LIMIT)))
+        _LOGGER.debug("Connected to JMAP account %s at %s.", account_id, self.api_url)
+
+    async def async_call(self, method_calls, timeout=JMAP_TIMEOUT, metrics=None):
+        """
+        Send method calls in one request.
+
+        Args:
+            method_calls (list): ``[name, arguments, call_id]`` triples; the
+                ``accountId`` is added to the arguments.
+
+        Returns:
+            dict: The arguments of each method response by call id.
+
+        Raises:
+            JmapError: If the request or one of its method calls failed.
+        """
+        metrics = metrics if metrics is not None else RefreshMetrics()
+        if self.api_url is None:
+            await self.async_connect(timeout)
+        payload = {
+            "using": [JMAP_CORE, JMAP_MAIL],
+            "methodCalls": [
+                [name, {"accountId": self.account_id, **arguments}, call_id] for name, arguments, call_id in method_calls
+            ],
+        }
+        with metrics.span("jmap_request"):
+            async with self.session.post(
+                self.api_url, json=payload, headers=self._headers, timeout=aiohttp.ClientTimeout(total=timeout)
+            ) as response:
+                self._check_status(response)
+                result = await response.json()
+        metrics.increment("jmap_requests")
+
+        responses = {}
+        for name, arguments, call_id in result.get("methodResponses", []):
+            if name == "error":
+                error_type = arguments.get("type")
+                raise JmapError(f"JMAP call '{call_id}' failed: {error_type} {arguments.get('description', '')}".strip(),
+                                error_type)
+            responses[call_id] = arguments
+        return responses
+
+    async def async_mailbox_ids(self, timeout=JMAP_TIMEOUT, metrics=None):
+        """Return the ids of the mailboxes whose name or role is one of the configured folders."""
+        responses = await self.async_call(
+            [["Mailbox/get", {"ids": None, "properties": ["id", "name", "role"]}, "mailboxes"]], timeout, metrics
+        )
+        wanted = {folder.lower() for folder in self.folders}
+        return [
+            mailbox["id"] for mailbox in responses["mailboxes"].get("list", [])
+            if (mailbox.get("name") or "").lower() in wanted or (mailbox.get("role") or "").lower() in wanted
+        ]
+
+    @staticmethod
+    def _message(email):
+        """Return the fields of a fetched Email the parser needs."""
+        sender = (email.get("from") or [{}])[0]
+        body_values = email.get("bodyValues") or {}
+        parts = [part for part in email.get("textBody") or [] if part.get("partId") in body_values]
+        return {
+            "id": email["id"],
+            "sender": formataddr((sender.get("name") or "", sender.get("email") or "")),
+            "subject": email.get("subject") or "",
+            "timestamp": parse_utc_date(email.get("sentAt")) or parse_utc_date(email.get("receivedAt")),
+            "body": "\n".join(body_values[part["partId"]].get("value", "") for part in parts),
+            # textBody falls back to the HTML part of messages without a plain text one
+            "html": any(part.get("type") == "text/html" for part in parts),
+        }
+
+    def _get_emails(self, call_id, ids=None, reference=None):
+        """Return the method call fetching the bodies of messages, by id or by back-reference."""
+        arguments = {
+            "properties": EMAIL_PROPERTIES,
+            "fetchTextBodyValues": True,
+            "maxBodyValueBytes": MAX_BODY_VALUE_BYTES,
+        }
+        if reference is not None:
+            arguments["#ids"] = reference
+        else:
+            arguments["ids"] = ids
+        return ["Email/get", arguments, call_id]
+
+    async def _iter_query(self, state, since, search_template, search_criteria, deadline, metrics):
+        mailbox_ids = await self.async_mailbox_ids(deadline.timeout(JMAP_TIMEOUT), metrics)
+        if not mailbox_ids:
+            raise JmapError(f"No JMAP mailbox named {', '.join(self.folders)}")
+        state.update({"mailbox_ids": mailbox_ids, "emails": {}})
+        query_filter = compile_jmap_filter(search_template, search_criteria, mailbox_ids, utc_date(since))
+        email_state = None
+        position = 0
+        while True:
+            responses = await self.async_call([
+                ["Email/query", {
+                    "filter": query_filter,
+                    "sort": [{"property": "receivedAt", "isAscending": False}],
+                    "position": position,
+                    "limit": self.limit,
+                }, "query"],
+                self._get_emails("emails", reference=_result_of("query", "Email/query", "/ids")),
+            ], deadline.timeout(JMAP_TIMEOUT), metrics)
+            ids = responses["query"].get("ids", [])
+            # Changes from the first page on are picked up by the next sync
+            email_state = email_state or responses["emails"].get("state")
+            yield [self._message(email) for email in responses["emails"].get("list", [])], set()
+            position += len(ids)
+            if len(ids) < self.limit:
+                break
+        state["email_state"] = email_state
+
+    async def _iter_changes(self, state, since, search_template, deadline, metrics):
+        mailbox_ids = set(state.get("mailbox_ids") or [])
+        emails = state.setdefault("emails", {})
+        has_more_changes = True
+        while has_more_changes:
+            responses = await self.async_call([
+                ["Email/changes", {"sinceState": state["email_state"], "maxChanges": self.limit}, "changes"],
+                ["Email/get", {
+                    "#ids": _result_of("changes", "Email/changes", "/created"), "properties": HEADER_PROPERTIES,
+                }, "created"],
+                ["Email/get", {
+                    "#ids": _result_of("changes", "Email/changes", "/updated"), "properties": ["id", "mailboxIds"],
+                }, "updated"],
+            ], deadline.timeout(JMAP_TIMEOUT), metrics)
+            changes = responses["changes"]
+
+            # Destroyed messages, and known messages moved out of the folders
+            gone = set(changes.get("destroyed", [])) | {
+                email["id"] for email in responses["updated"].get("list", [])
+                if email["id"] in emails and not mailbox_ids & {
+                    mailbox_id for mailbox_id, member in (email.get("mailboxIds") or {}).items() if member
+                }
+            }
+            vanished = {number for email_id in gone for number in emails.get(email_id, ())}
+
+            wanted = []
+            for email in responses["created"].get("list", []):
+                received = parse_utc_date(email.get("receivedAt"))
+                sender = (email.get("from") or [{}])[0]
+                if (
+                    mailbox_ids & set(email.get("mailboxIds") or {})
+                    and (received is None or received >= since)
+                    and matches_search_template(
+                        formataddr((sender.get("name") or "", sender.get("email") or "")),
+                        email.get("subject"), search_template,
+                    )
+                ):
+                    wanted.append(email["id"])
+            messages = []
+            if wanted:
+                responses = await self.async_call(
+                    [self._get_emails("emails", ids=wanted)], deadline.timeout(JMAP_TIMEOUT), metrics
+                )
+                messages = [self._message(email) for email in responses["emails"].get("list", [])]
+
+            yield messages, vanished
+            # The page was processed: forget its messages and move on to its state
+            for email_id in gone:
+                emails.pop(email_id, None)
+            state["email_state"] = changes["newState"]
+            has_more_changes = changes.get("hasMoreChanges", False)
+
+    async def iter_changes(self, state, since, search_template=None, search_criteria=None, deadline=None,
+                           metrics=None):
+        """
+        Yield the messages to read, a page per request, with the tracking numbers of the messages that are gone.
+
+        The first sync (and one whose state the server no longer has changes
+        for) queries the configured folders for mail received after ``since``,
+        narrowed by ``search_template`` or the FROM/SUBJECT keys of
+        ``search_criteria`` (see search.compile_jmap_filter). Later syncs only
+        look at the messages created, updated or destroyed since. ``state`` is
+        advanced after each page the caller has processed, so a caller that
+        stops early resumes from there.
+
+        Yields:
+            tuple: A list of message dicts (``id``, ``sender``, ``subject``,
+            ``timestamp``, ``body`` and ``html``), and a set of tracking numbers.
+        """
+        deadline = deadline if deadline is not None else Deadline()
+        if state.get("email_state"):
+            try:
+                async for page in self._iter_changes(state, since, search_template, deadline, metrics):
+                    yield page
+                return
+            except JmapError as e:
+                if e.error_type != CANNOT_CALCULATE_CHANGES:
+                    raise
+                _LOGGER.info("JMAP server has no changes since the last sync of %s, reading again.", self.session_url)
+                state.pop("email_state", None)
+        async for page in self._iter_query(state, since, search_template, search_criteria, deadline, metrics):
+            yield page
+
+    def mark_processed(self, state, message, tracking_numbers):
+        """Remember the tracking numbers found in a message."""
+        if tracking_numbers:
+            state.setdefault("emails", {})[message["id"]] = list(tracking_numbers)
@@ -0,0 +1,225 @@
+# custom_components/parcel_tracking_info/mail_sources.py
+
+import logging
+import mmap
+import os
+import re
+from email.errors import HeaderParseError
+from email.header import decode_header, make_header
+
+from .search import matches_search_template
+
+_LOGGER = logging.getLogger(__name__)
+
+SOURCE_MAILDIR = "maildir"
+SOURCE_MBOX = "mbox"
+SOURCE_EML = "eml"
+
+# Subdirectories of a Maildir holding messages (tmp/ only holds mail still being delivered)
+MAILDIR_SUBDIRS = ("new", "cur")
+# File extension of the messages in an .eml directory
+EML_EXTENSION = ".eml"
+# Start of a message in an mbox file (the "From " separator line)
+MBOX_SEPARATOR = re.compile(rb"^From [^\n]*\n", re.MULTILINE)
+# End of the header block of a message
+HEADER_END = re.compile(rb"\r?\n\r?\n")
+# A From or Subject header, including its folded continuation lines
+HEADER_FIELD = re.compile(rb"^(From|Subject):[ \t]*(.*(?:\r?\n[ \t].*)*)", re.MULTILINE | re.IGNORECASE)
+
+
+def parse_local_paths(local_mail_paths):
+    """Return the paths of a comma-separated string or list, with ``~`` expanded."""
+    if isinstance(local_mail_paths, str):
+        local_mail_paths = local_mail_paths.split(",")
+    paths = [os.path.expanduser(path.strip()) for path in local_mail_paths or [] if path and path.strip()]
+    return list(dict.fromkeys(paths))
+
+
+def detect_source_type(path):
+    """Return whether ``path`` is a Maildir, a directory of .eml files or an mbox file."""
+    if os.path.isdir(path):
+        if any(os.path.isdir(os.path.join(path, subdir)) for subdir in MAILDIR_SUBDIRS):
+            return SOURCE_MAILDIR
+        return SOURCE_EML
+    return SOURCE_MBOX
+
+
+def file_key(stat):
+    """Return the key of a file that stays the same while it is renamed (e.g. new/ -> cur/ in a Maildir)."""
+    return f"{stat.st_dev}:{stat.st_ino}"
+
+
+def _decode_header_value(value):
+    """Return an unfolded header value, decoding RFC 2047 encoded words."""
+    text = re.sub(r"\r?\n(?=[ \t])", "", value.decode("utf-8", "replace")).strip()
+    if "=?" in text:
+        try:
+            text = str(make_header(decode_header(text)))
+        except (HeaderParseError, LookupError, UnicodeError) as e:
+            _LOGGER.debug("Could not decode header '%s': %s", text, e)
+    return text
+
+
+def read_headers(data, start=0, end=None):
+    """Return the sender and subject of the raw message in ``data[start:end]``, looking at its header block only."""
+    end = len(data) if end is None else end
+    match = HEADER_END.search(data, start, end)
+    headers = {"from": "", "subject": ""}
+    for field in HEADER_FIELD.finditer(data, start, match.start() if match else end):
+        name = field.group(1).lower().decode()
+        if not headers[name]:
+            headers[name] = _decode_header_value(field.group(2))
+    return headers["from"], headers["subject"]
+
+
+class LocalMailSource:
+    """Mail on the local disk: a Maildir, an mbox file or a directory of .eml files.
+
+    For mail delivered locally (e.g. by fetchmail or getmail) and for exported
+    archives. Files are memory-mapped, so messages are split and their headers
+    matched without reading them into Python first, and only matching messages
+    are copied out for parsing. Processed messages are remembered in a state
+    dict kept by the caller: files by inode, mtime and size (so renames do not
+    count as new mail, rewritten files do), messages of an mbox by offset
+    together with the inode and scanned size of the file.
+
+    The methods block and run in the executor.
+    """
+
+    def __init__(self, path, source_type=None):
+        """Initialize the source."""
+        self.path = os.path.expanduser(path)
+        self.source_type = source_type or detect_source_type(self.path)
+
+    @property
+    def key(self):
+        """Return the key of this source's state."""
+        return f"local:{self.path}"
+
+    def _list_files(self):
+        """Return the message files of a Maildir or .eml directory with their stat results."""
+        if not os.path.isdir(self.path):
+            # Do not take an unmounted or mistyped path for a mailbox whose mail was deleted
+            raise FileNotFoundError(f"Mail directory {self.path} does not exist")
+        if self.source_type == SOURCE_MAILDIR:
+            directories = [os.path.join(self.path, subdir) for subdir in MAILDIR_SUBDIRS]
+        else:
+            directories = [self.path]
+        files = []
+        for directory in directories:
+            if not os.path.isdir(directory):
+                continue
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.name.startswith("."):
+                        continue
+                    if self.source_type == SOURCE_EML and not entry.name.lower().endswith(EML_EXTENSION):
+                        continue
+                    if entry.is_file():
+                        files.append((entry.path, entry.stat()))
+        return files
+
+    def _scan_files(self, state, since):
+        known = state.setdefault("files", {})
+        refs = []
+        present = set()
+        for path, stat in self._list_files():
+            key = file_key(stat)
+            present.add(key)
+            record = known.get(key)
+            if record is not None and (record["mtime"], record["size"]) == (stat.st_mtime_ns, stat.st_size):
+                continue
+            # A Maildir file's mtime is its delivery time; exported .eml files are filtered by their Date header
+            if self.source_type == SOURCE_MAILDIR and since is not None and stat.st_mtime < since:
+                continue
+            refs.append({
+                "key": key, "path": path, "mtime": stat.st_mtime_ns, "size": stat.st_size, "offset": 0,
+            })
+        vanished = set()
+        for key in set(known) - present:
+            vanished.update(known.pop(key)["numbers"])
+        refs.sort(key=lambda ref: ref["mtime"], reverse=True)
+        return refs, vanished
+
+    def _scan_mbox(self, state):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            stat = None
+        vanished = set()
+        inode = file_key(stat) if stat is not None else None
+        if stat is None or state.get("inode") != inode or stat.st_size < state.get("offset", 0):
+            # The mbox was removed, replaced or compacted: read it again from the start
+            for record in state.get("files", {}).values():
+                vanished.update(record["numbers"])
+            state.clear()
+            if stat is None:
+                return [], vanished
+            state.update({"inode": inode, "offset": 0, "files": {}})
+
+        known = state["files"]
+        start = state["offset"]
+        refs = []
+        if stat.st_size > start:
+            with open(self.path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                separators = [match.span() for match in MBOX_SEPARATOR.finditer(data, start, stat.st_size)]
+            for index, (separator_start, message_start) in enumerate(separators):
+                message_end = separators[index + 1][0] if index + 1 < len(separators) else stat.st_size
+                if str(separator_start) in known:
+                    continue
+                refs.append({
+                    "key": str(separator_start), "path": self.path, "mtime": stat.st_mtime_ns,
+                    "size": message_end - message_start, "offset": message_start,
+                })
+        state["scanned"] = stat.st_size
+        # Mail is appended to an mbox, so the last message is the newest
+        refs.reverse()
+        return refs, vanished
+
+    def scan(self, state, since=None):
+        """
+        Return the messages that were not processed yet, and the tracking numbers of processed ones that are gone.
+
+        Args:
+            state (dict): The source's state, updated in place.
+            since (Optional[float]): Skip Maildir files delivered before this POSIX timestamp.
+
+        Returns:
+            tuple: A list of message references (dicts with ``key``, ``path``,
+            ``offset`` and ``size``), newest first, and a set of tracking numbers.
+        """
+        if self.source_type == SOURCE_MBOX:
+            return self._scan_mbox(state)
+        return self._scan_files(state, since)
+
+    def read(self, ref, search_template=None):
+        """
+        Return the raw bytes of a message, or None if its headers do not match ``search_template``.
+
+        See search.matches_search_template; only the header block is parsed
+        to decide, the rest of a message that does not match is never copied.
+        """
+        if not ref["size"]:
+            return b""
+        with open(ref["path"], "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            end = min(ref["offset"] + ref["size"], len(data))
+            if search_template:
+                sender, subject = read_headers(data, ref["offset"], end)
+                if not matches_search_template(sender, subject, search_template):
+                    return None
+            return data[ref["offset"]:end]
+
+    def mark_processed(self, state, ref, tracking_numbers):
+        """Remember a message and the tracking numbers found in it."""
+        state.setdefault("files", {})[ref["key"]] = {
+            "mtime": ref["mtime"], "size": ref["size"], "numbers": list(tracking_numbers),
+        }
+
+    def mark_complete(self, state):
+        """Record that every message found by the last scan was processed (mbox files resume after them)."""
+        if self.source_type == SOURCE_MBOX and "scanned" in state:
+            state["offset"] = state.pop("scanned")
+            # Offsets before the resume point are never looked up again
+            state["files"] = {
+                key: record for key, record in state["files"].items() if record["numbers"]
+            }
@@ -0,0 +1,203 @@
+# custom_components/parcel_tracking_info/mailboxes.py
+
+import logging
+import re
+
+from homeassistant.const import CONF_EMAIL, CONF_PASSWORD, CONF_HOST, CONF_PORT
+
+_LOGGER = logging.getLogger(__name__)
+
+STATUS_ITEMS = ("UIDNEXT", "MESSAGES", "UIDVALIDITY")
+# RFC 7162: per-message modification sequences and reporting of expunged UIDs
+CONDSTORE_CAPABILITY = "CONDSTORE"
+QRESYNC_CAPABILITY = "QRESYNC"
+
+
+def parse_folders(email_folder):
+    """Return the folders of a comma-separated string or list, defaulting to the inbox."""
+    if isinstance(email_folder, str):
+        email_folder = email_folder.split(",")
+    folders = [folder.strip() for folder in email_folder or [] if folder and folder.strip()]
+    return list(dict.fromkeys(folders)) or ["inbox"]
+
+
+def quote_folder(folder):
+    """Quote a folder name for SELECT/EXAMINE/STATUS if it contains spaces or quotes."""
+    if folder.startswith('"') or not re.search(r'[\s"\\()]', folder):
+        return folder
+    return '"' + folder.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def set_imap_timeout(mail, seconds):
+    """Bound the blocking socket calls of an IMAP session to ``seconds``."""
+    sock = getattr(mail, "sock", None)
+    if sock is not None:
+        sock.settimeout(seconds)
+
+
+def refresh_capabilities(mail):
+    """Ask for the CAPABILITY list again after login, where servers often advertise more extensions."""
+    try:
+        status, data = mail.capability()
+    except Exception as e:
+        _LOGGER.debug("CAPABILITY after login failed: %s", e)
+        return
+    if status == "OK" and data and data[-1]:
+        mail.capabilities = tuple(data[-1].decode("ascii", "replace").upper().split())
+
+
+def enable_qresync(mail):
+    """Enable QRESYNC for the session if the server supports it, returning True on success."""
+    if getattr(mail, "qresync_enabled", False):
+        # Already enabled by an earlier refresh sharing this session
+        return True
+    capabilities = {str(capability).upper() for capability in getattr(mail, "capabilities", ())}
+    if QRESYNC_CAPABILITY not in capabilities or "ENABLE" not in capabilities:
+        return False
+    try:
+        status, _ = mail.enable(QRESYNC_CAPABILITY)
+    except Exception as e:
+        _LOGGER.debug("ENABLE QRESYNC failed: %s", e)
+        return False
+    mail.qresync_enabled = status == "OK"
+    return mail.qresync_enabled
+
+
+def format_uid_set(uids):
+    """Return sorted UIDs as a compact IMAP sequence set (e.g. ``1:3,7``)."""
+    ranges = []
+    for uid in sorted(uids):
+        if ranges and uid == ranges[-1][1] + 1:
+            ranges[-1][1] = uid
+        else:
+            ranges.append([uid, uid])
+    return ",".join(str(low) if low == high else f"{low}:{high}" for low, high in ranges)
+
+
+def parse_uid_set(uid_set):
+    """Return the UIDs of an IMAP sequence set without ``*`` (e.g. a VANISHED response)."""
+    uids = set()
+    for part in uid_set.split(","):
+        low, _, high = part.strip().partition(":")
+        if low.isdigit() and (not high or high.isdigit()):
+            uids.update(range(int(low), int(high or low) + 1))
+    return uids
+
+
+def get_folder_status(mail, folder, condstore=False):
+    """
+    Return the UIDNEXT, MESSAGES and UIDVALIDITY (and HIGHESTMODSEQ with CONDSTORE) of a folder without selecting it.
+
+    Returns:
+        Optional[dict]: The values keyed by lower-cased item name, or None if STATUS failed.
+    """
+    items = STATUS_ITEMS + (("HIGHESTMODSEQ",) if condstore else ())
+    try:
+        status, data = mail.status(quote_folder(folder), f"({' '.join(items)})")
+    except Exception as e:
+        _LOGGER.debug("STATUS of folder '%s' failed: %s", folder, e)
+        return None
+    if status != "OK" or not data or not data[0]:
+        return None
+    values = re.findall(rb"(UIDNEXT|MESSAGES|UIDVALIDITY|HIGHESTMODSEQ) (\d+)", data[0])
+    return {name.decode().lower(): int(value) for name, value in values} or None
+
+
+def folder_unchanged(folder_state, folder_status):
+    """Return True if a folder received, lost and changed no message since its last scan."""
+    if not folder_state or not folder_status:
+        return False
+    items = ("uidvalidity", "uidnext", "messages")
+    if "highestmodseq" in folder_status:
+        # The modification sequence also moves when flags change or messages are expunged
+        items += ("highestmodseq",)
+    return all(
+        folder_state.get(item) is not None and folder_state.get(item) == folder_status.get(item)
+        for item in items
+    )
+
+
+def get_folder_changes(mail, folder_state, condstore=False, qresync=False, flags=False):
+    """
+    Return the UIDs whose flags changed and the known UIDs that were expunged since the last scan.
+
+    Must run with the folder selected. With CONDSTORE the changed messages are
+    fetched with CHANGEDSINCE the stored HIGHESTMODSEQ; with QRESYNC the same
+    command reports the expunged UIDs (VANISHED). Otherwise the expunged UIDs are
+    found by searching which of the UIDs in ``folder_state["uids"]`` still exist.
+    Without QRESYNC the changed messages are only fetched when ``flags`` is set.
+
+    Returns:
+        tuple: (set of changed UIDs, set of vanished UIDs)
+    """
+    known_uids = set(folder_state.get("uids", {}))
+    modseq = folder_state.get("highestmodseq")
+    changed, vanished = set(), set()
+
+    if condstore and modseq and (qresync or flags):
+        modifiers = f"(CHANGEDSINCE {modseq}{' VANISHED' if qresync else ''})"
+        mail.response("VANISHED")  # Drop stale VANISHED responses
+        status, data = mail.uid("FETCH", "1:*", f"(FLAGS) {modifiers}")
+        if status == "OK":
+            for item in data or []:
+                line = item[0] if isinstance(item, tuple) else item
+                match = re.search(rb"UID (\d+)", line or b"")
+                if match:
+                    changed.add(int(match.group(1)))
+            if qresync:
+                _, vanished_data = mail.response("VANISHED")
+                for line in vanished_data or []:
+                    if line:
+                        vanished.update(parse_uid_set(line.decode().replace("(EARLIER)", "")))
+                return changed - vanished, vanished & known_uids
+
+    if known_uids:
+        status, data = mail.uid("SEARCH", None, f"UID {format_uid_set(known_uids)}")
+        if status == "OK":
+            remaining = {int(uid) for uid in (data[0] or b"").split()}
+            vanished = known_uids - remaining
+    return changed - vanished, vanished
+
+
+def get_accounts(entry):
+    """
+    Return the IMAP accounts of a config entry: the configured account followed by the additional ones.
+
+    The configured account is left out when it is read over JMAP (see jmap.JmapMailSource).
+
+    Returns:
+        list: Dicts with ``host``, ``port``, ``email``, ``password`` and ``folders``.
+    """
+    if entry.options.get("jmap_session_url", entry.data.get("jmap_session_url")):
+        return get_additional_accounts(entry)
+    return [{
+        "host": entry.options.get(CONF_HOST, entry.data.get(CONF_HOST, "")),
+        "port": entry.options.get(CONF_PORT, entry.data.get(CONF_PORT, 0)),
+        "email": entry.options.get(CONF_EMAIL, entry.data.get(CONF_EMAIL, "")),
+        "password": entry.options.get(CONF_PASSWORD, entry.data.get(CONF_PASSWORD, "")),
+        "folders": parse_folders(entry.options.get("email_folder", entry.data.get("email_folder", "inbox"))),
+    }] + get_additional_accounts(entry)
+
+
+def get_additional_accounts(entry):
+    """
+    Return the additional mail accounts of a config entry.
+
+    Returns:
+        list: Dicts with ``host``, ``port``, ``email``, ``password`` and ``folders``.
+    """
+    return [
+        {
+            "host": account.get(CONF_HOST, ""),
+            "port": account.get(CONF_PORT, 993),
+            "email": account.get(CONF_EMAIL, ""),
+            "password": account.get(CONF_PASSWORD, ""),
+            "folders": parse_folders(account.get("email_folder", "inbox")),
+        }
+        for account in entry.options.get("additional_accounts", entry.data.get("additional_accounts", []))
+    ]
+
+
+def account_key(account):
+    """Return a key identifying a mail account."""
+    return f"{account['email'].lower()}@{account['host']}:{account['port']}"
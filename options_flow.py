@@ -2,14 +2,22 @@
 
 import json
 import logging
+import os
 import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.const import CONF_EMAIL, CONF_PASSWORD, CONF_HOST, CONF_PORT
 from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.components.persistent_notification import create as persistent_notification_create
 from .const import DOMAIN
 from .carrier_apis import CARRIER_API_CLASSES
+from .circuit_breaker import DEFAULT_FAILURE_THRESHOLD, DEFAULT_PROBE_INTERVAL
+from .deadline import DEFAULT_REFRESH_TIMEOUT
 from .helpers import test_email_connection, process_status_strings
+from .history import DEFAULT_RETENTION_DAYS
+from .jmap import JmapMailSource
+from .mail_sources import parse_local_paths
+from .parcel_tracking import DEFAULT_MAX_IN_FLIGHT_BYTES
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -34,6 +42,8 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                 return await self.async_step_email_config()
             elif option == 'carrier_config':
                 return await self.async_step_carrier_config()
+            elif option == 'accounts_config':
+                return await self.async_step_accounts_config()
             elif option == 'export_config':
                 return await self.async_step_export_config()
             elif option == 'edit_carrier_info':
@@ -46,6 +56,7 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
         options_schema = vol.Schema({
             vol.Required('option'): vol.In({
                 'email_config': "Edit Email Configuration",
+                'accounts_config': "Edit Additional Email Accounts",
                 'carrier_config': "Edit Carrier Configuration",
                 'edit_carrier_info': "Edit Carrier Name",
                 'edit_api_template': "Edit API Configuration / Template",
@@ -154,12 +165,35 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                 email_account = user_input.get(CONF_EMAIL)
                 email_password = user_input.get(CONF_PASSWORD)
 
-                connected, error_code = await self.hass.async_add_executor_job(
-                    test_email_connection, imap_server, imap_port, email_account, email_password
-                )
+                jmap_session_url = user_input.get('jmap_session_url', '').strip()
+                jmap_error = None
+                if jmap_session_url:
+                    # The configured account is read over JMAP: check the session instead of IMAP
+                    connected, error_code = True, None
+                    try:
+                        await JmapMailSource(
+                            jmap_session_url, user_input.get('jmap_token', ''), async_get_clientsession(self.hass)
+                        ).async_connect()
+                    except Exception as e:
+                        _LOGGER.error("JMAP session check failed: %s", e)
+                        jmap_error = 'jmap_error'
+                else:
+                    connected, error_code = await self.hass.async_add_executor_job(
+                        test_email_connection, imap_server, imap_port, email_account, email_password
+                    )
+
+                missing_paths = [
+                    path for path in parse_local_paths(user_input.get('local_mail_paths', ''))
+                    if not await self.hass.async_add_executor_job(os.path.exists, path)
+                ]
 
                 if not connected:
                     errors['base'] = error_code or 'cannot_connect'
+                elif jmap_error:
+                    errors['jmap_session_url'] = jmap_error
+                elif missing_paths:
+                    _LOGGER.error("Local mail paths not found: %s", ', '.join(missing_paths))
+                    errors['local_mail_paths'] = 'local_path_not_found'
                 else:
                     # Update the config entry options with the new email config
                     updated_options = {**self.config_entry.options, **user_input}
@@ -183,6 +217,13 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
             vol.Required('email_folder', default=existing_options.get('email_folder', existing_data.get('email_folder', "inbox"))): cv.string,
             vol.Optional('update_interval', default=existing_options.get('update_interval', existing_data.get('update_interval', 60))): vol.All(vol.Coerce(int), vol.Range(min=1)),
             vol.Optional('email_age', default=existing_options.get('email_age', existing_data.get('email_age', 10))): vol.All(vol.Coerce(int), vol.Range(min=1)),
+            vol.Optional('history_retention', default=existing_options.get('history_retention', existing_data.get('history_retention', DEFAULT_RETENTION_DAYS))): vol.All(vol.Coerce(int), vol.Range(min=1)),
+            vol.Optional('max_in_flight_mb', default=existing_options.get('max_in_flight_mb', existing_data.get('max_in_flight_mb', DEFAULT_MAX_IN_FLIGHT_BYTES // (1024 * 1024)))): vol.All(vol.Coerce(int), vol.Range(min=1)),
+            vol.Optional('unseen_only', default=existing_options.get('unseen_only', existing_data.get('unseen_only', False))): cv.boolean,
+            vol.Optional('refresh_timeout', default=existing_options.get('refresh_timeout', existing_data.get('refresh_timeout', DEFAULT_REFRESH_TIMEOUT))): vol.All(vol.Coerce(int), vol.Range(min=10)),
+            vol.Optional('local_mail_paths', default=existing_options.get('local_mail_paths', existing_data.get('local_mail_paths', ""))): cv.string,
+            vol.Optional('jmap_session_url', default=existing_options.get('jmap_session_url', existing_data.get('jmap_session_url', ""))): cv.string,
+            vol.Optional('jmap_token', default=existing_options.get('jmap_token', existing_data.get('jmap_token', ""))): cv.string,
         })
 
         return self.async_show_form(
@@ -191,6 +232,68 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
             errors=errors,
         )
 
+    async def async_step_accounts_config(self, user_input=None):
+        """Add or remove additional email accounts scanned for this carrier."""
+        errors = {}
+        existing_accounts = list(self.config_entry.options.get(
+            'additional_accounts', self.config_entry.data.get('additional_accounts', [])
+        ))
+        account_labels = {
+            str(index): f"{account.get(CONF_EMAIL, '')} ({account.get(CONF_HOST, '')})"
+            for index, account in enumerate(existing_accounts)
+        }
+
+        if user_input is not None:
+            try:
+                remove = set(user_input.get('remove_accounts', []))
+                accounts = [account for index, account in enumerate(existing_accounts) if str(index) not in remove]
+
+                email_account = user_input.get(CONF_EMAIL, '').strip()
+                if email_account:
+                    new_account = {
+                        CONF_HOST: user_input.get(CONF_HOST, '').strip(),
+                        CONF_PORT: user_input.get(CONF_PORT, 993),
+                        CONF_EMAIL: email_account,
+                        CONF_PASSWORD: user_input.get(CONF_PASSWORD, ''),
+                        'email_folder': user_input.get('email_folder', 'inbox'),
+                    }
+                    connected, error_code = await self.hass.async_add_executor_job(
+                        test_email_connection,
+                        new_account[CONF_HOST],
+                        new_account[CONF_PORT],
+                        new_account[CONF_EMAIL],
+                        new_account[CONF_PASSWORD],
+                    )
+                    if not connected:
+                        errors['base'] = error_code or 'cannot_connect'
+                    else:
+                        accounts.append(new_account)
+
+                if not errors:
+                    updated_options = {**self.config_entry.options, 'additional_accounts': accounts}
+                    self.hass.config_entries.async_update_entry(
+                        self.config_entry, options=updated_options
+                    )
+                    return self.async_create_entry(title="", data=None)
+            except Exception as e:
+                _LOGGER.error("Error in OptionsFlowHandler.async_step_accounts_config: %s", e)
+                errors['base'] = 'unknown_error'
+
+        accounts_schema = vol.Schema({
+            vol.Optional('remove_accounts', default=[]): cv.multi_select(account_labels),
+            vol.Optional(CONF_HOST, default="imap.gmail.com"): cv.string,
+            vol.Optional(CONF_PORT, default=993): cv.port,
+            vol.Optional(CONF_EMAIL, default=""): cv.string,
+            vol.Optional(CONF_PASSWORD, default=""): cv.string,
+            vol.Optional('email_folder', default="inbox"): cv.string,
+        })
+
+        return self.async_show_form(
+            step_id="accounts_config",
+            data_schema=accounts_schema,
+            errors=errors,
+        )
+
     async def async_step_carrier_config(self, user_input=None):
         """Carrier configuration in options flow."""
         errors = {}
@@ -259,10 +362,14 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
         api_schema = vol.Schema({})
 
         if self.config_entry.data.get('api_template') in CARRIER_API_CLASSES:
-            default_api_url = CARRIER_API_CLASSES[self.config_entry.data.get('api_template')].get('api_url', '')
+            api_class = CARRIER_API_CLASSES[self.config_entry.data.get('api_template')]
+            # Public tracking endpoints (GLS, DPD) work without an API key
+            key_field = vol.Required if api_class.requires_api_key else vol.Optional
             api_schema = vol.Schema({
-                vol.Required('api_key', default=self.config_entry.options.get('api_key', '')): cv.string,
-                vol.Required('api_url', default=self.config_entry.options.get('api_url', default_api_url)): cv.string,
+                key_field('api_key', default=self.config_entry.options.get('api_key', '')): cv.string,
+                vol.Required('api_url', default=self.config_entry.options.get('api_url', api_class.default_api_url)): cv.string,
+                vol.Optional('breaker_failure_threshold', default=self.config_entry.options.get('breaker_failure_threshold', DEFAULT_FAILURE_THRESHOLD)): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                vol.Optional('breaker_probe_interval', default=self.config_entry.options.get('breaker_probe_interval', DEFAULT_PROBE_INTERVAL)): vol.All(vol.Coerce(int), vol.Range(min=10)),
             })
 
         return self.async_show_form(
@@ -0,0 +1,201 @@
+# custom_components/parcel_tracking_info/orchestrator.py
+
+import asyncio
+import logging
+import time
+
+from .parcel_tracking import logout_quietly
+
+_LOGGER = logging.getLogger(__name__)
+
+# Maximum number of mailbox syncs that may run at the same time
+DEFAULT_MAX_CONCURRENT_SYNCS = 2
+# Minimum spacing (in seconds) between the start of two mailbox syncs
+DEFAULT_STAGGER_SECONDS = 5
+
+
+class ImapSessionPool:
+    """IMAP sessions left open by one coordinator's refresh for the next one of the same job.
+
+    fetch_emails takes a session for its account from the pool instead of
+    logging in again, and hands it back when it finished without errors.
+    The job logs out of the remaining sessions when all refreshes are done.
+    """
+
+    def __init__(self):
+        """Initialize the pool."""
+        self._sessions = {}  # account key -> logged in IMAP connection
+        self.reused = 0
+
+    def acquire(self, key):
+        """Return the open session of an account, or None."""
+        mail = self._sessions.pop(key, None)
+        if mail is not None:
+            self.reused += 1
+        return mail
+
+    def release(self, key, mail):
+        """Keep a session for the next refresh, returning False if the account already has one."""
+        if key in self._sessions:
+            return False
+        self._sessions[key] = mail
+        return True
+
+    async def async_close(self, hass):
+        """Log out of all sessions."""
+        sessions, self._sessions = list(self._sessions.values()), {}
+        for mail in sessions:
+            await hass.async_add_executor_job(logout_quietly, mail)
+
+
+class _MailboxJob:
+    """A queued sync for one mailbox, shared by every coordinator that requested it."""
+
+    def __init__(self, mailbox_key):
+        self.mailbox_key = mailbox_key
+        self.started = False
+        self.requests = {}  # coordinator -> future
+        self.current = None  # (coordinator, task) of the refresh running now
+
+    def add(self, coordinator):
+        """Attach a coordinator to this job and return the future for its result."""
+        future = self.requests.get(coordinator)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self.requests[coordinator] = future
+        return future
+
+
+class RefreshOrchestrator:
+    """Domain-wide scheduler that staggers and coalesces coordinator refreshes.
+
+    All coordinators start with the same update interval, so without this they
+    would open their IMAP and API connections at the same moment. Refreshes are
+    queued per mail account: requests for an account that already has a queued
+    job join that job instead of creating a new one, and jobs are started at
+    most ``max_concurrent`` at a time and at least ``stagger_seconds`` apart.
+    The coordinators of a job refresh one after another over the same IMAP
+    session (see ImapSessionPool), so the account sees one LOGIN per job
+    however many carriers read from it.
+    """
+
+    def __init__(self, hass, max_concurrent=DEFAULT_MAX_CONCURRENT_SYNCS, stagger_seconds=DEFAULT_STAGGER_SECONDS):
+        """Initialize the orchestrator."""
+        self.hass = hass
+        self.stagger_seconds = stagger_seconds
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._start_lock = asyncio.Lock()
+        self._mailbox_locks = {}
+        self._pending = {}  # mailbox_key -> queued _MailboxJob
+        self._running = set()  # _MailboxJobs whose refreshes have started
+        self._tasks = set()  # Tasks running the jobs, cancelled on shutdown
+        self._last_start = None
+        self.coalesced_requests = 0
+        self.completed_jobs = 0
+        self.shared_sessions = 0
+
+    @property
+    def queue_depth(self):
+        """Return the number of mailbox jobs waiting to start."""
+        return len(self._pending)
+
+    @property
+    def stats(self):
+        """Return a snapshot of the orchestrator metrics."""
+        return {
+            "queue_depth": self.queue_depth,
+            "coalesced_requests": self.coalesced_requests,
+            "completed_jobs": self.completed_jobs,
+            "shared_sessions": self.shared_sessions,
+            "stagger_seconds": self.stagger_seconds,
+        }
+
+    async def async_refresh(self, mailbox_key, coordinator):
+        """Queue a refresh of ``coordinator`` and wait for its result."""
+        job = self._pending.get(mailbox_key)
+        if job is None:
+            job = _MailboxJob(mailbox_key)
+            self._pending[mailbox_key] = job
+            task = self.hass.async_create_background_task(
+                self._async_run_job(job), f"parcel_tracking_info sync {mailbox_key}"
+            )
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        elif job.requests:
+            self.coalesced_requests += 1
+            _LOGGER.debug("Coalescing refresh of %s into queued sync for %s", coordinator.name, mailbox_key)
+
+        _LOGGER.debug("Refresh queue depth: %d", self.queue_depth)
+        return await job.add(coordinator)
+
+    def cancel(self, coordinator):
+        """Drop the queued or running refresh of a coordinator that is unloaded."""
+        for job in [*self._pending.values(), *self._running]:
+            future = job.requests.pop(coordinator, None)
+            if future is not None and not future.done():
+                future.cancel()
+            if job.current is not None and job.current[0] is coordinator:
+                job.current[1].cancel()
+
+    async def async_shutdown(self):
+        """Cancel all jobs, waiting for them to finish."""
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _async_wait_for_slot(self):
+        """Wait until the stagger interval since the previous job start has passed."""
+        async with self._start_lock:
+            if self._last_start is not None:
+                delay = self._last_start + self.stagger_seconds - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            self._last_start = time.monotonic()
+
+    async def _async_run_job(self, job):
+        """Run every coordinator refresh attached to a mailbox job, sharing their IMAP sessions."""
+        mailbox_lock = self._mailbox_locks.setdefault(job.mailbox_key, asyncio.Lock())
+        sessions = ImapSessionPool()
+        try:
+            async with mailbox_lock, self._semaphore:
+                await self._async_wait_for_slot()
+
+                # From here on, new requests for this mailbox start a fresh job
+                job.started = True
+                self._running.add(job)
+                if self._pending.get(job.mailbox_key) is job:
+                    del self._pending[job.mailbox_key]
+
+                _LOGGER.debug("Starting sync for %s with %d coordinator(s)", job.mailbox_key, len(job.requests))
+                for coordinator, future in list(job.requests.items()):
+                    if future.done():
+                        continue
+                    task = asyncio.ensure_future(coordinator.async_refresh_tracking_data(sessions))
+                    job.current = (coordinator, task)
+                    # Wait without propagating the cancellation of this one refresh to the job
+                    await asyncio.wait({task})
+                    job.current = None
+                    if future.done():
+                        continue
+                    if task.cancelled():
+                        future.cancel()
+                    elif task.exception() is not None:
+                        future.set_exception(task.exception())
+                    else:
+                        future.set_result(task.result())
+        except asyncio.CancelledError:
+            if job.current is not None:
+                job.current[1].cancel()
+            for future in job.requests.values():
+                if not future.done():
+                    future.cancel()
+            raise
+        finally:
+            self.shared_sessions += sessions.reused
+            await sessions.async_close(self.hass)
+            self._running.discard(job)
+            if self._pending.get(job.mailbox_key) is job:
+                del self._pending[job.mailbox_key]
+            self.completed_jobs += 1
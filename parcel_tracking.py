@@ -2,6 +2,7 @@
 
 import imaplib
 import email
+import email.utils
 import re
 import logging
 import aiohttp
@@ -9,32 +10,120 @@ import asyncio
 from datetime import datetime, timedelta
 import html
 import functools
+import contextlib
 from collections import defaultdict
 
 from .trackingstatus import map_status  # Import the updated mapping function
 from .delivery_date_normalization import normalize_date  # New import
 from bs4 import BeautifulSoup  # Import BeautifulSoup for HTML parsing
-from .carrier_apis import CARRIER_API_CLASSES
+from .carrier_apis import CARRIER_API_CLASSES, tracking_result
+from .circuit_breaker import DEFAULT_FAILURE_THRESHOLD, DEFAULT_PROBE_INTERVAL
+from .dedup import score_tracking_number
+from .freshness import merge_tracking_info, needs_api_lookup, stamp_sources
+from .checksums import check_tracking_number
+from .instrumentation import RefreshMetrics
+from .rules import get_evaluation_plan
+from .search import compile_search_criteria, format_search_criteria, get_capabilities  # noqa: F401
+from .mailboxes import (
+    CONDSTORE_CAPABILITY,
+    account_key,
+    enable_qresync,
+    folder_unchanged,
+    format_uid_set,
+    get_folder_changes,
+    get_folder_status,
+    parse_folders,
+    quote_folder,
+    refresh_capabilities,
+    set_imap_timeout,
+)
+from .deadline import Deadline, IMAP_TIMEOUT
+from .jmap import JmapError
 
 _LOGGER = logging.getLogger(__name__)
 
-def extract_tracking_number(email_body, tracking_pattern, processed_tracking_numbers):
-    """Extract a tracking number from the email body."""
-    _LOGGER.debug(f"Attempting to extract tracking number with pattern: {tracking_pattern}")
-    matches = re.findall(tracking_pattern, email_body)
-    if matches:
-        _LOGGER.debug(f"Regex matched tracking numbers: {matches}")
-        for match in matches:
-            tracking_number = match.strip()
-            if tracking_number not in processed_tracking_numbers:
-                _LOGGER.debug(f"New tracking number found: {tracking_number}")
-                processed_tracking_numbers.add(tracking_number)
-                return tracking_number
-            else:
-                _LOGGER.debug(f"Duplicate tracking number found: {tracking_number}, skipping.")
-    else:
+# Number of characters kept on each side of a tracking number as its context
+TRACKING_CONTEXT_CHARS = 80
+# Maximum size of the raw messages fetched but not yet parsed
+DEFAULT_MAX_IN_FLIGHT_BYTES = 8 * 1024 * 1024
+# Number of messages per FETCH (RFC822.SIZE) command
+SIZE_FETCH_BATCH = 500
+
+def extract_tracking_numbers(email_body, tracking_pattern, processed_tracking_numbers, validators=None, rejected=None, limit=None,
+                             duplicates=None):
+    """
+    Extract every new tracking number from the email body.
+
+    Candidates failing one of the ``validators`` (see checksums.get_validators)
+    are discarded and counted per validator name in the ``rejected`` dict.
+    Numbers skipped because they are in ``processed_tracking_numbers`` are
+    appended to the ``duplicates`` list.
+
+    Returns:
+        list: One dict per new tracking number with the keys ``tracking_number``,
+        ``start`` and ``end`` (position in the body), ``context`` (the surrounding
+        text) and ``section_start``/``section_end`` (the span from this number up
+        to the next one; the first section also includes the text before the
+        first number).
+    """
+    _LOGGER.debug("Attempting to extract tracking numbers with pattern: %s", tracking_pattern)
+    found = []
+    for match in re.finditer(tracking_pattern, email_body):
+        # Patterns with groups (e.g. Hermes) capture the number in the first matching group
+        group = next((index for index, value in enumerate(match.groups(), 1) if value), 0)
+        tracking_number = match.group(group).strip()
+        start, end = match.span(group)
+
+        if tracking_number in processed_tracking_numbers:
+            _LOGGER.debug("Duplicate tracking number found: %s, skipping.", tracking_number)
+            if duplicates is not None and tracking_number not in duplicates:
+                duplicates.append(tracking_number)
+            continue
+        if validators:
+            valid, failed_validator = check_tracking_number(tracking_number, validators)
+            if valid is False:
+                _LOGGER.debug("Tracking number %s failed %s check, skipping.", tracking_number, failed_validator)
+                if rejected is not None:
+                    rejected[failed_validator] = rejected.get(failed_validator, 0) + 1
+                continue
+
+        _LOGGER.debug("New tracking number found: %s", tracking_number)
+        processed_tracking_numbers.add(tracking_number)
+        found.append({
+            "tracking_number": tracking_number,
+            "start": start,
+            "end": end,
+            "context": email_body[max(0, start - TRACKING_CONTEXT_CHARS):end + TRACKING_CONTEXT_CHARS],
+        })
+        if limit and len(found) >= limit:
+            break
+
+    if not found:
         _LOGGER.debug("No tracking number found.")
-    return None
+
+    # A mail listing several parcels is split into one section per parcel
+    for index, item in enumerate(found):
+        section_start = item["start"] if index > 0 else 0
+        section_end = found[index + 1]["start"] if index + 1 < len(found) else len(email_body)
+        item["section_start"], item["section_end"] = section_start, section_end
+
+    return found
+
+def extract_tracking_number(email_body, tracking_pattern, processed_tracking_numbers, validators=None, rejected=None):
+    """Extract the first new tracking number from the email body."""
+    found = extract_tracking_numbers(
+        email_body, tracking_pattern, processed_tracking_numbers, validators, rejected, limit=1
+    )
+    return found[0]["tracking_number"] if found else None
+
+def html_to_text(html_content):
+    """Return the text of an HTML body, one line per block."""
+    # Use BeautifulSoup to extract text from HTML
+    soup = BeautifulSoup(html_content, 'html.parser')
+    text = soup.get_text(separator='\n')
+    # Free the parse tree right away instead of waiting for the garbage collector
+    soup.decompose()
+    return text
 
 def extract_email_body(msg):
     """Extract and return the email body from a message object."""
@@ -45,20 +134,15 @@ def extract_email_body(msg):
         for part in msg.walk():
             content_type = part.get_content_type()
             content_disposition = str(part.get("Content-Disposition"))
-            _LOGGER.debug(f"Processing part with content type: {content_type}")
             if content_type == "text/html" and "attachment" not in content_disposition:
                 html_content = part.get_payload(decode=True).decode(
                     part.get_content_charset("utf-8"), errors="ignore"
                 )
-                # Use BeautifulSoup to extract text from HTML
-                soup = BeautifulSoup(html_content, 'html.parser')
-                html_body = soup.get_text(separator='\n')
-                _LOGGER.debug(f"Extracted text/html email body: {html_body[:500]}...")
+                html_body = html_to_text(html_content)
             elif content_type == "text/plain" and "attachment" not in content_disposition:
                 text_content = part.get_payload(decode=True).decode(
                     part.get_content_charset("utf-8"), errors="ignore"
                 )
-                _LOGGER.debug(f"Extracted text/plain email body: {text_content[:500]}...")
                 text_body = text_content
         # Prefer HTML body over text body if available
         if html_body.strip():
@@ -71,7 +155,6 @@ def extract_email_body(msg):
         email_body = msg.get_payload(decode=True).decode(
             msg.get_content_charset("utf-8"), errors="ignore"
         )
-        _LOGGER.debug(f"Extracted non-multipart email body: {email_body[:500]}...")
     return email_body
     
 async def extract_eta_from_email(hass, email_body, eta_string, eta_pattern):
@@ -94,7 +177,7 @@ async def extract_eta_from_email(hass, email_body, eta_string, eta_pattern):
         match = re.search(eta_pattern, text_after_eta, re.IGNORECASE)
         if match:
             raw_eta = match.group(0)
-            _LOGGER.debug(f"Extracted raw ETA: {raw_eta}")
+            _LOGGER.debug("Extracted raw ETA: %s", raw_eta)
             # Normalize the extracted date asynchronously
             normalized_eta = await hass.async_add_executor_job(normalize_date, raw_eta)
             if normalized_eta:
@@ -112,20 +195,29 @@ def extract_status_from_email(email_body, status_strings):
     # First, check for status strings provided by the user
     for status in status_strings:
         if status.lower() in email_body_lower:
-            _LOGGER.debug(f"Found status string '{status}' in email.")
             mapped_status = map_status(status)
-            _LOGGER.debug(f"Mapped status: '{status}' to '{mapped_status}'")
+            _LOGGER.debug("Mapped status string '%s' to '%s'", status, mapped_status)
             return mapped_status
 
     # If no status found, return None
     _LOGGER.debug("No status strings matched in the email.")
     return None
 
-def get_imap_connection(imap_server, imap_port, email_account, email_password):
-    """Create and return an IMAP connection."""
+def get_email_timestamp(msg):
+    """Return the Date header of a message as a POSIX timestamp, or now if it is missing."""
+    date_header = msg.get("Date")
+    if date_header:
+        try:
+            return email.utils.parsedate_to_datetime(date_header).timestamp()
+        except (TypeError, ValueError) as e:
+            _LOGGER.debug("Could not parse email date '%s': %s", date_header, e)
+    return datetime.now().timestamp()
+
+def get_imap_connection(imap_server, imap_port, email_account, email_password, timeout=None):
+    """Create and return an IMAP connection, optionally with a socket timeout in seconds."""
     try:
         _LOGGER.debug(f"Connecting to IMAP server: {imap_server} on port: {imap_port} with email: {email_account}")
-        mail = imaplib.IMAP4_SSL(imap_server, imap_port)
+        mail = imaplib.IMAP4_SSL(imap_server, imap_port, timeout=timeout)
         mail.login(email_account, email_password)
         _LOGGER.debug("Successfully connected and logged into IMAP server.")
         return mail
@@ -136,18 +228,320 @@ def get_imap_connection(imap_server, imap_port, email_account, email_password):
         _LOGGER.error(f"Unexpected error connecting to IMAP server: {e}")
         raise
 
-def format_search_criteria(search_criteria, date_cutoff):
-    """Format the search criteria by adding the date cutoff."""
-    # Ensure the criteria is enclosed in parentheses
-    if not (search_criteria.startswith('(') and search_criteria.endswith(')')):
-        search_criteria = f'({search_criteria})'
-    # Check if SINCE is already included
-    if 'SINCE' in search_criteria.upper():
-        # Assume user is handling date filtering
-        return search_criteria
-    else:
-        # Append the SINCE date
-        return f'{search_criteria} SINCE {date_cutoff}'
+def session_alive(mail):
+    """Return True if an IMAP session that was left open still answers."""
+    try:
+        status, _ = mail.noop()
+    except Exception as e:
+        _LOGGER.debug("Open IMAP session is gone: %s", e)
+        return False
+    return status == "OK"
+
+def logout_quietly(mail):
+    """Log out of the IMAP server, ignoring errors of an already broken connection."""
+    try:
+        mail.logout()
+    except Exception as e:
+        _LOGGER.debug("Error logging out of IMAP server: %s", e)
+
+class _ByteBudget:
+    """Limit the number of message bytes held by the fetch pipeline at the same time."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.in_flight = 0
+        self.peak = 0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self, size):
+        """Wait until ``size`` bytes fit into the budget (an oversized message is let through alone)."""
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight == 0 or self.in_flight + size <= self.limit)
+            self.in_flight += size
+            self.peak = max(self.peak, self.in_flight)
+
+    async def release(self, size):
+        """Return ``size`` bytes to the budget."""
+        async with self._condition:
+            self.in_flight -= size
+            self._condition.notify_all()
+
+
+def get_message_sizes(mail, email_uids):
+    """Return the RFC822.SIZE of each message UID, fetched in batches."""
+    sizes = {}
+    for index in range(0, len(email_uids), SIZE_FETCH_BATCH):
+        batch = email_uids[index:index + SIZE_FETCH_BATCH]
+        status, data = mail.uid("FETCH", b",".join(batch), "(RFC822.SIZE)")
+        if status != "OK":
+            continue
+        for item in data:
+            line = (item[0] if isinstance(item, tuple) else item) or b""
+            uid = re.search(rb"\bUID (\d+)", line)
+            size = re.search(rb"\bRFC822\.SIZE (\d+)", line)
+            if uid and size:
+                sizes[uid.group(1)] = int(size.group(1))
+    return sizes
+
+
+def get_uidvalidity(mail):
+    """Return the UIDVALIDITY reported when the folder was selected, if any."""
+    _, data = mail.response("UIDVALIDITY")
+    try:
+        return int(data[0])
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+def parse_message(raw_message, tracking_pattern, processed_tracking_numbers, validators=None, rejected=None,
+                  plan=None):
+    """
+    Decode a raw message and extract its tracking numbers.
+
+    Runs in the executor; only the extracted text is kept, the message object
+    is dropped when this returns. The ETA anchors and status keywords of the
+    evaluation ``plan`` (see rules.get_evaluation_plan) are located in the same
+    call, so the event loop only queries their positions.
+
+    Returns:
+        dict: ``body``, ``timestamp``, ``sender``, ``found`` (see extract_tracking_numbers),
+        ``numbers`` (every tracking number in the message, including those already
+        found in another message) and ``scan`` (a rules.RuleScan, or None without
+        new tracking numbers); iter_messages adds the ``uid`` of the message.
+    """
+    msg = email.message_from_bytes(raw_message)
+    return parse_body(
+        extract_email_body(msg), get_email_timestamp(msg), msg.get("From", ""),
+        tracking_pattern, processed_tracking_numbers, validators, rejected, plan,
+    )
+
+
+def parse_body(email_body, timestamp, sender, tracking_pattern, processed_tracking_numbers, validators=None,
+               rejected=None, plan=None):
+    """
+    Extract the tracking numbers of an already decoded message body (see parse_message).
+
+    Used directly by sources that deliver the text instead of the raw message, e.g. JMAP.
+    """
+    plan = plan or get_evaluation_plan(tracking_pattern)
+    duplicates = []
+    found = extract_tracking_numbers(
+        email_body, plan.tracking_regex, processed_tracking_numbers, validators, rejected, duplicates=duplicates
+    )
+    return {
+        "body": email_body,
+        "timestamp": timestamp,
+        "sender": sender,
+        "found": found,
+        "numbers": [item["tracking_number"] for item in found] + duplicates,
+        "scan": plan.scan(email_body) if found else None,
+    }
+
+
+async def _fetch_messages(hass, mail, email_uids, sizes, budget, queue, metrics, deadline):
+    """Fetch the messages one by one into ``queue``, waiting for the byte budget before each fetch."""
+    try:
+        for uid in email_uids:
+            size = sizes.get(uid, 0)
+            await budget.acquire(size)
+            if deadline.expired:
+                # Leave the remaining (older) messages to the next refresh
+                deadline.truncate("message_fetch")
+                await budget.release(size)
+                break
+            set_imap_timeout(mail, deadline.timeout(IMAP_TIMEOUT))
+            fetch_email = functools.partial(mail.uid, "FETCH", uid, "(BODY.PEEK[])")
+            try:
+                with metrics.span("message_fetch"):
+                    status, data = await hass.async_add_executor_job(fetch_email)
+            except BaseException:
+                await budget.release(size)
+                raise
+            if status != "OK" or not data or not isinstance(data[0], tuple):
+                _LOGGER.warning("Failed to fetch email with UID %s. Skipping.", uid.decode())
+                metrics.increment("messages_skipped")
+                await budget.release(size)
+                continue
+            raw_message = data[0][1]
+            del data
+            metrics.increment("messages_fetched")
+            metrics.increment("bytes_downloaded", len(raw_message))
+            await queue.put((uid, raw_message, size))
+    except Exception as e:
+        await queue.put(e)
+        return
+    await queue.put(None)
+
+
+async def iter_messages(hass, mail, email_uids, tracking_pattern, processed_tracking_numbers,
+                        validators=None, rejected=None, metrics=None, max_in_flight_bytes=DEFAULT_MAX_IN_FLIGHT_BYTES,
+                        plan=None, deadline=None):
+    """
+    Fetch and parse messages as a pipeline, yielding each parsed message with tracking numbers.
+
+    Fetching the next messages overlaps with parsing the current one, but never
+    holds more than ``max_in_flight_bytes`` of raw messages (plus the message
+    being parsed); the caller must not keep the yielded dict after handling it,
+    the budget of a message is released once the caller asks for the next one.
+    No further messages are fetched once ``deadline`` has expired.
+    Messages whose tracking numbers were all found before are yielded with an
+    empty ``found`` list, so the caller still learns which mails mention them.
+    """
+    metrics = metrics if metrics is not None else RefreshMetrics()
+    deadline = deadline if deadline is not None else Deadline()
+    budget = _ByteBudget(max_in_flight_bytes)
+    with metrics.span("imap_sizes"):
+        sizes = await hass.async_add_executor_job(get_message_sizes, mail, email_uids)
+
+    queue = asyncio.Queue()
+    producer = asyncio.ensure_future(
+        _fetch_messages(hass, mail, email_uids, sizes, budget, queue, metrics, deadline)
+    )
+    try:
+        while True:
+            item = await queue.get()
+            if item is None:
+                break
+            if isinstance(item, Exception):
+                raise item
+
+            uid, raw_message, size = item
+            item = None
+            try:
+                with metrics.span("message_parse"):
+                    parsed = await hass.async_add_executor_job(
+                        parse_message, raw_message, tracking_pattern, processed_tracking_numbers, validators, rejected,
+                        plan,
+                    )
+                # The raw bytes are not needed once the text has been extracted
+                raw_message = None
+                if not parsed["found"]:
+                    metrics.increment("messages_skipped")
+                    if not parsed["numbers"]:
+                        continue
+                parsed["uid"] = int(uid)
+                yield parsed
+                parsed = None
+            finally:
+                await budget.release(size)
+    finally:
+        if not producer.done():
+            producer.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await producer
+        _LOGGER.debug("Peak message bytes in flight: %d", budget.peak)
+
+
+async def search_new_uids(hass, mail, folder, search_criteria, min_uid=None, metrics=None):
+    """Run a UID SEARCH in the selected folder and return the matching UIDs, newest first."""
+    metrics = metrics if metrics is not None else RefreshMetrics()
+    _LOGGER.debug("Searching folder '%s' with criteria: %s", folder, search_criteria)
+    search_emails = functools.partial(mail.uid, "SEARCH", None, search_criteria)
+    with metrics.span("imap_search"):
+        status, messages = await hass.async_add_executor_job(search_emails)
+
+    if status != "OK":
+        _LOGGER.debug("No emails found in folder '%s' with the given search criteria.", folder)
+        return []
+
+    # "UID n:*" also matches the newest message when there is no UID >= n
+    email_uids = [uid for uid in (messages[0] or b"").split() if not min_uid or int(uid) >= min_uid]
+    _LOGGER.debug("Found %d emails to process in folder '%s'.", len(email_uids), folder)
+    return email_uids[::-1]
+
+
+async def build_tracking_info(
+    hass,
+    parsed,
+    carrier=None,
+    validators=None,
+    email_parsing=None,
+    api_required=False,
+    api_template=None,
+    api_key=None,
+    api_url=None,
+    metrics=None,
+):
+    """Return the tracking info of every tracking number found in a parsed message (see parse_message)."""
+    metrics = metrics if metrics is not None else RefreshMetrics()
+    email_body = parsed["body"]
+    found = parsed["found"]
+    tracking_numbers = []
+
+    for item in found:
+        tracking_number = item["tracking_number"]
+
+        # Default tracking info structure
+        tracking_info = {
+            "tracking_number": tracking_number,
+            "status_code": "unknown",
+            "eta": "N/A",
+            "service_url": "N/A",
+            "email_timestamp": parsed["timestamp"],
+        }
+        if carrier:
+            checksum_valid, _ = check_tracking_number(tracking_number, validators or [])
+            tracking_info["confidence"] = score_tracking_number(
+                tracking_number, carrier, parsed["sender"], checksum_valid
+            )
+
+        # Use email parsing rules if provided (evaluated on the positions found by parse_message)
+        scan = parsed.get("scan")
+        if email_parsing and scan is not None:
+            eta_string = email_parsing.get('eta_string')
+            eta_date_pattern = email_parsing.get('eta_date_pattern')
+            status_strings = email_parsing.get('status_strings', [])
+            # With several parcels in one mail, prefer the text around this parcel
+            bounds = (item["section_start"], item["section_end"]) if len(found) > 1 else (0, len(email_body))
+
+            if eta_string and eta_date_pattern:
+                with metrics.span("eta_parse"):
+                    raw_eta = scan.find_eta(*bounds)
+                    if raw_eta is None and len(found) > 1:
+                        raw_eta = scan.find_eta()
+                    if raw_eta:
+                        _LOGGER.debug("Extracted raw ETA: %s", raw_eta)
+                        eta = await hass.async_add_executor_job(normalize_date, raw_eta)
+                        if eta:
+                            tracking_info['eta'] = eta
+                        else:
+                            _LOGGER.warning("Failed to normalize ETA date: '%s'", raw_eta)
+                    else:
+                        _LOGGER.debug("No ETA found for tracking number %s.", tracking_number)
+
+            if status_strings:
+                status = scan.find_status(*bounds)
+                if not status and len(found) > 1:
+                    status = scan.find_status()
+                if status:
+                    tracking_info['status_code'] = status
+                else:
+                    _LOGGER.warning("Status not found using strings for tracking number %s.", tracking_number)
+
+        # The email's values were observed when the email was sent
+        stamp_sources(tracking_info, "email", parsed["timestamp"])
+
+        # Fetch additional tracking info via API if required
+        if api_required and not needs_api_lookup(tracking_info):
+            metrics.increment("api_lookups_skipped")
+        elif api_required:
+            with metrics.span("api"):
+                api_tracking_info = await fetch_tracking_info(
+                    tracking_number,
+                    api_key,
+                    api_url,
+                    api_template,
+                    carrier,
+                )
+            metrics.increment("api_calls")
+            # Unknown API values do not replace what the email said
+            merge_tracking_info(tracking_info, api_tracking_info, "api")
+
+        tracking_numbers.append(tracking_info)
+        _LOGGER.debug("Added tracking info: %s", tracking_info)
+
+    return tracking_numbers
+
 
 async def fetch_emails(
     hass,
@@ -167,134 +561,518 @@ async def fetch_emails(
     api_key=None,
     api_url=None,
     carrier=None,
+    raise_errors=False,
+    validators=None,
+    rejected=None,
+    metrics=None,
+    max_in_flight_bytes=DEFAULT_MAX_IN_FLIGHT_BYTES,
+    search_template=None,
+    uid_state=None,
+    unseen_only=False,
+    removed=None,
+    deadline=None,
+    sessions=None,
 ):
-    """Fetch emails from the IMAP server and look for tracking numbers and additional info."""
+    """Fetch emails from the IMAP server and look for tracking numbers and additional info.
+
+    ``email_folder`` may be a single folder, a comma-separated string or a list;
+    all folders are scanned read-only (EXAMINE) in one session.
+
+    With ``raise_errors`` set, IMAP and parsing errors are re-raised after logging
+    instead of returning the tracking numbers found so far. ``validators`` and
+    ``rejected`` are passed on to extract_tracking_number. Stage timings and the
+    bytes downloaded / messages skipped counters are recorded in ``metrics``.
+    Messages are streamed through iter_messages with at most
+    ``max_in_flight_bytes`` of raw mail buffered.
+
+    The search is compiled by search.compile_search_criteria from the carrier's
+    ``search_template`` when given. ``uid_state`` (a dict kept by the caller)
+    remembers the STATUS values, highest UID and the tracking numbers of each
+    mail seen per folder, so folders without changes are skipped and later
+    searches only cover messages that arrived since. With CONDSTORE/QRESYNC a
+    changed HIGHESTMODSEQ reveals flag changes and expunged mails; tracking
+    numbers whose mails were all deleted are appended to ``removed``. With
+    ``unseen_only``, older mails that were marked unread again are searched too.
+
+    Every IMAP call is bounded by the time left until ``deadline``. Once it
+    expires no further folders, searches or messages are started and the
+    tracking numbers found so far are returned; ``uid_state`` then only covers
+    the messages that were read, so the next refresh picks up the rest.
+
+    With ``sessions`` (an orchestrator.ImapSessionPool) an open session of the
+    account is reused instead of logging in, and the session is handed back
+    instead of logging out if no error occurred.
+    """
     tracking_numbers = []
+    metrics = metrics if metrics is not None else RefreshMetrics()
+    deadline = deadline if deadline is not None else Deadline()
+    session_key = account_key({"email": email_account, "host": imap_server, "port": imap_port})
+    mail = None
+    reusable = False
     try:
         async with lock:
-            # Run the blocking code in the executor
-            mail = await hass.async_add_executor_job(
-                get_imap_connection,
-                imap_server,
-                imap_port,
-                email_account,
-                email_password,
-            )
-
-            # Select the email folder
-            select_folder = functools.partial(mail.select, email_folder)
-            status, messages = await hass.async_add_executor_job(select_folder)
-
-            if status != "OK":
-                _LOGGER.error(f"Failed to select folder '{email_folder}'. Status: {status}")
+            if deadline.expired:
+                deadline.truncate("imap_connect")
                 return tracking_numbers
+            with metrics.span("imap_connect"):
+                mail = sessions.acquire(session_key) if sessions is not None else None
+                if mail is not None:
+                    set_imap_timeout(mail, deadline.timeout(IMAP_TIMEOUT))
+                    if not await hass.async_add_executor_job(session_alive, mail):
+                        await hass.async_add_executor_job(logout_quietly, mail)
+                        mail = None
+                if mail is None:
+                    # Run the blocking code in the executor
+                    mail = await hass.async_add_executor_job(
+                        get_imap_connection,
+                        imap_server,
+                        imap_port,
+                        email_account,
+                        email_password,
+                        deadline.timeout(IMAP_TIMEOUT),
+                    )
 
             # Calculate the SINCE date based on email_age
             date_cutoff = (datetime.now() - timedelta(days=email_age)).strftime("%d-%b-%Y")
-            search_criteria = search_criteria or 'ALL'
-            final_search_criteria = format_search_criteria(search_criteria, date_cutoff)
+            capabilities = get_capabilities(mail)
+            if CONDSTORE_CAPABILITY not in capabilities:
+                # Extensions are often only advertised after login
+                await hass.async_add_executor_job(refresh_capabilities, mail)
+                capabilities = get_capabilities(mail)
+            condstore = CONDSTORE_CAPABILITY in capabilities
+            qresync = condstore and await hass.async_add_executor_job(enable_qresync, mail)
+            vanished_numbers = set()
+            # Compile the parsing rules once per refresh (cached across refreshes)
+            plan = get_evaluation_plan(tracking_pattern, email_parsing)
 
-            _LOGGER.debug(f"Searching emails with criteria: {final_search_criteria}")
-            search_emails = functools.partial(mail.search, None, final_search_criteria)
-            status, messages = await hass.async_add_executor_job(search_emails)
+            for folder in parse_folders(email_folder):
+                if deadline.expired:
+                    deadline.truncate("imap_folders")
+                    break
+                set_imap_timeout(mail, deadline.timeout(IMAP_TIMEOUT))
+                folder_state = uid_state.get(folder, {}) if uid_state is not None else {}
 
-            if status != "OK" or not messages[0]:
-                _LOGGER.debug("No emails found with the given search criteria.")
-                return tracking_numbers
+                # Skip folders that did not change since the last scan (one STATUS round trip)
+                with metrics.span("imap_status"):
+                    folder_status = await hass.async_add_executor_job(get_folder_status, mail, folder, condstore)
+                if folder_unchanged(folder_state, folder_status):
+                    _LOGGER.debug("Folder '%s' is unchanged since the last scan, skipping.", folder)
+                    metrics.increment("folders_skipped")
+                    continue
 
-            email_numbers = messages[0].split()
-            _LOGGER.debug(f"Found {len(email_numbers)} emails to process.")
-            email_numbers = email_numbers[::-1]
+                with metrics.span("imap_select"):
+                    examine_folder = functools.partial(mail.select, quote_folder(folder), readonly=True)
+                    status, messages = await hass.async_add_executor_job(examine_folder)
+                uidvalidity = get_uidvalidity(mail) if status == "OK" else None
 
-            for num in email_numbers:
-                fetch_email = functools.partial(mail.fetch, num, "(BODY.PEEK[])")
-                status, data = await hass.async_add_executor_job(fetch_email)
                 if status != "OK":
-                    _LOGGER.warning(f"Failed to fetch email number {num.decode()}. Skipping.")
+                    _LOGGER.error("Failed to select folder '%s'. Status: %s", folder, status)
+                    if raise_errors:
+                        raise imaplib.IMAP4.error(f"Failed to select folder '{folder}'")
                     continue
 
-                msg = email.message_from_bytes(data[0][1])
-                email_body = extract_email_body(msg)
-                _LOGGER.debug(f"Email body extracted (first 500 chars): {email_body[:500]}...")
+                same_uids = uidvalidity is not None and folder_state.get("uidvalidity") == uidvalidity
+                # UID -> tracking numbers of the mails that contained parcels
+                known_uids = dict(folder_state.get("uids", {})) if same_uids else {}
 
-                tracking_number = extract_tracking_number(
-                    email_body, tracking_pattern, processed_tracking_numbers
-                )
+                # Learn which known mails changed flags or were deleted since the last scan
+                changed = set()
+                if same_uids and (known_uids or folder_state.get("highestmodseq")):
+                    with metrics.span("imap_changes"):
+                        changed, vanished = await hass.async_add_executor_job(
+                            get_folder_changes, mail, folder_state, condstore, qresync, unseen_only
+                        )
+                    metrics.increment("flags_changed", len(changed))
+                    metrics.increment("messages_vanished", len(vanished))
+                    for uid in vanished:
+                        vanished_numbers.update(known_uids.pop(uid, ()))
 
-                if tracking_number:
-                    # Default tracking info structure
-                    tracking_info = {
-                        "tracking_number": tracking_number,
-                        "status_code": "unknown",
-                        "eta": "N/A",
-                        "service_url": "N/A",
-                    }
+                email_uids = []
+                search_from = None  # First UID covered by the search for new mail
+                if same_uids and folder_status and folder_status.get("uidnext") == folder_state.get("uidnext"):
+                    # Nothing arrived, only flags changed or messages were expunged
+                    metrics.increment("searches_skipped")
+                else:
+                    # Only look at messages newer than the last refresh while the UIDs stay valid
+                    min_uid = folder_state.get("last_uid", 0) + 1 if same_uids else None
+                    search_from = min_uid or 1
+                    final_search_criteria = compile_search_criteria(
+                        search_criteria, date_cutoff, capabilities, search_template, min_uid, unseen_only
+                    )
+                    set_imap_timeout(mail, deadline.timeout(IMAP_TIMEOUT))
+                    email_uids = await search_new_uids(hass, mail, folder, final_search_criteria, min_uid, metrics)
+                # Older mails marked unread again are not covered by that search: search them by UID
+                reread_uids = {
+                    uid for uid in changed if uid not in known_uids and (search_from is None or uid < search_from)
+                } if unseen_only else set()
+                if reread_uids:
+                    reread_search_criteria = compile_search_criteria(
+                        search_criteria, date_cutoff, capabilities, search_template,
+                        unseen_only=True, uid_set=format_uid_set(reread_uids),
+                    )
+                    set_imap_timeout(mail, deadline.timeout(IMAP_TIMEOUT))
+                    # Older than the new mail, so the UIDs stay newest first
+                    email_uids += await search_new_uids(hass, mail, folder, reread_search_criteria, metrics=metrics)
 
-                    # Use email parsing rules if provided
-                    if email_parsing:
-                        eta_string = email_parsing.get('eta_string')
-                        eta_date_pattern = email_parsing.get('eta_date_pattern')
-                        status_strings = email_parsing.get('status_strings', [])
-
-                        if eta_string and eta_date_pattern:
-                            # Call the updated async extract_eta_from_email
-                            eta = await extract_eta_from_email(hass, email_body, eta_string, eta_date_pattern)
-                            if eta:
-                                tracking_info['eta'] = eta
-                            else:
-                                _LOGGER.warning(f"ETA not found using patterns for tracking number {tracking_number}.")
-
-                        if status_strings:
-                            status = extract_status_from_email(email_body, status_strings)
-                            if status:
-                                tracking_info['status_code'] = status
-                            else:
-                                _LOGGER.warning(f"Status not found using strings for tracking number {tracking_number}.")
-
-                    # Fetch additional tracking info via API if required
-                    if api_required:
-                        api_tracking_info = await fetch_tracking_info(
-                            tracking_number,
-                            api_key,
-                            api_url,
-                            api_template,
-                            carrier,
+                if email_uids:
+                    pipeline = iter_messages(
+                        hass, mail, email_uids, tracking_pattern, processed_tracking_numbers,
+                        validators, rejected, metrics, max_in_flight_bytes, plan, deadline,
+                    )
+                    # Close the pipeline (and stop its fetches) before logging out, also on errors
+                    async with contextlib.aclosing(pipeline):
+                        async for parsed in pipeline:
+                            # Also record numbers found in an earlier mail, so deleting one of them keeps the parcel
+                            known_uids[parsed["uid"]] = parsed["numbers"]
+                            if parsed["found"]:
+                                tracking_numbers.extend(await build_tracking_info(
+                                    hass, parsed, carrier, validators, email_parsing,
+                                    api_required, api_template, api_key, api_url, metrics,
+                                ))
+                            # Drop the text of this mail before the next one is parsed
+                            parsed = None
+
+                if uid_state is not None and uidvalidity is not None and "message_fetch" in deadline.truncated:
+                    # Not every message may have been read: keep the mails seen, but not the new UID range
+                    uid_state[folder] = {
+                        "uidvalidity": uidvalidity,
+                        "last_uid": folder_state.get("last_uid", 0) if same_uids else 0,
+                        "uids": known_uids,
+                    }
+                elif uid_state is not None and uidvalidity is not None:
+                    last_uid = max([int(uid) for uid in email_uids], default=0)
+                    if same_uids:
+                        last_uid = max(last_uid, folder_state.get("last_uid", 0))
+                    uid_state[folder] = {"uidvalidity": uidvalidity, "last_uid": last_uid, "uids": known_uids}
+                    if folder_status and folder_status.get("uidvalidity") == uidvalidity:
+                        uid_state[folder].update(
+                            (item, folder_status[item]) for item in ("uidnext", "messages", "highestmodseq")
+                            if item in folder_status
                         )
-                        tracking_info.update(api_tracking_info)
 
-                    tracking_numbers.append(tracking_info)
-                    _LOGGER.debug(f"Added tracking info: {tracking_info}")
+            # Parcels whose mails were all deleted; a number may also be in another (remaining) mail
+            if vanished_numbers and removed is not None:
+                remaining = {tracking["tracking_number"] for tracking in tracking_numbers}
+                for state in (uid_state or {}).values():
+                    for numbers in state.get("uids", {}).values():
+                        remaining.update(numbers)
+                removed.extend(sorted(vanished_numbers - remaining))
 
-            _LOGGER.debug(
-                f"Processed {len(email_numbers)} emails. Found tracking numbers: {tracking_numbers}"
-            )
+            _LOGGER.debug("Found %d tracking numbers in %s.", len(tracking_numbers), email_account)
+            reusable = not deadline.expired
 
     except imaplib.IMAP4.error as e:
         _LOGGER.error(f"IMAP connection error: {e}")
+        if raise_errors:
+            raise
     except Exception as e:
-        _LOGGER.error(f"Error fetching emails: {e}")
+        if deadline.expired:
+            # A call ran into the socket timeout set from the deadline: return what was found so far
+            _LOGGER.warning("Refresh deadline reached while reading %s: %s", email_account, e)
+            deadline.truncate("imap")
+        else:
+            _LOGGER.error("Error fetching emails: %s", e)
+            if raise_errors:
+                raise
+    finally:
+        if mail is not None:
+            set_imap_timeout(mail, deadline.timeout(IMAP_TIMEOUT))
+            if not (reusable and sessions is not None and sessions.release(session_key, mail)):
+                await hass.async_add_executor_job(logout_quietly, mail)
 
     return tracking_numbers
 
-async def fetch_tracking_info(tracking_number, api_key, api_url, api_template, carrier):
-    """Fetch tracking information using the selected API template."""
+
+def read_local_messages(source, refs, tracking_pattern, processed_tracking_numbers, validators=None, rejected=None,
+                        plan=None, search_template=None):
+    """
+    Read and parse a batch of messages of a local mail source in one executor job.
+
+    Returns:
+        list: A ``(ref, size, parsed)`` tuple per message (see parse_message);
+        ``parsed`` is None if the message has no tracking number or its
+        headers do not match ``search_template``, ``size`` is None if the file
+        disappeared since the scan (e.g. it was moved from new/ to cur/).
+    """
+    results = []
+    for ref in refs:
+        try:
+            raw_message = source.read(ref, search_template)
+        except FileNotFoundError:
+            results.append((ref, None, None))
+            continue
+        if raw_message is None:
+            results.append((ref, 0, None))
+            continue
+        parsed = parse_message(raw_message, tracking_pattern, processed_tracking_numbers, validators, rejected, plan)
+        results.append((ref, len(raw_message), parsed if parsed["numbers"] else None))
+    return results
+
+
+def _local_batches(refs, max_bytes):
+    """Split message references into batches of at most ``max_bytes`` (an oversized message forms its own batch)."""
+    batch, batch_bytes = [], 0
+    for ref in refs:
+        if batch and batch_bytes + ref["size"] > max_bytes:
+            yield batch
+            batch, batch_bytes = [], 0
+        batch.append(ref)
+        batch_bytes += ref["size"]
+    if batch:
+        yield batch
+
+
+async def fetch_local_emails(
+    hass,
+    source,
+    tracking_pattern,
+    processed_tracking_numbers,
+    email_parsing=None,
+    email_age=10,
+    carrier=None,
+    raise_errors=False,
+    validators=None,
+    rejected=None,
+    metrics=None,
+    max_in_flight_bytes=DEFAULT_MAX_IN_FLIGHT_BYTES,
+    search_template=None,
+    source_state=None,
+    removed=None,
+    deadline=None,
+):
+    """Read the mail of a local Maildir, mbox file or .eml directory and look for tracking numbers.
+
+    The counterpart of fetch_emails for a mail_sources.LocalMailSource. The
+    messages that ``source_state`` (a dict kept by the caller) does not list
+    as processed are read and parsed in batches of up to
+    ``max_in_flight_bytes`` per executor job, and go through the same
+    parse_message and build_tracking_info steps as mail read over IMAP. The
+    headers of each message are matched against ``search_template`` before it
+    is parsed; mail older than ``email_age`` days is skipped. Tracking numbers
+    whose messages were all deleted are appended to ``removed``.
+
+    No further batch is started once ``deadline`` has expired; the messages
+    left unread are picked up by the next refresh.
+    """
+    tracking_numbers = []
+    metrics = metrics if metrics is not None else RefreshMetrics()
+    deadline = deadline if deadline is not None else Deadline()
+    state = source_state if source_state is not None else {}
+    since = (datetime.now() - timedelta(days=email_age)).timestamp()
+    try:
+        with metrics.span("local_scan"):
+            refs, vanished_numbers = await hass.async_add_executor_job(source.scan, state, since)
+        _LOGGER.debug("Found %d new messages in %s.", len(refs), source.path)
+        plan = get_evaluation_plan(tracking_pattern, email_parsing)
+
+        complete = True
+        for batch in _local_batches(refs, max_in_flight_bytes):
+            if deadline.expired:
+                deadline.truncate("local_read")
+                complete = False
+                break
+            with metrics.span("local_read"):
+                results = await hass.async_add_executor_job(
+                    read_local_messages, source, batch, tracking_pattern, processed_tracking_numbers,
+                    validators, rejected, plan, search_template,
+                )
+            for ref, size, parsed in results:
+                if size is None:
+                    # Moved since the scan; the next scan finds it under its new name
+                    complete = False
+                    continue
+                metrics.increment("local_messages_read")
+                metrics.increment("local_bytes_read", size)
+                # Numbers found in an earlier message are recorded too, so deleting one of them keeps the parcel
+                numbers = parsed["numbers"] if parsed is not None and parsed["timestamp"] >= since else []
+                if numbers and parsed["found"]:
+                    tracking_numbers.extend(await build_tracking_info(
+                        hass, parsed, carrier, validators, email_parsing, metrics=metrics,
+                    ))
+                else:
+                    metrics.increment("messages_skipped")
+                source.mark_processed(state, ref, numbers)
+            results = None
+        if complete:
+            source.mark_complete(state)
+
+        # Parcels whose mails were all deleted; a number may also be in another (remaining) mail
+        if vanished_numbers and removed is not None:
+            remaining = {tracking["tracking_number"] for tracking in tracking_numbers}
+            for record in state.get("files", {}).values():
+                remaining.update(record["numbers"])
+            removed.extend(sorted(vanished_numbers - remaining))
+
+        _LOGGER.debug("Found %d tracking numbers in %s.", len(tracking_numbers), source.path)
+
+    except OSError as e:
+        _LOGGER.error("Error reading local mail %s: %s", source.path, e)
+        if raise_errors:
+            raise
+
+    return tracking_numbers
+
+def read_jmap_messages(messages, tracking_pattern, processed_tracking_numbers, validators=None, rejected=None,
+                       plan=None):
+    """
+    Parse a page of messages fetched over JMAP in one executor job.
+
+    Returns:
+        list: A ``(message, parsed)`` tuple per message (see parse_body);
+        ``parsed`` is None if the message has no tracking number.
+    """
+    results = []
+    for message in messages:
+        email_body = html_to_text(message["body"]) if message["html"] else message["body"]
+        parsed = parse_body(
+            email_body, message["timestamp"] or datetime.now().timestamp(), message["sender"],
+            tracking_pattern, processed_tracking_numbers, validators, rejected, plan,
+        )
+        results.append((message, parsed if parsed["numbers"] else None))
+    return results
+
+
+async def fetch_jmap_emails(
+    hass,
+    source,
+    search_criteria,
+    tracking_pattern,
+    processed_tracking_numbers,
+    email_parsing=None,
+    email_age=10,
+    carrier=None,
+    raise_errors=False,
+    validators=None,
+    rejected=None,
+    metrics=None,
+    search_template=None,
+    source_state=None,
+    removed=None,
+    deadline=None,
+):
+    """Read the mail of a JMAP account and look for tracking numbers.
+
+    The counterpart of fetch_emails for a jmap.JmapMailSource. Each page of
+    messages returned by the source (one HTTP request, see
+    JmapMailSource.iter_changes) is parsed in one executor job and goes
+    through the same build_tracking_info step as mail read over IMAP.
+    ``source_state`` (a dict kept by the caller) holds the JMAP state string,
+    so only the first refresh queries the whole ``email_age`` window. Tracking
+    numbers whose messages were all deleted are appended to ``removed``.
+
+    No further page is requested once ``deadline`` has expired; the state then
+    points at the last page read, and the next refresh continues from there.
+    """
+    tracking_numbers = []
+    metrics = metrics if metrics is not None else RefreshMetrics()
+    deadline = deadline if deadline is not None else Deadline()
+    state = source_state if source_state is not None else {}
+    since = (datetime.now() - timedelta(days=email_age)).timestamp()
+    vanished_numbers = set()
+    try:
+        if deadline.expired:
+            deadline.truncate("jmap")
+            return tracking_numbers
+        plan = get_evaluation_plan(tracking_pattern, email_parsing)
+        pipeline = source.iter_changes(state, since, search_template, search_criteria, deadline, metrics)
+        async with contextlib.aclosing(pipeline):
+            async for messages, vanished in pipeline:
+                vanished_numbers.update(vanished)
+                metrics.increment("jmap_messages_read", len(messages))
+                metrics.increment("jmap_body_bytes", sum(len(message["body"]) for message in messages))
+                with metrics.span("jmap_parse"):
+                    results = await hass.async_add_executor_job(
+                        read_jmap_messages, messages, tracking_pattern, processed_tracking_numbers,
+                        validators, rejected, plan,
+                    )
+                for message, parsed in results:
+                    # Numbers found in an earlier message are recorded too, so deleting one of them keeps the parcel
+                    numbers = parsed["numbers"] if parsed is not None and parsed["timestamp"] >= since else []
+                    if numbers and parsed["found"]:
+                        tracking_numbers.extend(await build_tracking_info(
+                            hass, parsed, carrier, validators, email_parsing, metrics=metrics,
+                        ))
+                    else:
+                        metrics.increment("messages_skipped")
+                    source.mark_processed(state, message, numbers)
+                messages = results = None
+                if deadline.expired:
+                    deadline.truncate("jmap")
+                    break
+
+        # Parcels whose mails were all deleted; a number may also be in another (remaining) mail
+        if vanished_numbers and removed is not None:
+            remaining = {tracking["tracking_number"] for tracking in tracking_numbers}
+            for numbers in state.get("emails", {}).values():
+                remaining.update(numbers)
+            removed.extend(sorted(vanished_numbers - remaining))
+
+        _LOGGER.debug("Found %d tracking numbers in %s.", len(tracking_numbers), source.session_url)
+
+    except (JmapError, aiohttp.ClientError) as e:
+        _LOGGER.error("JMAP error reading %s: %s", source.session_url, e)
+        if raise_errors:
+            raise
+    except asyncio.TimeoutError as e:
+        if deadline.expired:
+            # The request ran into the timeout set from the deadline: return what was found so far
+            _LOGGER.warning("Refresh deadline reached while reading %s: %s", source.session_url, e)
+            deadline.truncate("jmap")
+        else:
+            _LOGGER.error("Timeout reading %s", source.session_url)
+            if raise_errors:
+                raise
+
+    return tracking_numbers
+
+def get_carrier_api(api_key, api_url, api_template, carrier, session=None, metrics=None, breakers=None,
+                    failure_threshold=DEFAULT_FAILURE_THRESHOLD, probe_interval=DEFAULT_PROBE_INTERVAL, deadline=None):
+    """
+    Return the carrier API instance selected by the API template, or None.
+
+    With ``breakers`` (a CircuitBreakerRegistry) the instance gets the circuit
+    breaker of its endpoint, using the given thresholds.
+    """
     if not api_template:
         # For backward compatibility, use the carrier name as the API template
         api_template = carrier.lower()
 
     if api_template == 'no_api':
         _LOGGER.debug("No API template selected. Skipping API call.")
-        return {"status_code": "unknown", "service_url": "unknown", "eta": "N/A"}
+        return None
 
     # Get the appropriate API class based on the api_template
     api_class = CARRIER_API_CLASSES.get(api_template.lower())
     if not api_class:
         _LOGGER.error(f"No API implementation found for template '{api_template}'.")
-        return {"status_code": "unknown", "service_url": "unknown", "eta": "N/A"}
+        return None
+    carrier_api = api_class(api_key, api_url, session, metrics, deadline=deadline)
+    if breakers is not None:
+        carrier_api.breaker = breakers.get(carrier_api.base_url, api_key, failure_threshold, probe_interval)
+    return carrier_api
+
+
+async def fetch_tracking_info(tracking_number, api_key, api_url, api_template, carrier, session=None):
+    """Fetch tracking information using the selected API template."""
+    carrier_api = get_carrier_api(api_key, api_url, api_template, carrier, session)
+    if carrier_api is None:
+        return tracking_result()
+    return await carrier_api.fetch_tracking_info(tracking_number) or tracking_result()
+
 
-    # Instantiate the API class
-    carrier_api = api_class(api_key, api_url)
+async def fetch_tracking_infos(tracking_numbers, api_key, api_url, api_template, carrier, session=None, metrics=None,
+                               breakers=None, failure_threshold=DEFAULT_FAILURE_THRESHOLD,
+                               probe_interval=DEFAULT_PROBE_INTERVAL, deadline=None):
+    """
+    Fetch tracking information for several tracking numbers in as few requests as the API allows.
 
-    # Call the fetch_tracking_info method
-    tracking_info = await carrier_api.fetch_tracking_info(tracking_number)
-    return tracking_info
\ No newline at end of file
+    Returns:
+        dict: The tracking info per tracking number the API answered for.
+    """
+    carrier_api = get_carrier_api(
+        api_key, api_url, api_template, carrier, session, metrics, breakers, failure_threshold, probe_interval,
+        deadline,
+    )
+    if carrier_api is None:
+        return {}
+    return await carrier_api.fetch_tracking_infos(tracking_numbers)
@@ -0,0 +1,175 @@
+# custom_components/parcel_tracking_info/profiling.py
+
+import cProfile
+import io
+import logging
+import pstats
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+# Number of functions and allocation sites listed in a profile report
+DEFAULT_TOP_ENTRIES = 30
+# Number of stack frames stored per traced allocation
+TRACEMALLOC_FRAMES = 5
+
+
+class ProfiledHass:
+    """Proxy of the HomeAssistant instance that profiles the executor jobs it starts."""
+
+    def __init__(self, hass, profiler):
+        self._hass = hass
+        self._profiler = profiler
+
+    def __getattr__(self, name):
+        return getattr(self._hass, name)
+
+    async def async_add_executor_job(self, target, *args):
+        return await self._hass.async_add_executor_job(self._profiler.wrap(target), *args)
+
+
+class RefreshProfiler:
+    """Collect a CPU profile and the top allocations of one coordinator refresh.
+
+    The event loop thread is profiled while the refresh runs (this includes
+    whatever else the loop does in the meantime); executor jobs started through
+    ``hass`` are profiled in their worker thread and merged into the same report.
+    Memory is traced with tracemalloc for all threads.
+    """
+
+    def __init__(self, hass, top=DEFAULT_TOP_ENTRIES):
+        """Initialize the profiler."""
+        self.hass = ProfiledHass(hass, self)
+        self.top = top
+        self._loop_profile = cProfile.Profile()
+        self._thread_profiles = []
+        self._thread_lock = threading.Lock()
+        self._started_tracemalloc = False
+        self._snapshot = None
+        self.peak_memory = None
+        self.duration = None
+        self._start = None
+
+    def wrap(self, target):
+        """Return ``target`` wrapped to be profiled in the executor thread running it."""
+
+        def profiled(*args):
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                # Python 3.12+ allows one active profiler per interpreter, which already sees this thread
+                return target(*args)
+            try:
+                return target(*args)
+            finally:
+                profile.disable()
+                with self._thread_lock:
+                    self._thread_profiles.append(profile)
+
+        return profiled
+
+    def start(self):
+        """Start profiling and tracing allocations."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+            self._started_tracemalloc = True
+        tracemalloc.reset_peak()
+        self._start = time.perf_counter()
+        self._loop_profile.enable()
+
+    def stop(self):
+        """Stop profiling the event loop thread, which has to happen in that thread."""
+        self._loop_profile.disable()
+        self.duration = time.perf_counter() - self._start
+        _, self.peak_memory = tracemalloc.get_traced_memory()
+
+    def take_snapshot(self):
+        """Take the allocation snapshot and stop tracing allocations.
+
+        Walking every traced block is slow with a large heap, run this in the executor.
+        """
+        try:
+            self._snapshot = tracemalloc.take_snapshot().filter_traces(
+                [tracemalloc.Filter(False, tracemalloc.__file__)]
+            )
+        finally:
+            if self._started_tracemalloc:
+                tracemalloc.stop()
+
+    def report(self, title, metrics=None):
+        """Return the profile report as text; sorting the stats is slow, run this in the executor."""
+        output = io.StringIO()
+        output.write(f"{title}\n")
+        output.write(f"Created: {datetime.now().isoformat(timespec='seconds')}\n")
+        output.write(f"Refresh duration: {self.duration:.3f} s\n")
+        output.write(f"Peak traced memory: {self.peak_memory / 1024 / 1024:.1f} MiB\n")
+        output.write(f"Profiled executor jobs: {len(self._thread_profiles)}\n")
+        if metrics:
+            output.write(f"Stage totals (ms): {metrics.get('stages_ms', {})}\n")
+            output.write(f"Counters: {metrics.get('counters', {})}\n")
+
+        stats = pstats.Stats(self._loop_profile, stream=output)
+        for profile in self._thread_profiles:
+            stats.add(profile)
+        stats.strip_dirs()
+        for sort_key in ("cumulative", "tottime"):
+            output.write(f"\n=== CPU profile, top {self.top} by {sort_key} ===\n")
+            stats.sort_stats(sort_key).print_stats(self.top)
+
+        output.write(f"\n=== Top {self.top} allocation sites (live at the end of the refresh) ===\n")
+        for statistic in self._snapshot.statistics("traceback")[:self.top]:
+            output.write(f"{statistic.size / 1024:.1f} KiB in {statistic.count} blocks\n")
+            for line in statistic.traceback.format():
+                output.write(f"    {line}\n")
+        return output.getvalue()
+
+
+def write_report(path, report):
+    """Write a profile report to disk."""
+    with open(path, "w", encoding="utf-8") as report_file:
+        report_file.write(report)
+
+
+async def async_profile_refresh(hass, coordinator, path, top=DEFAULT_TOP_ENTRIES):
+    """Run one refresh of the coordinator under the profiler and write the report to ``path``.
+
+    The refresh is requested from the domain orchestrator, so it joins a queued
+    refresh of the same mail account or waits for a running one instead of
+    sharing its IMAP session and parcel state concurrently. The event loop is
+    profiled from the request on, including that wait.
+    """
+    profiler = RefreshProfiler(hass, top)
+    coordinator.profiler = profiler
+    error = None
+    profiler.start()
+    try:
+        orchestrator = hass.data.get(DOMAIN, {}).get("orchestrator")
+        if orchestrator is None:
+            data = await coordinator.async_refresh_tracking_data()
+        else:
+            data = await orchestrator.async_refresh(coordinator.mailbox_key, coordinator)
+    except Exception as e:
+        # A failing refresh is profiled as well, then the error is passed on
+        error = e
+    finally:
+        profiler.stop()
+        coordinator.profiler = None
+        await hass.async_add_executor_job(profiler.take_snapshot)
+
+    title = f"Parcel Tracking Info refresh profile - {coordinator.entry.title}"
+    if error is not None:
+        title = f"{title}\nRefresh failed: {error}"
+    report = await hass.async_add_executor_job(profiler.report, title, coordinator.metrics.last_refresh)
+    await hass.async_add_executor_job(write_report, path, report)
+    _LOGGER.info("Wrote refresh profile of %s to %s", coordinator.entry.title, path)
+
+    if error is not None:
+        raise error
+    coordinator.async_set_updated_data(data)
+    return path
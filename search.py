@@ -0,0 +1,179 @@
+# custom_components/parcel_tracking_info/search.py
+
+import logging
+import re
+
+_LOGGER = logging.getLogger(__name__)
+
+# Capability advertised by Gmail for its IMAP extensions (X-GM-RAW, X-GM-MSGID, ...)
+GMAIL_CAPABILITY = "X-GM-EXT-1"
+# A FROM or SUBJECT key of IMAP search criteria, with a quoted or atom value
+IMAP_TEXT_KEY = re.compile(r'\b(FROM|SUBJECT)\s+("(?:[^"\\]|\\.)*"|[^\s()"]+)', re.IGNORECASE)
+# Search keys whose terms cannot simply be AND'ed
+IMAP_COMBINING_KEY = re.compile(r'\b(OR|NOT)\b', re.IGNORECASE)
+
+
+def get_capabilities(mail):
+    """Return the upper-cased CAPABILITY list of an IMAP connection."""
+    return {str(capability).upper() for capability in getattr(mail, "capabilities", ())}
+
+
+def quote(value):
+    """Return a value as an IMAP quoted string."""
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def _any_of(keys):
+    """Combine search keys with OR (which takes exactly two keys in IMAP)."""
+    criteria = keys[-1]
+    for key in reversed(keys[:-1]):
+        criteria = f"OR {key} {criteria}"
+    return f"({criteria})" if len(keys) > 1 else criteria
+
+
+def _ascii_terms(terms, kind):
+    """Drop terms that need CHARSET UTF-8, which not every server supports."""
+    usable = [term for term in terms or [] if term and term.isascii()]
+    if len(usable) != len(terms or []):
+        _LOGGER.debug("Ignoring non-ASCII %s in the search criteria.", kind)
+    return usable
+
+
+def format_search_criteria(search_criteria, date_cutoff):
+    """Format the search criteria by adding the date cutoff."""
+    # Ensure the criteria is enclosed in parentheses
+    if not (search_criteria.startswith('(') and search_criteria.endswith(')')):
+        search_criteria = f'({search_criteria})'
+    # Check if SINCE is already included
+    if 'SINCE' in search_criteria.upper():
+        # Assume user is handling date filtering
+        return search_criteria
+    else:
+        # Append the SINCE date
+        return f'{search_criteria} SINCE {date_cutoff}'
+
+
+def compile_search_criteria(search_criteria, date_cutoff, capabilities=(), search_template=None,
+                            min_uid=None, unseen_only=False, uid_set=None):
+    """
+    Build the SEARCH criteria of a refresh.
+
+    With a ``search_template`` (the ``sender_domains``, ``subject_keywords`` and
+    ``subject_exclude`` of a carrier template), the sender domains and subject
+    keywords are OR'ed into a narrow server-side search, using Gmail's X-GM-RAW
+    search when the server advertises X-GM-EXT-1. Without one, the configured
+    ``search_criteria`` are used as before.
+
+    Args:
+        search_criteria (str): The configured criteria, used without a template.
+        date_cutoff (str): The SINCE date (DD-Mon-YYYY).
+        capabilities (Iterable[str]): The server's CAPABILITY list.
+        search_template (Optional[dict]): The search fields of the carrier template.
+        min_uid (Optional[int]): Only search messages with this UID or higher.
+        unseen_only (bool): Only search unread messages.
+        uid_set (Optional[str]): Only search the messages of this UID set (e.g. ``1:99`` or ``4,7:9``).
+
+    Returns:
+        str: The SEARCH criteria.
+    """
+    template = search_template or {}
+    domains = _ascii_terms(template.get("sender_domains"), "sender domains")
+    keywords = _ascii_terms(template.get("subject_keywords"), "subject keywords")
+    excluded = _ascii_terms(template.get("subject_exclude"), "excluded subject keywords")
+
+    if domains and GMAIL_CAPABILITY in set(capabilities):
+        query = f"from:({' OR '.join(domains)})"
+        if keywords:
+            query += f" subject:({' OR '.join(keywords)})"
+        if excluded:
+            query += f" -subject:({' OR '.join(excluded)})"
+        parts = [f"X-GM-RAW {quote(query)}", f"SINCE {date_cutoff}"]
+    elif domains:
+        parts = [_any_of([f"FROM {quote(domain)}" for domain in domains])]
+        if keywords:
+            parts.append(_any_of([f"SUBJECT {quote(keyword)}" for keyword in keywords]))
+        parts.extend(f"NOT SUBJECT {quote(keyword)}" for keyword in excluded)
+        parts.append(f"SINCE {date_cutoff}")
+    else:
+        parts = [format_search_criteria(search_criteria or 'ALL', date_cutoff)]
+
+    if min_uid:
+        parts.append(f"UID {min_uid}:*")
+    if uid_set:
+        parts.append(f"UID {uid_set}")
+    if unseen_only:
+        parts.append("UNSEEN")
+    return " ".join(parts)
+
+
+def matches_search_template(sender, subject, search_template):
+    """
+    Return True if a message matches a carrier's ``search_template`` (see compile_search_criteria).
+
+    The client-side counterpart of the server-side search, for mail that is
+    not read over IMAP. Like IMAP SEARCH, terms match case-insensitive
+    substrings of the From and Subject headers.
+    """
+    if not search_template:
+        return True
+    sender = (sender or "").lower()
+    subject = (subject or "").lower()
+    domains = [domain.lower() for domain in search_template.get("sender_domains") or [] if domain]
+    keywords = [keyword.lower() for keyword in search_template.get("subject_keywords") or [] if keyword]
+    excluded = [keyword.lower() for keyword in search_template.get("subject_exclude") or [] if keyword]
+    if domains and not any(domain in sender for domain in domains):
+        return False
+    if keywords and not any(keyword in subject for keyword in keywords):
+        return False
+    return not any(keyword in subject for keyword in excluded)
+
+
+def _any_condition(conditions):
+    """Combine JMAP filter conditions with OR."""
+    return conditions[0] if len(conditions) == 1 else {"operator": "OR", "conditions": conditions}
+
+
+def compile_jmap_filter(search_template=None, search_criteria=None, mailbox_ids=None, after=None):
+    """
+    Build the Email/query filter of a JMAP refresh (RFC 8621, section 4.4.1).
+
+    The JMAP counterpart of compile_search_criteria: the sender domains and
+    subject keywords of a carrier's ``search_template`` become OR'ed ``from``
+    and ``subject`` conditions. Without one, the FROM and SUBJECT keys of the
+    configured IMAP ``search_criteria`` are AND'ed; criteria using OR or NOT
+    are not translated and only the mailboxes and date narrow the query.
+
+    Args:
+        search_template (Optional[dict]): The search fields of the carrier template.
+        search_criteria (Optional[str]): The configured IMAP criteria, used without a template.
+        mailbox_ids (Optional[list]): Only match mail in one of these mailboxes.
+        after (Optional[str]): Only match mail received after this UTCDate.
+
+    Returns:
+        dict: A FilterOperator, or an empty dict to match all mail.
+    """
+    template = search_template or {}
+    domains = [domain for domain in template.get("sender_domains") or [] if domain]
+    keywords = [keyword for keyword in template.get("subject_keywords") or [] if keyword]
+    excluded = [keyword for keyword in template.get("subject_exclude") or [] if keyword]
+
+    conditions = []
+    if mailbox_ids:
+        conditions.append(_any_condition([{"inMailbox": mailbox_id} for mailbox_id in mailbox_ids]))
+    if after:
+        conditions.append({"after": after})
+    if domains:
+        conditions.append(_any_condition([{"from": domain} for domain in domains]))
+        if keywords:
+            conditions.append(_any_condition([{"subject": keyword} for keyword in keywords]))
+        if excluded:
+            conditions.append({"operator": "NOT", "conditions": [{"subject": keyword} for keyword in excluded]})
+    elif search_criteria and not IMAP_COMBINING_KEY.search(search_criteria):
+        for key, value in IMAP_TEXT_KEY.findall(search_criteria):
+            if value.startswith('"'):
+                value = re.sub(r'\\(.)', r'\1', value[1:-1])
+            conditions.append({key.lower(): value})
+
+    if not conditions:
+        return {}
+    return {"operator": "AND", "conditions": conditions}
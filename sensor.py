@@ -2,13 +2,16 @@
 
 import logging
 from urllib.parse import urlparse, urlunparse, urlencode, parse_qs
-from homeassistant.components.sensor import SensorEntity
+from homeassistant.components.sensor import SensorEntity, SensorStateClass
 from homeassistant.components.binary_sensor import BinarySensorEntity
+from homeassistant.const import EntityCategory, UnitOfInformation, UnitOfTime
+from homeassistant.core import callback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.device_registry import DeviceEntryType
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_registry import async_get
+from homeassistant.util import dt as dt_util
 from .const import DOMAIN
 
 _LOGGER = logging.getLogger(__name__)
@@ -47,21 +50,28 @@ async def async_setup_entry(hass, entry, async_add_entities: AddEntitiesCallback
     # Update the coordinator's active_indices
     coordinator.active_indices = new_indices
 
-    # Create new sensors
-    sensors = []
-    boolean_sensors = []
-    for index, tracking in enumerate(coordinator.tracking_data):
-        display_name = display_names.get(carrier, carrier.capitalize())
-        tracking_link_url = tracking_link_urls.get(carrier, '')
-
-        # Create tracking sensors using index instead of tracking_number
-        sensors.append(TrackingNumberSensor(coordinator, index, carrier, display_name, tracking_link_url))
-        sensors.append(TrackingStatusSensor(coordinator, index, carrier, display_name, tracking_link_url))
-        sensors.append(TrackingLinkSensor(coordinator, index, carrier, display_name, tracking_link_url))
-        sensors.append(TrackingETASensor(coordinator, index, carrier, display_name, tracking_link_url))
+    display_name = display_names.get(carrier, carrier.capitalize())
+    tracking_link_url = tracking_link_urls.get(carrier, '')
+    created_indices = set()
+
+    def create_sensors(indices):
+        """Create the sensors for the given tracking data indices."""
+        sensors = []
+        boolean_sensors = []
+        for index in indices:
+            # Create tracking sensors using index instead of tracking_number
+            sensors.append(TrackingNumberSensor(coordinator, index, carrier, display_name, tracking_link_url))
+            sensors.append(TrackingStatusSensor(coordinator, index, carrier, display_name, tracking_link_url))
+            sensors.append(TrackingLinkSensor(coordinator, index, carrier, display_name, tracking_link_url))
+            sensors.append(TrackingETASensor(coordinator, index, carrier, display_name, tracking_link_url))
+
+            # Create corresponding boolean sensor
+            boolean_sensors.append(TrackingActiveBooleanSensor(coordinator, index, carrier, display_name))
+        created_indices.update(indices)
+        return sensors, boolean_sensors
 
-        # Create corresponding boolean sensor
-        boolean_sensors.append(TrackingActiveBooleanSensor(coordinator, index, carrier, display_name))
+    # Create new sensors
+    sensors, boolean_sensors = create_sensors(range(len(coordinator.tracking_data)))
 
     if sensors:
         async_add_entities(sensors)
@@ -73,6 +83,23 @@ async def async_setup_entry(hass, entry, async_add_entities: AddEntitiesCallback
     else:
         _LOGGER.warning("No boolean sensors to add. Check if tracking data is available.")
 
+    # Refresh metrics, disabled by default
+    async_add_entities(
+        RefreshMetricSensor(coordinator, carrier, display_name, metric_type) for metric_type in REFRESH_METRIC_SENSORS
+    )
+
+    @callback
+    def async_add_new_sensors():
+        """Add sensors for parcels found after setup, e.g. after a warm start."""
+        new_indices = [index for index in range(len(coordinator.data or [])) if index not in created_indices]
+        if not new_indices:
+            return
+        _LOGGER.debug("Adding sensors for new tracking data indices: %s", new_indices)
+        sensors, boolean_sensors = create_sensors(new_indices)
+        async_add_entities(sensors + boolean_sensors)
+
+    entry.async_on_unload(coordinator.async_add_listener(async_add_new_sensors))
+
 
 class BaseTrackingSensor(CoordinatorEntity, SensorEntity):
     """Base class for tracking sensors."""
@@ -111,6 +138,18 @@ class BaseTrackingSensor(CoordinatorEntity, SensorEntity):
         """Return the state of the sensor."""
         raise NotImplementedError("Must be implemented by subclasses.")
 
+    def _source_attributes(self, field):
+        """Return where the value of ``field`` came from ("email" or "api") and when it was observed."""
+        if not self.available:
+            return {}
+        source = self.coordinator.data[self.index].get("sources", {}).get(field)
+        if not source:
+            return {}
+        return {
+            "source": source["source"],
+            "observed_at": dt_util.utc_from_timestamp(source["observed_at"]).isoformat(),
+        }
+
 
 class TrackingNumberSensor(BaseTrackingSensor):
     """Sensor for tracking number."""
@@ -150,6 +189,11 @@ class TrackingStatusSensor(BaseTrackingSensor):
             return tracking.get("status_code", "unknown")
         return "unknown"
 
+    @property
+    def extra_state_attributes(self):
+        """Return the source of the status."""
+        return self._source_attributes("status_code")
+
     @property
     def icon(self):
         """Return the icon of the sensor."""
@@ -172,6 +216,11 @@ class TrackingETASensor(BaseTrackingSensor):
             return tracking.get("eta", "N/A")
         return "N/A"
 
+    @property
+    def extra_state_attributes(self):
+        """Return the source of the ETA."""
+        return self._source_attributes("eta")
+
     @property
     def icon(self):
         """Return the icon of the sensor."""
@@ -239,3 +288,53 @@ class TrackingActiveBooleanSensor(CoordinatorEntity, BinarySensorEntity):
     def device_class(self):
         """Return the device class of the boolean sensor."""
         return "connectivity"
+
+
+# metric_type -> (unit, icon, state class); the counters are cumulative since the integration was loaded
+REFRESH_METRIC_SENSORS = {
+    "last_refresh_duration": (UnitOfTime.MILLISECONDS, "mdi:timer-outline", SensorStateClass.MEASUREMENT),
+    "bytes_downloaded": (UnitOfInformation.BYTES, "mdi:download", SensorStateClass.TOTAL_INCREASING),
+    "messages_fetched": (None, "mdi:email-download-outline", SensorStateClass.TOTAL_INCREASING),
+    "messages_skipped": (None, "mdi:email-remove-outline", SensorStateClass.TOTAL_INCREASING),
+    "cache_hits": (None, "mdi:cached", SensorStateClass.TOTAL_INCREASING),
+    "api_calls": (None, "mdi:api", SensorStateClass.TOTAL_INCREASING),
+}
+
+
+class RefreshMetricSensor(CoordinatorEntity, SensorEntity):
+    """Diagnostic sensor exposing one of the coordinator's refresh metrics."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(self, coordinator, carrier, display_name, metric_type):
+        """Initialize the metric sensor."""
+        super().__init__(coordinator)
+        self.metric_type = metric_type
+        unit, icon, state_class = REFRESH_METRIC_SENSORS[metric_type]
+
+        self._attr_name = f"{display_name} {metric_type.replace('_', ' ').capitalize()}"
+        self._attr_unique_id = f"{coordinator.unique_id}_{carrier}_{metric_type}"
+        self._attr_native_unit_of_measurement = unit
+        self._attr_icon = icon
+        self._attr_state_class = state_class
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, coordinator.unique_id)},
+            name=f"{display_name} Tracking Info",
+            manufacturer=carrier.upper(),
+            entry_type=DeviceEntryType.SERVICE,
+        )
+
+    @property
+    def native_value(self):
+        """Return the current value of the metric."""
+        if self.metric_type == "last_refresh_duration":
+            return self.coordinator.metrics.last_refresh_duration_ms
+        return self.coordinator.metrics.get_counter(self.metric_type)
+
+    @property
+    def extra_state_attributes(self):
+        """Return the stage timings of the last refresh with the duration sensor."""
+        if self.metric_type != "last_refresh_duration":
+            return None
+        return {"stages_ms": self.coordinator.metrics.last_refresh.get("stages_ms", {})}
@@ -0,0 +1,145 @@
+# custom_components/parcel_tracking_info/services.py
+
+import logging
+
+import voluptuous as vol
+from homeassistant.core import SupportsResponse
+from homeassistant.exceptions import HomeAssistantError
+import homeassistant.helpers.config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .backfill import DEFAULT_BACKFILL_DAYS, DEFAULT_CHUNK_PAUSE, DEFAULT_CHUNK_SIZE
+from .const import DOMAIN
+from .coordinator import ParcelTrackingCoordinator
+from .profiling import DEFAULT_TOP_ENTRIES, async_profile_refresh
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_PROFILE_REFRESH = "profile_refresh"
+SERVICE_QUERY = "query"
+SERVICE_BACKFILL = "backfill"
+
+PROFILE_REFRESH_SCHEMA = vol.Schema(
+    {
+        vol.Optional("config_entry_id"): cv.string,
+        vol.Optional("top", default=DEFAULT_TOP_ENTRIES): vol.All(vol.Coerce(int), vol.Range(min=1, max=500)),
+    }
+)
+
+QUERY_SCHEMA = vol.Schema(
+    {
+        vol.Optional("status"): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional("carrier"): vol.All(cv.ensure_list, [vol.All(cv.string, vol.Lower)]),
+        vol.Optional("config_entry_id"): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional("eta_from"): cv.date,
+        vol.Optional("eta_to"): cv.date,
+        vol.Optional("unchanged_for"): cv.time_period,
+        vol.Optional("changed_since"): cv.datetime,
+        vol.Optional("limit"): vol.All(vol.Coerce(int), vol.Range(min=1)),
+    }
+)
+
+BACKFILL_SCHEMA = vol.Schema(
+    {
+        vol.Optional("config_entry_id"): cv.string,
+        vol.Optional("days", default=DEFAULT_BACKFILL_DAYS): vol.All(vol.Coerce(int), vol.Range(min=1, max=3650)),
+        vol.Optional("chunk_size", default=DEFAULT_CHUNK_SIZE): vol.All(vol.Coerce(int), vol.Range(min=1, max=1000)),
+        vol.Optional("pause", default=DEFAULT_CHUNK_PAUSE): vol.All(vol.Coerce(float), vol.Range(min=0, max=3600)),
+        vol.Optional("cancel", default=False): cv.boolean,
+    }
+)
+
+
+def _get_coordinators(hass, config_entry_id=None):
+    """Return the coordinators addressed by a service call."""
+    domain_data = hass.data.get(DOMAIN, {})
+    if config_entry_id:
+        coordinator = domain_data.get(config_entry_id)
+        if not isinstance(coordinator, ParcelTrackingCoordinator):
+            raise HomeAssistantError(f"No loaded Parcel Tracking Info entry with id '{config_entry_id}'.")
+        return [coordinator]
+    return [value for value in domain_data.values() if isinstance(value, ParcelTrackingCoordinator)]
+
+
+async def async_setup_services(hass):
+    """Register the services of the integration."""
+
+    async def async_handle_profile_refresh(call):
+        """Profile one refresh of the selected (or every) coordinator."""
+        domain_data = hass.data.setdefault(DOMAIN, {})
+        if domain_data.get("profiling"):
+            raise HomeAssistantError("A refresh is already being profiled.")
+
+        coordinators = _get_coordinators(hass, call.data.get("config_entry_id"))
+        domain_data["profiling"] = True
+        try:
+            for coordinator in coordinators:
+                timestamp = dt_util.now().strftime("%Y%m%d_%H%M%S")
+                path = hass.config.path(f"{DOMAIN}_profile_{coordinator.carrier}_{timestamp}.txt")
+                try:
+                    await async_profile_refresh(hass, coordinator, path, call.data["top"])
+                except Exception as e:
+                    raise HomeAssistantError(
+                        f"Profiled refresh of {coordinator.entry.title} failed (report written to {path}): {e}"
+                    ) from e
+        finally:
+            domain_data["profiling"] = False
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_PROFILE_REFRESH, async_handle_profile_refresh, schema=PROFILE_REFRESH_SCHEMA
+    )
+
+    async def async_handle_query(call):
+        """Return the parcels of all entries matching the filters, looked up in the parcel index."""
+        parcel_index = hass.data.get(DOMAIN, {}).get("parcel_index")
+        if parcel_index is None:
+            return {"parcels": [], "count": 0}
+
+        now = dt_util.utcnow()
+        # Naive datetimes are in Home Assistant's time zone
+        changed_since = dt_util.as_utc(call.data["changed_since"]) if "changed_since" in call.data else None
+        parcels = parcel_index.query(
+            statuses=call.data.get("status"),
+            carriers=call.data.get("carrier"),
+            entry_ids=call.data.get("config_entry_id"),
+            eta_from=call.data.get("eta_from"),
+            eta_to=call.data.get("eta_to"),
+            changed_before=(now - call.data["unchanged_for"]).timestamp() if "unchanged_for" in call.data else None,
+            changed_after=changed_since.timestamp() if changed_since is not None else None,
+            limit=call.data.get("limit"),
+        )
+        return {
+            "parcels": [
+                {
+                    "tracking_number": parcel["tracking_number"],
+                    "carrier": parcel["carrier"],
+                    "config_entry_id": parcel["entry_id"],
+                    "status": parcel["status"],
+                    "status_since": dt_util.utc_from_timestamp(parcel["status_since"]).isoformat(),
+                    "eta": parcel["eta"],
+                    "eta_date": parcel["eta_date"].isoformat() if parcel["eta_date"] else None,
+                    "service_url": parcel["service_url"],
+                }
+                for parcel in parcels
+            ],
+            "count": len(parcels),
+        }
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_QUERY, async_handle_query, schema=QUERY_SCHEMA, supports_response=SupportsResponse.ONLY
+    )
+
+    async def async_handle_backfill(call):
+        """Start (or cancel) reading older mail of the selected (or every) coordinator into the history."""
+        coordinators = _get_coordinators(hass, call.data.get("config_entry_id"))
+        if call.data["cancel"]:
+            for coordinator in coordinators:
+                await coordinator.backfill.async_cancel()
+            return
+        for coordinator in coordinators:
+            if coordinator.backfill.running:
+                raise HomeAssistantError(f"A backfill of {coordinator.entry.title} is already running.")
+        for coordinator in coordinators:
+            coordinator.backfill.start(call.data["days"], call.data["chunk_size"], call.data["pause"])
+
+    hass.services.async_register(DOMAIN, SERVICE_BACKFILL, async_handle_backfill, schema=BACKFILL_SCHEMA)
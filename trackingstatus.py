@@ -63,6 +63,44 @@ STATUS_MAPPING = {
     # Add more mappings as needed
 }
 
+# Status codes returned by the carrier tracking APIs, mapped to the standard statuses
+CARRIER_STATUS_CODES = {
+    "dhl": {
+        "pre-transit": "Warten",
+        "transit": "in Zustellung",
+        "delivered": "Zugestellt",
+        "failure": "Zustellung fehlgeschlagen",
+    },
+    "gls": {
+        "PREADVICE": "Warten",
+        "INWAREHOUSE": "in Zustellung",
+        "INTRANSIT": "in Zustellung",
+        "INDELIVERY": "in Zustellung",
+        "DELIVERED": "Zugestellt",
+        "DELIVEREDPS": "Abholbereit",
+        "NOTDELIVERED": "Zustellung fehlgeschlagen",
+    },
+    "hermes": {
+        "ANGEKUENDIGT": "Warten",
+        "UEBERGEBEN": "in Zustellung",
+        "UNTERWEGS": "in Zustellung",
+        "IN_ZUSTELLUNG": "in Zustellung",
+        "ZUGESTELLT": "Zugestellt",
+        "IM_PAKETSHOP": "Abholbereit",
+        "ZUSTELLUNG_FEHLGESCHLAGEN": "Zustellung fehlgeschlagen",
+    },
+    "dpd": {
+        "ACCEPTED": "Warten",
+        "AT_SENDING_DEPOT": "in Zustellung",
+        "ON_THE_ROAD": "in Zustellung",
+        "AT_DELIVERY_DEPOT": "in Zustellung",
+        "DELIVERY": "in Zustellung",
+        "PICKUP_BY_CONSIGNEE": "Abholbereit",
+        "DELIVERED": "Zugestellt",
+        "DELIVERY_FAILED": "Zustellung fehlgeschlagen",
+    },
+}
+
 def map_status(status_string):
     """
     Map a given status string to the standard status using regex patterns.
@@ -81,3 +119,26 @@ def map_status(status_string):
                 return standard_status
     _LOGGER.debug(f"No mapping found for '{status_string}', returning original")
     return status_string
+
+def map_carrier_status(carrier, status_code, description=None):
+    """
+    Map a status code of a carrier API to the standard status.
+
+    Unknown codes fall back to map_status on the description (or the code).
+
+    Args:
+        carrier (str): The carrier (API template) name, e.g. "gls".
+        status_code (str): The status code from the API response.
+        description (Optional[str]): The human readable status text, if any.
+
+    Returns:
+        str: The standardized status, or "unknown" without code and description.
+    """
+    codes = CARRIER_STATUS_CODES.get((carrier or "").lower(), {})
+    if status_code and status_code in codes:
+        return codes[status_code]
+    if status_code and status_code.upper() in codes:
+        return codes[status_code.upper()]
+    if description or status_code:
+        return map_status(description or status_code)
+    return "unknown"